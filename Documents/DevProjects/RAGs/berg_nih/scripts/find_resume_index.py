@@ -4,22 +4,28 @@ Find Resume Index - Map processed videos to filtered catalog positions
 """
 
 import json
+import os
 
 def find_resume_index():
     """Find the correct resume index by mapping processed videos to filtered catalog"""
     
-    # Load complete database
-    with open('data/processed/berg_complete_database.json', 'r', encoding='utf-8') as f:
-        database = json.load(f)
-    
     # Load filtered catalog
     with open('data/processed/berg_filtered_catalog.json', 'r', encoding='utf-8') as f:
         filtered_catalog = json.load(f)
     
-    # Extract processed video IDs
+    # Extract processed video IDs (the batch extractor appends to a JSONL
+    # database; older runs only have the consolidated JSON)
     processed_video_ids = set()
-    for video in database['videos']:
-        processed_video_ids.add(video['video_id'])
+    if os.path.exists('data/processed/berg_complete_database.jsonl'):
+        with open('data/processed/berg_complete_database.jsonl', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    processed_video_ids.add(json.loads(line)['video_id'])
+    else:
+        with open('data/processed/berg_complete_database.json', 'r', encoding='utf-8') as f:
+            database = json.load(f)
+        for video in database['videos']:
+            processed_video_ids.add(video['video_id'])
     
     print(f"📊 Analysis:")
     print(f"  Processed videos in database: {len(processed_video_ids)}")
@@ -6,9 +6,11 @@ Fetch complete articles for user-selected PMC articles
 
 import csv
 import json
+import re
 import time
 import requests
 import xml.etree.ElementTree as ET
+from collections import Counter
 from datetime import datetime
 from typing import List, Dict, Optional
 import logging
@@ -17,24 +19,42 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Matches one word (whitespace-delimited run) for allocation-free word counting
+WORD_PATTERN = re.compile(r'\S+')
+
+# How much of an efetch response to inspect for an <article> element before parsing
+ARTICLE_PEEK_BYTES = 8192
+
 class PMCFullTextFetcher:
     def __init__(self, email: str = "your-email@example.com"):
         """Initialize PMC full-text fetcher"""
         self.email = email
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
         self.rate_limit_delay = 0.34  # ~3 requests per second
+        
+        # Adaptive pacing: back off on 429/503, ease back toward the floor on success
+        self.min_delay = 0.34  # NCBI limit without an API key
+        self.max_delay = 30.0
+        self.max_retries = 4
+        self.successes_before_speedup = 5
+        self._success_streak = 0
 
     def load_selected_articles(self, csv_file: str) -> List[Dict]:
-        """Load selected articles from CSV file"""
+        """Load selected articles from CSV or JSON Lines file"""
         selected_articles = []
+        is_jsonl = csv_file.lower().endswith('.jsonl')
         
         try:
             with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
+                if is_jsonl:
+                    rows = (json.loads(line) for line in f if line.strip())
+                else:
+                    rows = csv.DictReader(f)
+                
+                for row in rows:
                     # For culled file, treat all articles as selected
                     # Also check if explicitly marked as selected
-                    selected = row.get('selected_for_full_text', '').lower()
+                    selected = str(row.get('selected_for_full_text', '')).lower()
                     if 'culled' in csv_file.lower() or selected in ['true', '1', 'yes', 'y']:
                         selected_articles.append({
                             'search_term': row['search_term'],
@@ -51,10 +71,10 @@ class PMCFullTextFetcher:
             return selected_articles
             
         except FileNotFoundError:
-            logger.error(f"CSV file {csv_file} not found")
+            logger.error(f"Selection file {csv_file} not found")
             return []
         except Exception as e:
-            logger.error(f"Error reading CSV file: {e}")
+            logger.error(f"Error reading selection file: {e}")
             return []
 
     def fetch_full_article(self, pmc_id: str) -> Optional[Dict]:
@@ -70,9 +90,16 @@ class PMCFullTextFetcher:
         
         try:
             logger.info(f"Fetching full article PMC{pmc_id}")
-            response = requests.get(fetch_url, params=params)
+            response = self._throttled_get(fetch_url, params)
             response.raise_for_status()
             
+            # Embargoed content comes back as an empty <pmc-articleset>, and under load
+            # NCBI may return an HTML error page - skip the full parse for both
+            head = response.content[:ARTICLE_PEEK_BYTES]
+            if b'<article ' not in head and b'<article>' not in head:
+                logger.warning(f"No article content found for PMC{pmc_id}")
+                return None
+            
             # Parse XML
             root = ET.fromstring(response.content)
             article_elem = root.find('.//article')
@@ -90,6 +117,42 @@ class PMCFullTextFetcher:
             logger.error(f"XML parsing failed for PMC{pmc_id}: {e}")
             return None
 
+    def _throttled_get(self, url: str, params: Dict) -> requests.Response:
+        """GET with adaptive backoff driven by 429/503 responses"""
+        for attempt in range(self.max_retries):
+            response = requests.get(url, params=params)
+            
+            if response.status_code not in (429, 503):
+                self._record_success()
+                return response
+            
+            # Server is pushing back - double the delay and honor Retry-After
+            self._success_streak = 0
+            self.rate_limit_delay = min(self.rate_limit_delay * 2, self.max_delay)
+            if attempt == self.max_retries - 1:
+                logger.warning(f"NCBI returned {response.status_code} (attempt {attempt + 1}/{self.max_retries}). "
+                               f"Delay now {self.rate_limit_delay:.2f}s, giving up")
+                break
+            
+            try:
+                retry_after = float(response.headers.get('Retry-After', self.rate_limit_delay))
+            except ValueError:
+                retry_after = self.rate_limit_delay
+            
+            logger.warning(f"NCBI returned {response.status_code} (attempt {attempt + 1}/{self.max_retries}). "
+                           f"Delay now {self.rate_limit_delay:.2f}s, retrying in {retry_after:.1f}s")
+            time.sleep(retry_after)
+        
+        return response
+
+    def _record_success(self):
+        """Ease the delay back toward the floor after a run of clean responses"""
+        self._success_streak += 1
+        if self._success_streak >= self.successes_before_speedup and self.rate_limit_delay > self.min_delay:
+            self.rate_limit_delay = max(self.min_delay, self.rate_limit_delay / 2)
+            self._success_streak = 0
+            logger.info(f"NCBI healthy, delay reduced to {self.rate_limit_delay:.2f}s")
+
     def _parse_full_article_xml(self, article_elem, pmc_id: str) -> Dict:
         """Parse complete article XML to extract all content"""
         article_data = {
@@ -120,12 +183,17 @@ class PMCFullTextFetcher:
                 sections, combined_text = self._extract_body_sections(body)
                 article_data['full_text_sections'] = sections
                 article_data['full_text_combined'] = combined_text
-                article_data['word_count'] = len(combined_text.split()) if combined_text else 0
+                article_data['word_count'] = sum(1 for _ in WORD_PATTERN.finditer(combined_text))
             
-            # Count references, figures, tables
-            article_data['references_count'] = len(article_elem.findall('.//ref'))
-            article_data['figures_count'] = len(article_elem.findall('.//fig'))
-            article_data['tables_count'] = len(article_elem.findall('.//table-wrap'))
+            # Count references, figures, tables in one pass
+            for elem in article_elem.iter():
+                tag = elem.tag
+                if tag == 'ref':
+                    article_data['references_count'] += 1
+                elif tag == 'fig':
+                    article_data['figures_count'] += 1
+                elif tag == 'table-wrap':
+                    article_data['tables_count'] += 1
             
             logger.info(f"Extracted article PMC{pmc_id}: {article_data['word_count']} words, {len(article_data['full_text_sections'])} sections")
             return article_data
@@ -142,41 +210,42 @@ class PMCFullTextFetcher:
         if article_meta is None:
             return metadata
         
-        # Title
-        title_elem = article_meta.find('.//title-group/article-title')
-        if title_elem is not None:
-            metadata['title'] = self._extract_text_from_element(title_elem)
+        keywords = []
+        authors = []
         
-        # Abstract
-        abstract_elem = article_meta.find('.//abstract')
-        if abstract_elem is not None:
-            abstract_parts = []
-            for p in abstract_elem.findall('.//p'):
-                p_text = self._extract_text_from_element(p)
-                if p_text:
-                    abstract_parts.append(p_text)
-            metadata['abstract'] = " ".join(abstract_parts)
+        # Single walk over article-meta, dispatching on tag
+        for elem in article_meta.iter():
+            tag = elem.tag
+            
+            if tag == 'title-group' and 'title' not in metadata:
+                title_elem = elem.find('article-title')
+                if title_elem is not None:
+                    metadata['title'] = self._extract_text_from_element(title_elem)
+            
+            elif tag == 'abstract' and 'abstract' not in metadata:
+                abstract_parts = []
+                for p in elem.iter('p'):
+                    p_text = self._extract_text_from_element(p)
+                    if p_text:
+                        abstract_parts.append(p_text)
+                metadata['abstract'] = " ".join(abstract_parts)
+            
+            elif tag == 'kwd':
+                if elem.text:
+                    keywords.append(elem.text.strip())
+            
+            elif tag == 'contrib' and elem.get('contrib-type') == 'author':
+                name_elem = elem.find('.//name')
+                if name_elem is not None:
+                    surname = name_elem.find('surname')
+                    given_names = name_elem.find('given-names')
+                    if surname is not None and given_names is not None:
+                        authors.append(f"{given_names.text} {surname.text}")
         
-        # Keywords
-        keywords = []
-        for kwd_group in article_meta.findall('.//kwd-group'):
-            for kwd in kwd_group.findall('.//kwd'):
-                if kwd.text:
-                    keywords.append(kwd.text.strip())
         metadata['keywords'] = keywords
-        
-        # Authors
-        authors = []
-        for contrib in article_meta.findall('.//contrib[@contrib-type="author"]'):
-            name_elem = contrib.find('.//name')
-            if name_elem is not None:
-                surname = name_elem.find('surname')
-                given_names = name_elem.find('given-names')
-                if surname is not None and given_names is not None:
-                    authors.append(f"{given_names.text} {surname.text}")
         metadata['authors'] = authors
         
-        # Journal info
+        # Journal info lives in journal-meta, a sibling of article-meta
         journal_elem = front_elem.find('.//journal-title')
         if journal_elem is not None:
             metadata['journal'] = journal_elem.text
@@ -186,12 +255,13 @@ class PMCFullTextFetcher:
     def _extract_body_sections(self, body_elem) -> tuple:
         """Extract all body sections with their content"""
         sections = {}
-        all_text_parts = []
+        # Flat list of title labels and paragraphs, joined once at the end so
+        # section text is not copied again into per-section combined strings
+        combined_parts = []
         
         # Extract main sections
         for sec in body_elem.findall('.//sec'):
             section_title = "Unknown Section"
-            section_content = ""
             
             # Get section title
             title_elem = sec.find('.//title')
@@ -205,11 +275,10 @@ class PMCFullTextFetcher:
                 if p_text:
                     paragraphs.append(p_text)
             
-            section_content = " ".join(paragraphs)
-            
-            if section_content:
-                sections[section_title] = section_content
-                all_text_parts.append(f"{section_title}: {section_content}")
+            if paragraphs:
+                sections[section_title] = " ".join(paragraphs)
+                combined_parts.append(f"{section_title}:")
+                combined_parts.extend(paragraphs)
         
         # Also get any direct paragraphs in body (not in sections)
         direct_paragraphs = []
@@ -219,11 +288,10 @@ class PMCFullTextFetcher:
                 direct_paragraphs.append(p_text)
         
         if direct_paragraphs:
-            content = " ".join(direct_paragraphs)
-            sections["Main Content"] = content
-            all_text_parts.append(content)
+            sections["Main Content"] = " ".join(direct_paragraphs)
+            combined_parts.extend(direct_paragraphs)
         
-        combined_text = " ".join(all_text_parts)
+        combined_text = " ".join(combined_parts)
         return sections, combined_text
 
     def _extract_text_from_element(self, element) -> str:
@@ -318,21 +386,22 @@ class PMCFullTextFetcher:
         print(f"Successfully fetched: {results['successfully_fetched']}")
         print(f"Success rate: {results['successfully_fetched']/results['selected_articles_count']*100:.1f}%")
         
-        total_words = sum(article.get('word_count', 0) for article in results['articles'].values())
-        print(f"Total words extracted: {total_words:,}")
-        
-        # Show articles by Berg topic
-        by_topic = {}
+        # Single pass for word totals and per-topic success counts
+        total_words = 0
+        topic_totals = Counter()
+        topic_successes = Counter()
         for article in results['articles'].values():
             topic = article.get('berg_search_term', 'unknown')
-            if topic not in by_topic:
-                by_topic[topic] = []
-            by_topic[topic].append(article)
+            topic_totals[topic] += 1
+            topic_successes[topic] += article.get('fetch_status') == 'success'
+            total_words += article.get('word_count', 0)
+        
+        print(f"Total words extracted: {total_words:,}")
         
+        # Show articles by Berg topic
         print(f"\nArticles by Berg topic:")
-        for topic, articles in by_topic.items():
-            successful = sum(1 for a in articles if a.get('fetch_status') == 'success')
-            print(f"  {topic}: {successful}/{len(articles)} articles")
+        for topic, total in topic_totals.items():
+            print(f"  {topic}: {topic_successes[topic]}/{total} articles")
         
         return results
 
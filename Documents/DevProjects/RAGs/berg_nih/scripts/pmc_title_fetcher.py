@@ -7,8 +7,10 @@ Fetch article titles and metadata for review before full text extraction
 import os
 import json
 import time
+import threading
 import requests
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional
 import logging
@@ -23,6 +25,9 @@ class PMCTitleFetcher:
         self.email = email
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
         self.rate_limit_delay = 0.34  # ~3 requests per second
+        self.max_workers = 3  # Terms fetched concurrently, still paced by rate_limit_delay
+        self._rate_lock = threading.Lock()
+        self._next_request_time = 0.0
         
         # Berg-derived search terms (simplified)
         self.search_terms = [
@@ -39,6 +44,16 @@ class PMCTitleFetcher:
             "vitamin B1 deficiency"
         ]
 
+    def _wait_for_rate_limit(self):
+        """Space requests across worker threads to stay under NCBI's rate limit"""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.rate_limit_delay
+        
+        if wait > 0:
+            time.sleep(wait)
+
     def search_pmc_titles_only(self, search_term: str, max_results: int = 10) -> List[str]:
         """Search PMC for article IDs (titles to be fetched separately)"""
         search_url = f"{self.base_url}esearch.fcgi"
@@ -59,6 +74,7 @@ class PMCTitleFetcher:
         
         try:
             logger.info(f"Searching PMC for: {search_term}")
+            self._wait_for_rate_limit()
             response = requests.get(search_url, params=params)
             response.raise_for_status()
             
@@ -95,6 +111,7 @@ class PMCTitleFetcher:
         
         try:
             logger.info(f"Fetching summaries for {len(pmc_ids)} articles")
+            self._wait_for_rate_limit()
             response = requests.get(summary_url, params=params)
             response.raise_for_status()
             
@@ -175,20 +192,16 @@ class PMCTitleFetcher:
         
         total_articles = 0
         
-        for i, search_term in enumerate(self.search_terms, 1):
-            logger.info(f"Processing term {i}/{len(self.search_terms)}: {search_term}")
-            
-            # Search for PMC IDs
-            pmc_ids = self.search_pmc_titles_only(search_term, max_results=articles_per_term)
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
-            
-            # Get article summaries
-            articles = self.get_article_summaries(pmc_ids)
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
+        # Search terms are independent - run them concurrently; the shared
+        # rate limiter keeps the combined request rate within NCBI's limit
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                search_term: executor.submit(self._fetch_term_titles, search_term, articles_per_term)
+                for search_term in self.search_terms
+            }
+        
+        for search_term, future in futures.items():
+            articles = future.result()
             
             results['search_results'][search_term] = {
                 'articles_found': len(articles),
@@ -203,6 +216,12 @@ class PMCTitleFetcher:
         
         return results
 
+    def _fetch_term_titles(self, search_term: str, articles_per_term: int) -> List[Dict]:
+        """Search one term and fetch summaries for its PMC IDs"""
+        logger.info(f"Processing term: {search_term}")
+        pmc_ids = self.search_pmc_titles_only(search_term, max_results=articles_per_term)
+        return self.get_article_summaries(pmc_ids)
+
     def save_titles_for_review(self, results: Dict, filename: str = 'pmc_titles_for_review.json'):
         """Save title results for user review"""
         with open(filename, 'w', encoding='utf-8') as f:
@@ -210,6 +229,26 @@ class PMCTitleFetcher:
         
         logger.info(f"Results saved to {filename}")
         
+        # One flat record per line, same columns as the review CSV
+        jsonl_filename = os.path.splitext(filename)[0] + '.jsonl'
+        with open(jsonl_filename, 'w', encoding='utf-8') as f:
+            for search_term, data in results['search_results'].items():
+                for article in data['articles']:
+                    record = {
+                        'search_term': search_term,
+                        'pmc_id': article.get('pmc_id', ''),
+                        'title': article.get('title', ''),
+                        'authors': '; '.join(article.get('authors', [])),
+                        'journal': article.get('journal', ''),
+                        'year': article.get('year', ''),
+                        'doi': article.get('doi', ''),
+                        'pmc_url': article.get('pmc_url', ''),
+                        'selected_for_full_text': article.get('selected_for_full_text', False)
+                    }
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        
+        logger.info(f"Review records saved to {jsonl_filename}")
+        
         # Print summary for review
         print(f"\nPMC TITLE FETCH SUMMARY:")
         print(f"="*60)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Processed Video Index
+Append-only record of which video IDs each human-batch file contains, so
+progress checks read one small file instead of parsing every batch
+"""
+
+import json
+import os
+import glob
+from typing import Iterable, List, Tuple
+
+try:
+    import ijson  # optional: stream batch files instead of loading them whole
+except ImportError:
+    ijson = None
+
+PROCESSED_IDS_FILE = "data/processed/processed_ids.txt"
+BATCH_FILE_GLOB = "data/processed/berg_human_batch_*.json"
+
+def iter_batch_videos(batch_file: str):
+    """Yield the video records of a batch file, streaming them when ijson is available"""
+    if os.path.getsize(batch_file) == 0:
+        return
+    
+    with open(batch_file, 'rb') as f:
+        if ijson:
+            yield from ijson.items(f, 'videos.item')
+        else:
+            yield from json.load(f).get('videos', [])
+
+def append_processed_ids(video_ids: Iterable[str], batch_file: str,
+                         index_file: str = PROCESSED_IDS_FILE):
+    """Record the videos a batch file contains (one `video_id<TAB>batch file` line each)"""
+    batch_name = os.path.basename(batch_file)
+    lines = ''.join(f"{video_id}\t{batch_name}\n" for video_id in video_ids if video_id)
+    if not lines:
+        return
+    
+    # Single write in append mode, so concurrent batch runs don't interleave lines
+    with open(index_file, 'a', encoding='utf-8') as f:
+        f.write(lines)
+
+def load_processed_entries(index_file: str = PROCESSED_IDS_FILE,
+                           batch_glob: str = BATCH_FILE_GLOB) -> List[Tuple[str, str]]:
+    """(video_id, batch file) for every processed video, in batch order
+    
+    Batch files the index doesn't cover yet (written before it existed or by
+    a run that died before indexing) are parsed once and appended. A batch
+    read here between the extractor writing it and indexing it ends up in the
+    index twice, so repeated lines are dropped.
+    """
+    entries = []
+    if os.path.exists(index_file):
+        seen = set()
+        with open(index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = line.rstrip('\n')
+                if entry in seen:
+                    continue
+                seen.add(entry)
+                video_id, _, batch_name = entry.partition('\t')
+                if video_id:
+                    entries.append((video_id, batch_name))
+    
+    indexed_batches = {batch_name for _, batch_name in entries}
+    for batch_file in sorted(glob.glob(batch_glob)):
+        batch_name = os.path.basename(batch_file)
+        if batch_name in indexed_batches:
+            continue
+        
+        try:
+            video_ids = [v.get('video_id') for v in iter_batch_videos(batch_file) if v.get('video_id')]
+        except Exception as e:
+            print(f"❌ Error reading {batch_file}: {e}")
+            continue
+        
+        append_processed_ids(video_ids, batch_file, index_file)
+        entries.extend((video_id, batch_name) for video_id in video_ids)
+    
+    return entries
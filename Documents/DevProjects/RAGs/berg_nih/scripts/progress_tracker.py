@@ -4,28 +4,130 @@ Master Progress Tracking System for Berg Video Processing
 Prevents duplicates, tracks exact progress, enables reliable resume
 """
 
+import hashlib
 import json
+import mmap
 import os
+import pickle
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 
+try:
+    import orjson  # Optional fast JSON codec
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # Optional streaming JSON parser
+except ImportError:
+    ijson = None
+
+# Files at least this large are memory-mapped and parsed in place when orjson is available
+MMAP_THRESHOLD_BYTES = 1 << 20
+
+def _read_json(path):
+    """Read a whole JSON file in one call and parse it from bytes"""
+    if orjson and os.path.getsize(path) >= MMAP_THRESHOLD_BYTES:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+    
+    data = Path(path).read_bytes()
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _write_json(path, obj, compact=False):
+    """Serialize obj as UTF-8 JSON (indented unless compact) and write it in one call"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        payload = orjson.dumps(obj, option=option)
+    elif compact:
+        payload = json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    else:
+        payload = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    # Write beside the target and rename over it so a crash never leaves a torn file
+    tmp_path = f"{path}.tmp"
+    Path(tmp_path).write_bytes(payload)
+    os.replace(tmp_path, path)
+
+def _append_json_line(path, obj):
+    """Append obj as a single compact JSON line"""
+    if orjson:
+        line = orjson.dumps(obj) + b'\n'
+    else:
+        line = json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+    with open(path, 'ab') as f:
+        f.write(line)
+
+def _parse_batch_file(batch_file):
+    """Parse one batch file into (completed_at, [(video_id, title, duration), ...])
+    
+    Returns None when the file has no videos list. Only the fields the tracker
+    keeps are projected out, so the full batch document can be freed right away.
+    """
+    if ijson and os.path.getsize(batch_file) >= MMAP_THRESHOLD_BYTES:
+        return _stream_batch_file(batch_file)
+    
+    batch_data = _read_json(batch_file)
+    if 'videos' not in batch_data:
+        return None
+    
+    completed_at = batch_data.get('batch_metadata', {}).get('completed_at')
+    videos = [
+        (video['video_id'], video.get('title', 'Unknown'), video.get('duration_formatted', 'Unknown'))
+        for video in batch_data['videos'] if video.get('video_id')
+    ]
+    return completed_at, videos
+
+def _stream_batch_file(batch_file):
+    """Streaming variant of _parse_batch_file for large batches: one video in memory at a time"""
+    with open(batch_file, 'rb') as f:
+        # batch_metadata is written before videos, so this stops early
+        completed_at = next(ijson.items(f, 'batch_metadata.completed_at'), None)
+        f.seek(0)
+        videos = [
+            (video['video_id'], video.get('title', 'Unknown'), video.get('duration_formatted', 'Unknown'))
+            for video in ijson.items(f, 'videos.item') if video.get('video_id')
+        ]
+    return completed_at, videos
+
+# Batch files are parsed on a small thread pool; parsing overlaps with file reads
+SCAN_WORKERS = min(8, os.cpu_count() or 1)
+
 class ProgressTracker:
+    """Track which catalog videos have been processed
+    
+    filtered_catalog holds (catalog_index, video) tuples for videos in the
+    duration range; the video dicts are shared with the catalog, not copies.
+    """
+    
     def __init__(self, progress_file="data/processed/berg_processing_progress.json", 
                  catalog_file="data/processed/berg_complete_catalog.json",
-                 min_duration=121, max_duration=300):
+                 min_duration=121, max_duration=300, compact_json=False, compact_every=1):
         self.progress_file = progress_file
+        self.progress_log_file = f"{progress_file}.log"  # Deferred marks not yet compacted
         self.catalog_file = catalog_file
+        self.catalog_cache_file = f"{catalog_file}.cache.pkl"  # Derived lookups sidecar
         self.min_duration = min_duration
         self.max_duration = max_duration
+        self.compact_json = compact_json  # Skip pretty-printing on large progress files
+        self.compact_every = compact_every  # Marks appended to the log between full progress rewrites
+        self._log_entries = 0  # Records currently in the progress log
         self.progress_data = self._load_progress()
-        self.catalog_data = self._load_catalog()
-        self.filtered_catalog = self._filter_catalog_by_duration()
+        self._dirty = False  # Unsaved marks pending from defer_save=True
+        self._summary_cache = None  # get_progress_summary result, cleared on mutation
+        self._replay_progress_log()
+        self._rebuild_index_state()
+        # Catalog data and lookups load lazily, so progress-only use never parses the catalog
     
     def _load_progress(self):
         """Load existing progress or create new"""
         if os.path.exists(self.progress_file):
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _read_json(self.progress_file)
         else:
             return {
                 "master_progress": {
@@ -43,88 +145,232 @@ class ProgressTracker:
                 "processed_videos": {}
             }
     
-    def _load_catalog(self):
-        """Load video catalog"""
+    def _replay_progress_log(self):
+        """Apply deferred marks left in the append-only log by an interrupted run"""
+        if not os.path.exists(self.progress_log_file):
+            return
+        
+        processed_videos = self.progress_data['processed_videos']
+        replayed = 0
+        with open(self.progress_log_file, 'rb') as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line) if orjson else json.loads(line)
+                except ValueError:
+                    continue  # Torn final line from a crash mid-append
+                processed_videos[record.pop('video_id')] = record
+                replayed += 1
+        
+        self._log_entries = replayed
+        if replayed:
+            master = self.progress_data['master_progress']
+            master['videos_processed'] = len(processed_videos)
+            master['last_processed_index'] = max(
+                (v['catalog_index'] for v in processed_videos.values()), default=-1
+            )
+            self._dirty = True
+            print(f"♻️  Replayed {replayed} deferred progress entries from {self.progress_log_file}")
+    
+    def _rebuild_index_state(self):
+        """Recompute the catalog-index columns, max index and gap cursor from progress data"""
+        # Column view of processed_videos: video_id -> catalog_index, plus a
+        # multiset of indices so overwrites can retire an index correctly
+        self._index_by_id = {vid: v['catalog_index'] for vid, v in self.progress_data['processed_videos'].items()}
+        self._index_counts = Counter(self._index_by_id.values())
+        self._max_index = max(self._index_counts, default=-1)
+        self._next_gap = 0  # Every index below this is known to be processed
+    
+    def _set_catalog_index(self, video_id, catalog_index):
+        """Record video_id at catalog_index, retiring any index it previously held"""
+        old_index = self._index_by_id.get(video_id)
+        self._index_by_id[video_id] = catalog_index
+        self._index_counts[catalog_index] += 1
+        self._max_index = max(self._max_index, catalog_index)
+        
+        if old_index is None:
+            return
+        
+        self._index_counts[old_index] -= 1
+        if self._index_counts[old_index] == 0:
+            del self._index_counts[old_index]
+            self._next_gap = min(self._next_gap, old_index)
+            if old_index == self._max_index:
+                self._max_index = max(self._index_counts, default=-1)
+    
+    @cached_property
+    def catalog_data(self):
+        """Video catalog, parsed on first access"""
         if not os.path.exists(self.catalog_file):
             print(f"❌ Catalog file not found: {self.catalog_file}")
             return None
             
-        with open(self.catalog_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _read_json(self.catalog_file)
+    
+    @cached_property
+    def _catalog_lookups(self):
+        """(video_count, id_to_index, filtered_catalog) from the sidecar cache or a fresh catalog parse"""
+        lookups = self._load_catalog_cache()
+        if lookups is None:
+            video_count = len(self.catalog_data.get('videos', [])) if self.catalog_data else 0
+            lookups = (video_count, self._build_id_index(), self._filter_catalog_by_duration())
+            self._save_catalog_cache(lookups)
+        return lookups
+    
+    @property
+    def catalog_video_count(self):
+        return self._catalog_lookups[0]
+    
+    @property
+    def _id_to_index(self):
+        return self._catalog_lookups[1]
+    
+    @property
+    def filtered_catalog(self):
+        return self._catalog_lookups[2]
+    
+    def _catalog_fingerprint(self):
+        """Identify the catalog contents and duration filter the derived data was built from"""
+        stat = os.stat(self.catalog_file)
+        return (stat.st_mtime_ns, stat.st_size, self.min_duration, self.max_duration)
+    
+    def _load_catalog_cache(self):
+        """Load id->index map and filtered catalog from the sidecar if it is still current"""
+        if not os.path.exists(self.catalog_file) or not os.path.exists(self.catalog_cache_file):
+            return None
+        
+        try:
+            with open(self.catalog_cache_file, 'rb') as f:
+                fingerprint, *lookups = pickle.load(f)
+        except Exception:
+            return None
+        
+        if fingerprint != self._catalog_fingerprint():
+            return None
+        
+        return tuple(lookups)
+    
+    def _save_catalog_cache(self, lookups):
+        """Persist derived catalog lookups so the next run can skip parsing the catalog"""
+        if self.catalog_data is None:
+            return
+        
+        payload = (self._catalog_fingerprint(), *lookups)
+        tmp_path = f"{self.catalog_cache_file}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.catalog_cache_file)
+        except OSError as e:
+            print(f"⚠️  Could not write catalog cache {self.catalog_cache_file}: {e}")
+    
+    def _build_id_index(self):
+        """Map video_id -> catalog index for O(1) catalog lookups"""
+        if not self.catalog_data or 'videos' not in self.catalog_data:
+            return {}
+        
+        id_to_index = {}
+        for i, video in enumerate(self.catalog_data['videos']):
+            id_to_index.setdefault(video.get('video_id'), i)  # First occurrence wins
+        return id_to_index
     
     def _filter_catalog_by_duration(self):
-        """Filter catalog to only videos in target duration range"""
+        """Filter catalog to (catalog_index, video) pairs in target duration range"""
         if not self.catalog_data or 'videos' not in self.catalog_data:
             return []
             
-        filtered = []
-        for i, video in enumerate(self.catalog_data['videos']):
-            duration = video.get('duration_seconds', 0)
-            if self.min_duration <= duration <= self.max_duration:
-                video_copy = video.copy()
-                video_copy['catalog_index'] = i  # Store original catalog index
-                filtered.append(video_copy)
-                
-        return filtered
+        min_duration, max_duration = self.min_duration, self.max_duration
+        
+        # Reference the catalog's own video dicts rather than copying them
+        return [
+            (i, video)
+            for i, video in enumerate(self.catalog_data['videos'])
+            if min_duration <= video.get('duration_seconds', 0) <= max_duration
+        ]
     
     def scan_existing_batches(self, data_dir="data/processed"):
         """Scan all existing batch files and build progress tracking"""
         print("🔍 Scanning existing batch files...")
         
-        import glob
-        batch_files = glob.glob(os.path.join(data_dir, "berg_human_batch_*.json"))
+        with os.scandir(data_dir) as entries:
+            batch_entries = [(entry.path, entry.stat()) for entry in entries
+                             if entry.name.startswith("berg_human_batch_") and entry.name.endswith(".json")]
+        batch_files = [path for path, _ in batch_entries]
         
         if not batch_files:
             print("❌ No batch files found")
             return
         
+        master = self.progress_data['master_progress']
+        processed_videos = self.progress_data['processed_videos']
+        
+        # No batch file added, removed, renamed or rewritten since the last scan (and
+        # same catalog) - reuse it. The batch files themselves are fingerprinted, not
+        # the directory: the progress files saved below live in it too
+        listing = sorted((os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+                         for path, stat in batch_entries)
+        fingerprint = hashlib.sha1(repr((listing, self.catalog_video_count)).encode()).hexdigest()
+        if master.get('scan_fingerprint') == fingerprint:
+            print("✅ Batch files unchanged since last scan - progress is up to date")
+            return master['videos_processed']
+        
         total_scanned = 0
+        scan_time = datetime.now().isoformat()  # Fallback for batches without completed_at
+        # video_id -> batch name it was taken from in this scan. Files are visited in
+        # directory order, so a video in several batches keeps the latest-named one.
+        scanned_from = {}
         
-        for batch_file in sorted(batch_files):
-            print(f"📖 Scanning {os.path.basename(batch_file)}...")
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            futures = [(batch_file, executor.submit(_parse_batch_file, batch_file))
+                       for batch_file in batch_files]
             
-            try:
-                with open(batch_file, 'r', encoding='utf-8') as f:
-                    batch_data = json.load(f)
+            for batch_file, future in futures:
+                print(f"📖 Scanning {os.path.basename(batch_file)}...")
                 
-                if 'videos' not in batch_data:
+                try:
+                    parsed = future.result()
+                except Exception as e:
+                    print(f"❌ Error scanning {batch_file}: {e}")
                     continue
-                    
-                for video in batch_data['videos']:
-                    video_id = video.get('video_id')
-                    if not video_id:
-                        continue
-                        
+                
+                if parsed is None:
+                    continue
+                
+                completed_at, videos = parsed
+                processed_at = completed_at or scan_time
+                batch_name = os.path.basename(batch_file)
+                for video_id, title, duration in videos:
                     # Find this video in catalog to get index
                     catalog_index = self._find_video_in_catalog(video_id)
                     
                     if catalog_index is not None:
-                        self.progress_data['processed_videos'][video_id] = {
+                        total_scanned += 1
+                        if scanned_from.get(video_id, '') > batch_name:
+                            continue
+                        scanned_from[video_id] = batch_name
+                        
+                        processed_videos[video_id] = {
                             "catalog_index": catalog_index,
-                            "processed_at": batch_data.get('batch_metadata', {}).get('completed_at', 
-                                                          datetime.now().isoformat()),
-                            "batch_file": os.path.basename(batch_file),
+                            "processed_at": processed_at,
+                            "batch_file": batch_name,
                             "status": "success",
-                            "title": video.get('title', 'Unknown'),
-                            "duration": video.get('duration_formatted', 'Unknown')
+                            "title": title,
+                            "duration": duration
                         }
-                        total_scanned += 1
-                        
-            except Exception as e:
-                print(f"❌ Error scanning {batch_file}: {e}")
         
         # Update master progress
-        self.progress_data['master_progress']['videos_processed'] = total_scanned
-        self.progress_data['master_progress']['last_updated'] = datetime.now().isoformat()
+        self._summary_cache = None
+        master['videos_processed'] = total_scanned
+        master['last_updated'] = scan_time
+        master['scan_fingerprint'] = fingerprint
         
-        if self.catalog_data and 'videos' in self.catalog_data:
-            self.progress_data['master_progress']['total_videos_in_catalog'] = len(self.catalog_data['videos'])
-            self.progress_data['master_progress']['total_videos_in_target_range'] = len(self.filtered_catalog)
+        if self.catalog_video_count:
+            master['total_videos_in_catalog'] = self.catalog_video_count
+            master['total_videos_in_target_range'] = len(self.filtered_catalog)
         
         # Find next resume index
-        processed_indices = [v['catalog_index'] for v in self.progress_data['processed_videos'].values()]
-        if processed_indices:
-            self.progress_data['master_progress']['last_processed_index'] = max(processed_indices)
+        self._rebuild_index_state()
+        if self._max_index >= 0:
+            master['last_processed_index'] = self._max_index
         
         self._save_progress()
         
@@ -133,74 +379,95 @@ class ProgressTracker:
     
     def _find_video_in_catalog(self, video_id):
         """Find video_id in catalog and return its index"""
-        if not self.catalog_data or 'videos' not in self.catalog_data:
-            return None
-            
-        for i, video in enumerate(self.catalog_data['videos']):
-            if video.get('video_id') == video_id:
-                return i
-                
-        return None
+        return self._id_to_index.get(video_id)
     
     def get_next_resume_index(self):
         """Get the next index to resume processing from"""
-        processed_indices = [v['catalog_index'] for v in self.progress_data['processed_videos'].values()]
-        
-        if not processed_indices:
-            return 0
-            
-        # Find the next unprocessed index
-        max_processed = max(processed_indices)
+        processed = self._index_counts
         
-        # Check if we have gaps (missing videos in sequence)
-        all_processed = set(processed_indices)
+        # First gap in the sequence, or max + 1 when there are none. The cursor
+        # only moves back when _set_catalog_index retires an index below it.
+        i = self._next_gap
+        while i in processed:
+            i += 1
+        self._next_gap = i
         
-        # Find first gap or next after max
-        for i in range(max_processed + 1):
-            if i not in all_processed:
-                return i
-                
-        return max_processed + 1
+        return i
     
     def is_video_processed(self, video_id):
         """Check if a video has already been processed"""
-        return video_id in self.progress_data['processed_videos']
+        # _index_by_id mirrors processed_videos' keys: one flat hash lookup
+        return video_id in self._index_by_id
     
-    def mark_video_processed(self, video_id, catalog_index, batch_file, additional_data=None):
-        """Mark a video as processed"""
-        self.progress_data['processed_videos'][video_id] = {
+    def mark_video_processed(self, video_id, catalog_index, batch_file, additional_data=None,
+                             defer_save=False, ts=None):
+        """Mark a video as processed
+        
+        Pass defer_save=True when marking many videos in a row and call flush()
+        afterwards, so the progress file is written once instead of per video.
+        Otherwise the mark is appended to the log and the progress file is
+        rewritten every compact_every marks (every mark by default).
+        ts is an optional ISO timestamp to reuse, e.g. one per batch.
+        """
+        if ts is None:
+            ts = datetime.now().isoformat()
+        
+        master = self.progress_data['master_progress']
+        processed_videos = self.progress_data['processed_videos']
+        
+        entry = processed_videos[video_id] = {
             "catalog_index": catalog_index,
-            "processed_at": datetime.now().isoformat(),
+            "processed_at": ts,
             "batch_file": batch_file,
             "status": "success"
         }
         
         if additional_data:
-            self.progress_data['processed_videos'][video_id].update(additional_data)
+            entry.update(additional_data)
         
-        self.progress_data['master_progress']['videos_processed'] = len(self.progress_data['processed_videos'])
-        self.progress_data['master_progress']['last_updated'] = datetime.now().isoformat()
-        self.progress_data['master_progress']['last_processed_index'] = max(
-            [v['catalog_index'] for v in self.progress_data['processed_videos'].values()]
-        )
+        self._summary_cache = None
+        master['videos_processed'] = len(processed_videos)
+        master['last_updated'] = ts
+        self._set_catalog_index(video_id, catalog_index)
+        master['last_processed_index'] = self._max_index
         
-        self._save_progress()
+        if not defer_save and self._log_entries + 1 >= self.compact_every:
+            self._save_progress()
+            return
+        
+        # Cheap one-line append keeps the mark durable until the next compaction
+        _append_json_line(self.progress_log_file, {'video_id': video_id, **entry})
+        self._log_entries += 1
+        self._dirty = True
+    
+    def flush(self):
+        """Write progress if any deferred marks are pending"""
+        if self._dirty:
+            self._save_progress()
     
     def _save_progress(self):
         """Save progress to file"""
         Path(self.progress_file).parent.mkdir(parents=True, exist_ok=True)
+        _write_json(self.progress_file, self.progress_data, compact=self.compact_json)
+        self._dirty = False
+        self._log_entries = 0
         
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(self.progress_data, f, indent=2, ensure_ascii=False)
+        # Everything in the log is now compacted into the progress file
+        if os.path.exists(self.progress_log_file):
+            os.remove(self.progress_log_file)
     
     def get_progress_summary(self):
-        """Get a summary of current progress"""
-        total_in_catalog = self.progress_data['master_progress']['total_videos_in_catalog']
-        target_videos = self.progress_data['master_progress']['total_videos_in_target_range']
-        processed = self.progress_data['master_progress']['videos_processed']
+        """Get a summary of current progress (cached until the next mark or scan)"""
+        if self._summary_cache is not None:
+            return self._summary_cache
+        
+        master = self.progress_data['master_progress']
+        total_in_catalog = master['total_videos_in_catalog']
+        target_videos = master['total_videos_in_target_range']
+        processed = master['videos_processed']
         next_index = self.get_next_resume_index()
         
-        return {
+        self._summary_cache = {
             'total_videos_in_catalog': total_in_catalog,
             'target_videos_to_process': target_videos,
             'processed_videos': processed,
@@ -209,6 +476,7 @@ class ProgressTracker:
             'next_resume_index': next_index,
             'duration_filter': f"{self.min_duration}-{self.max_duration} seconds"
         }
+        return self._summary_cache
     
     def print_progress_report(self):
         """Print detailed progress report"""
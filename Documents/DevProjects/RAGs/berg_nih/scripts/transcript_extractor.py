@@ -10,51 +10,249 @@ import time
 import logging
 import random
 import re
+import threading
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from functools import wraps
-from itertools import cycle
+from operator import attrgetter, itemgetter
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+try:
+    import orjson  # Optional fast JSON codec
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # Optional streaming JSON parser
+except ImportError:
+    ijson = None
 
 # Load environment variables
 def load_env_file():
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"\'')
-                    os.environ[key] = value
-    except FileNotFoundError:
-        pass
+    # python-dotenv handles quoting, escapes and comments; .env values win over the environment
+    load_dotenv('.env', override=True)
 
 load_env_file()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Typed youtube-transcript-api errors, so retries can dispatch on class rather
+# than message text (empty tuples when the package is missing match nothing)
+try:
+    from youtube_transcript_api import (
+        AgeRestricted, InvalidVideoId, NoTranscriptFound, RequestBlocked,
+        TranscriptsDisabled, VideoUnavailable
+    )
+    PERMANENT_TRANSCRIPT_ERRORS = (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable,
+                                   InvalidVideoId, AgeRestricted)
+    BLOCKED_ERRORS = (RequestBlocked,)  # Includes IpBlocked
+except ImportError:
+    PERMANENT_TRANSCRIPT_ERRORS = BLOCKED_ERRORS = ()
+
+# Message phrases for errors without a telling class, one case-insensitive scan per category
+BLOCKED_PATTERN = re.compile(r'ipblocked|ip blocked|blocking requests from your ip|requestblocked|request blocked', re.IGNORECASE)
+RATE_LIMIT_PATTERN = re.compile(r'rate limit|too many requests|429|quota exceeded', re.IGNORECASE)
+TRANSIENT_PATTERN = re.compile(r'timeout|connection|temporary|503|502|proxy', re.IGNORECASE)
+
+def _write_json(path, obj, compact=False):
+    """Serialize obj as UTF-8 JSON (indented unless compact) and write it in one call"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        payload = orjson.dumps(obj, option=option)
+    elif compact:
+        payload = json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    else:
+        payload = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    # Write beside the target and rename over it so a crash never leaves a torn file
+    tmp_path = f"{path}.tmp"
+    Path(tmp_path).write_bytes(payload)
+    os.replace(tmp_path, path)
+
+def _duration_filter(min_duration: Optional[int], max_duration: Optional[int]):
+    """Build a predicate testing a video's duration_seconds against optional bounds
+    
+    Missing bounds become infinities, so each check is one chained comparison.
+    """
+    low = float('-inf') if min_duration is None else min_duration
+    high = float('inf') if max_duration is None else max_duration
+    return lambda video: low <= video.get('duration_seconds', 0) <= high
+
+def _stream_exploration_data(path: str, keep) -> tuple:
+    """Stream-parse an exploration data file in one pass
+    
+    Returns (top-level fields except videos, videos for which keep(video) is
+    true, total video count). Each video is built and tested on its own, so
+    rejected videos are never all held in memory at once.
+    """
+    data, videos, total = {}, [], 0
+    key = builder = None
+    with open(path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == '':
+                # Root-level event: the previous top-level value is complete
+                if key is not None and key != 'videos':
+                    data[key] = builder.value
+                if event == 'map_key':
+                    key, builder = value, ijson.ObjectBuilder()
+                continue
+            
+            if key != 'videos':
+                builder.event(event, value)
+            elif prefix != 'videos':  # Skip the array's own start/end events
+                if prefix == 'videos.item' and event == 'start_map':
+                    builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                if prefix == 'videos.item' and event == 'end_map':
+                    total += 1
+                    if keep(builder.value):
+                        videos.append(builder.value)
+    
+    return data, videos, total
+
+def _write_json_with_list(path, obj: Dict, list_key: str, compact=False):
+    """Write a dict as JSON like _write_json, serializing obj[list_key] one item at a time
+    
+    The whole document is never built as one buffer, so saving needs memory
+    for the largest item rather than for the entire output file.
+    """
+    def dumps(value, depth):
+        if orjson:
+            text = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        elif compact:
+            text = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        else:
+            text = json.dumps(value, indent=2, ensure_ascii=False).encode('utf-8')
+        # Nest multi-line output at its depth (JSON strings never contain raw newlines)
+        return text if compact else text.replace(b'\n', b'\n' + b'  ' * depth)
+    
+    sep, colon, newline = (b',', b':', b'') if compact else (b',\n', b': ', b'\n')
+    pad, item_pad = (b'', b'') if compact else (b'  ', b'    ')
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b'{' + newline)
+        for n, (key, value) in enumerate(obj.items()):
+            if n:
+                f.write(sep)
+            f.write(pad + dumps(key, 1) + colon)
+            if key == list_key and value:
+                f.write(b'[' + newline)
+                for i, item in enumerate(value):
+                    if i:
+                        f.write(sep)
+                    f.write(item_pad + dumps(item, 2))
+                f.write(newline + pad + b']')
+            else:
+                f.write(dumps(value, 1))
+        f.write(newline + b'}')
+    os.replace(tmp_path, path)
+
+def _json_line(obj) -> bytes:
+    """Encode obj as a single compact JSON line"""
+    if orjson:
+        return orjson.dumps(obj) + b'\n'
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+# Adaptive concurrency: halve in-flight fetches when more than THROTTLE_BACKOFF_RATE
+# of recent requests were throttled, grow by one after a clean window
+OUTCOME_WINDOW = 20
+THROTTLE_BACKOFF_RATE = 0.2
+THROTTLE_GROW_RATE = 0.02
+CONCURRENCY_GROW_INTERVAL = 30.0  # Seconds between increases
+
+# Successful transcripts are cached on disk, one file per video; they rarely change
+TRANSCRIPT_CACHE_DIR = 'data/cache/transcripts'
+TRANSCRIPT_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# How long a proxy that failed a real request is skipped before being retried
+PROXY_COOLDOWN_SECONDS = 4 * 60 * 60
+
+# Transcript cleanup patterns, compiled once
+ARTIFACT_PATTERN = re.compile(r'\[(?:Music|Applause|Laughter)\]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Claim patterns tuned for Dr. Berg's speaking style, compiled once. Each is
+# paired with a cue that every match of it must contain.
+CLAIM_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE | re.DOTALL), claim_type, cue)
+    for pattern, claim_type, cue in [
+        # Direct recommendations
+        (r'if you have (.{5,40}),?\s*(?:you should|try|take|do)\s*(.{5,60})', 'recommendation', 'if you have'),
+        
+        # Deficiency patterns
+        (r'(.{5,40})\s*deficiency\s*(?:causes?|leads? to|results? in)\s*(.{5,60})', 'deficiency_cause', 'deficiency'),
+        (r'(?:signs?|symptoms?)\s*of\s*(.{5,40})\s*deficiency[:\s]*(.{5,100})', 'deficiency_symptoms', 'deficiency'),
+        
+        # Causation patterns
+        (r'(.{5,40})\s*(?:is caused by|comes from|results from)\s*(.{5,60})', 'causation', 'is caused by|comes from|results from'),
+        
+        # Best/top recommendations
+        (r'(?:best|top)\s*(?:thing|way|food|supplement|vitamin)\s*for\s*(.{5,40})\s*is\s*(.{5,60})', 'best_for', 'best|top'),
+        
+        # Body signals
+        (r'(?:when|if)\s*your body\s*(.{5,60}),?\s*(?:it means|that means)\s*(.{5,60})', 'body_signal', 'your body'),
+        
+        # Problem-solution
+        (r'(?:the problem with|issue with)\s*(.{5,40})\s*is\s*(.{5,60})', 'problem_identified', 'the problem with|issue with')
+    ]
+]
+
+# All cues in one alternation: a single scan finds which patterns can match,
+# so the rest (and their leading .{5,40} backtracking) are skipped. The
+# lookahead lets cues that share a position, like 'deficiency', all be seen.
+CLAIM_CUE_PATTERN = re.compile(
+    '(?=' + '|'.join(f'(?P<cue{i}>{cue})' for i, (_, _, cue) in enumerate(CLAIM_PATTERNS)) + ')',
+    re.IGNORECASE
+)
+
 class TranscriptExtractor:
-    def __init__(self, use_proxies: bool = False, proxy_list: List[str] = None):
+    def __init__(self, use_proxies: bool = False, proxy_list: List[str] = None,
+                 cache_dir: Optional[str] = TRANSCRIPT_CACHE_DIR):
         # API method detection (initialize before setup)
         self.api_method = None
         self.api_instance = None
+        self._fetch_fn = None  # Resolved transcript fetch callable
+        self._extract_fn = None  # Segment -> text getter, resolved from the first result
+        self._thread_state = threading.local()  # Per-worker API instances
         
         # Setup API and detect method
         self.setup_transcript_api()
         
         # Rate limiting configuration (enhanced for IP blocking)
         self.request_count = 0
-        self.last_request_time = 0
+        self.last_request_time = 0  # time.monotonic() of the latest reserved request start
+        self._request_times = deque()  # Reserved request starts within the last minute
         self.min_delay = 3.0  # Increased from 1.0
         self.max_delay = 15.0  # Increased from 8.0
         self.backoff_factor = 2.5  # Increased from 2.0
         self.max_retries = 5  # Increased from 3
         self.ip_blocked = False  # Track if we're currently IP blocked
+        self._rate_lock = threading.Lock()  # Guards request slot reservations across worker threads
+        
+        # Adaptive concurrency state (see _record_outcome)
+        self._slot_cond = threading.Condition()
+        self._inflight = 0
+        self._inflight_limit = 1
+        self._max_inflight = 1
+        self._recent_outcomes = deque(maxlen=OUTCOME_WINDOW)  # True where a request was throttled
+        self._last_limit_change = 0.0
         
         # Proxy configuration
         self.use_proxies = use_proxies
         self.proxy_list = proxy_list or []
-        self.proxy_cycle = cycle(self.proxy_list) if self.proxy_list else None
         self.current_proxy = None
-        self.failed_proxies = set()
+        self.failed_proxies = set()  # Every proxy that has failed a request, for reporting
+        self._healthy_proxies = deque(self.proxy_list)  # Rotation order; front is used next
+        self._proxy_cooldown = []  # Min-heap of (retry_at, proxy) for failed proxies
+        self._proxy_lock = threading.Lock()  # Guards the rotation and cooldown heap across worker threads
+        
+        # On-disk transcript cache (None disables it)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
     
     def setup_transcript_api(self):
         """Setup YouTube transcript API with method detection"""
@@ -78,15 +276,28 @@ class TranscriptExtractor:
         if hasattr(YouTubeTranscriptApi, 'get_transcript'):
             self.api_method = 'get_transcript'
             self.api_instance = YouTubeTranscriptApi
+            self._fetch_fn = YouTubeTranscriptApi.get_transcript
             logger.info("Using get_transcript (static method)")
         elif hasattr(YouTubeTranscriptApi, 'fetch'):
             self.api_method = 'fetch'
             self.api_instance = YouTubeTranscriptApi()
+            self._fetch_fn = self._fetch_per_thread
             logger.info("Using fetch (instance method)")
         else:
             available_methods = [m for m in dir(YouTubeTranscriptApi) if not m.startswith('_')]
             raise ImportError(f"Neither 'fetch' nor 'get_transcript' method found. Available: {available_methods}")
     
+    def _fetch_per_thread(self, video_id: str, **kwargs):
+        """Call fetch on this thread's own API instance
+        
+        YouTubeTranscriptApi wraps a requests.Session and is not thread-safe,
+        so each worker thread gets its own instance.
+        """
+        instance = getattr(self._thread_state, 'api_instance', None)
+        if instance is None:
+            instance = self._thread_state.api_instance = self.transcript_api(http_client=self._thread_http_session())
+        return instance.fetch(video_id, **kwargs)
+    
     def _validate_video_id(self, video_id: str) -> bool:
         """Validate YouTube video ID format"""
         pattern = r'^[a-zA-Z0-9_-]{11}$'
@@ -94,48 +305,69 @@ class TranscriptExtractor:
     
     def _get_next_proxy(self) -> Optional[str]:
         """Get next working proxy from rotation"""
-        if not self.use_proxies or not self.proxy_cycle:
+        if not self.use_proxies or not self.proxy_list:
             return None
         
-        attempts = 0
-        while attempts < len(self.proxy_list):
-            proxy = next(self.proxy_cycle)
-            if proxy not in self.failed_proxies:
-                return proxy
-            attempts += 1
-        
-        # All proxies failed, reset failed list and try again
-        logger.warning("All proxies failed, resetting failed proxy list")
-        self.failed_proxies.clear()
-        return next(self.proxy_cycle) if self.proxy_cycle else None
+        with self._proxy_lock:
+            # Proxies whose cooldown has expired rejoin the back of the rotation
+            now = time.monotonic()
+            while self._proxy_cooldown and self._proxy_cooldown[0][0] <= now:
+                self._healthy_proxies.append(heapq.heappop(self._proxy_cooldown)[1])
+            
+            if not self._healthy_proxies:
+                # All proxies failed; bring back the one that has been cooling longest
+                logger.warning("All proxies failed, retrying the least recently failed proxy")
+                self._healthy_proxies.append(heapq.heappop(self._proxy_cooldown)[1])
+            
+            proxy = self._healthy_proxies.popleft()
+            self._healthy_proxies.append(proxy)
+            return proxy
+    
+    def _thread_http_session(self):
+        """This thread's requests.Session, reused by its API instance for every video
+        
+        Connections stay alive across transcripts, so each video skips the
+        TCP/TLS handshake.
+        """
+        session = getattr(self._thread_state, 'http_session', None)
+        if session is None:
+            import requests
+            session = self._thread_state.http_session = requests.Session()
+        return session
     
     def _setup_proxy_session(self, proxy: str = None):
-        """Setup requests session with proxy if needed"""
+        """Route this thread's session through proxy if needed
+        
+        The proxy is swapped on the existing session rather than building a new
+        one. Proxies are not probed up front; one that fails a real request is
+        put on cooldown by _mark_proxy_failed instead.
+        """
         if not proxy or not self.use_proxies:
             return None
         
-        try:
-            import requests
-            session = requests.Session()
-            session.proxies = {
-                'http': proxy,
-                'https': proxy
-            }
-            # Test proxy with a quick request
-            session.get('https://httpbin.org/ip', timeout=5)
-            self.current_proxy = proxy
-            return session
-        except Exception as e:
-            logger.warning(f"Proxy {proxy} failed: {e}")
+        session = self._thread_http_session()
+        session.proxies = {
+            'http': proxy,
+            'https': proxy
+        }
+        self._thread_state.proxy = self.current_proxy = proxy
+        return session
+    
+    def _mark_proxy_failed(self, proxy: str):
+        """Take proxy out of rotation for PROXY_COOLDOWN_SECONDS"""
+        with self._proxy_lock:
+            if proxy not in self._healthy_proxies:
+                return  # Already cooling down
+            self._healthy_proxies.remove(proxy)
+            heapq.heappush(self._proxy_cooldown, (time.monotonic() + PROXY_COOLDOWN_SECONDS, proxy))
             self.failed_proxies.add(proxy)
-            return None
     
     def _rate_limited_request(self, func, *args, **kwargs):
         """Execute function with rate limiting and retry logic"""
         for attempt in range(self.max_retries):
             try:
                 # Handle proxy rotation if enabled
-                if self.use_proxies and (attempt > 0 or not self.current_proxy):
+                if self.use_proxies and (attempt > 0 or not getattr(self._thread_state, 'proxy', None)):
                     proxy = self._get_next_proxy()
                     if proxy:
                         session = self._setup_proxy_session(proxy)
@@ -150,42 +382,44 @@ class TranscriptExtractor:
                 result = func(*args, **kwargs)
                 
                 # Update request tracking
-                self.request_count += 1
-                self.last_request_time = time.time()
+                # (last_request_time was already claimed when the slot was reserved)
+                with self._rate_lock:
+                    self.request_count += 1
+                self._record_outcome(throttled=False)
                 
                 return result
                 
+            except PERMANENT_TRANSCRIPT_ERRORS:
+                # No transcript to be had for this video, don't retry
+                raise
+                
             except Exception as e:
-                error_msg = str(e).lower()
+                error_msg = str(e)
                 
                 # Categorize errors for retry logic
-                if any(phrase in error_msg for phrase in [
-                    'ipblocked', 'ip blocked', 'blocking requests from your ip',
-                    'requestblocked', 'request blocked'
-                ]):
+                if isinstance(e, BLOCKED_ERRORS) or BLOCKED_PATTERN.search(error_msg):
                     # IP blocked - need longer cooling off period
                     self.ip_blocked = True
+                    self._record_outcome(throttled=True)
                     delay = 300 + (attempt * 180)  # 5-14 minutes escalating
                     logger.error(f"IP BLOCKED by YouTube (attempt {attempt + 1}/{self.max_retries}). Cooling off for {delay/60:.1f} minutes...")
                     logger.error(f"Consider using --use-proxies option or waiting longer between batches")
-                    time.sleep(delay)
+                    self._pause_requests(delay)
                     continue
                     
-                elif any(phrase in error_msg for phrase in [
-                    'rate limit', 'too many requests', '429', 'quota exceeded'
-                ]):
+                elif RATE_LIMIT_PATTERN.search(error_msg):
+                    self._record_outcome(throttled=True)
                     delay = self._calculate_backoff_delay(attempt)
                     logger.warning(f"Rate limit hit (attempt {attempt + 1}/{self.max_retries}). Waiting {delay:.1f}s...")
-                    time.sleep(delay)
+                    self._pause_requests(delay)
                     continue
                 
-                elif any(phrase in error_msg for phrase in [
-                    'timeout', 'connection', 'temporary', '503', '502', 'proxy'
-                ]):
+                elif TRANSIENT_PATTERN.search(error_msg):
                     # Try different proxy or increase delay
-                    if self.use_proxies and self.current_proxy:
-                        self.failed_proxies.add(self.current_proxy)
-                        self.current_proxy = None
+                    failed_proxy = getattr(self._thread_state, 'proxy', None)
+                    if self.use_proxies and failed_proxy:
+                        self._mark_proxy_failed(failed_proxy)
+                        self._thread_state.proxy = None
                     
                     delay = self._calculate_backoff_delay(attempt)
                     logger.warning(f"Temporary error (attempt {attempt + 1}/{self.max_retries}): {e}. Retrying in {delay:.1f}s...")
@@ -198,29 +432,84 @@ class TranscriptExtractor:
         
         raise Exception(f"Failed after {self.max_retries} attempts")
     
+    def _acquire_fetch_slot(self):
+        """Block until fewer than the current in-flight limit of fetches are running"""
+        with self._slot_cond:
+            while self._inflight >= self._inflight_limit:
+                self._slot_cond.wait()
+            self._inflight += 1
+    
+    def _release_fetch_slot(self):
+        with self._slot_cond:
+            self._inflight -= 1
+            self._slot_cond.notify()
+    
+    def _record_outcome(self, throttled: bool):
+        """Adapt the in-flight limit to how often recent requests were throttled"""
+        with self._slot_cond:
+            self._recent_outcomes.append(throttled)
+            throttle_rate = sum(self._recent_outcomes) / len(self._recent_outcomes)
+            now = time.monotonic()
+            
+            if throttle_rate > THROTTLE_BACKOFF_RATE and self._inflight_limit > 1:
+                self._inflight_limit //= 2
+                self._recent_outcomes.clear()
+                self._last_limit_change = now
+                logger.warning(f"Throttling detected, reducing concurrent fetches to {self._inflight_limit}")
+            elif (throttle_rate < THROTTLE_GROW_RATE
+                  and len(self._recent_outcomes) == OUTCOME_WINDOW
+                  and self._inflight_limit < self._max_inflight
+                  and now - self._last_limit_change >= CONCURRENCY_GROW_INTERVAL):
+                self._inflight_limit += 1
+                self._last_limit_change = now
+                self._slot_cond.notify()
+                logger.info(f"No recent throttling, raising concurrent fetches to {self._inflight_limit}")
+    
     def _wait_for_rate_limit(self):
-        """Implement intelligent rate limiting with adaptive delays"""
-        current_time = time.time()
+        """Implement intelligent rate limiting with adaptive delays
+        
+        Each caller reserves the next request slot under the lock and sleeps
+        outside it, so concurrent workers stay paced without serializing.
+        """
+        with self._rate_lock:
+            sleep_time = self._reserve_request_slot()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+    
+    def _pause_requests(self, delay: float):
+        """Hold back every worker's next request slot by delay seconds
+        
+        Blocks and rate limits apply to the whole IP, so the pause is shared
+        through the slot schedule rather than slept by the worker that hit it;
+        its retry waits in _wait_for_rate_limit like everyone else's.
+        """
+        with self._rate_lock:
+            self.last_request_time = max(self.last_request_time, time.monotonic() + delay)
+    
+    def _reserve_request_slot(self) -> float:
+        """Claim the next request start time and return how long to wait for it"""
+        current_time = time.monotonic()
         time_since_last = current_time - self.last_request_time
         
+        # Slide the one-minute window forward
+        request_times = self._request_times
+        while request_times and current_time - request_times[0] > 60:
+            request_times.popleft()
+        
         # If recently IP blocked, use very conservative delays
         if self.ip_blocked:
             base_delay = self.max_delay * 2  # Very conservative
         else:
-            # Calculate adaptive delay based on request frequency
-            if self.request_count > 0:
-                time_window = max((current_time - self.last_request_time) / 60, 1)
-                requests_per_minute = self.request_count / time_window
-                
-                # Much more conservative limits
-                if requests_per_minute > 10:  # Reduced from 30
-                    base_delay = self.max_delay
-                elif requests_per_minute > 5:  # Reduced from 15
-                    base_delay = self.min_delay * 3
-                elif requests_per_minute > 3:  # Reduced from 10
-                    base_delay = self.min_delay * 2
-                else:
-                    base_delay = self.min_delay
+            # Calculate adaptive delay based on requests in the last minute
+            requests_per_minute = len(request_times)
+            
+            # Much more conservative limits
+            if requests_per_minute > 10:  # Reduced from 30
+                base_delay = self.max_delay
+            elif requests_per_minute > 5:  # Reduced from 15
+                base_delay = self.min_delay * 3
+            elif requests_per_minute > 3:  # Reduced from 10
+                base_delay = self.min_delay * 2
             else:
                 base_delay = self.min_delay
         
@@ -228,9 +517,10 @@ class TranscriptExtractor:
         jitter = random.uniform(0.2, 0.5)  # Increased jitter
         total_delay = base_delay + jitter
         
-        if time_since_last < total_delay:
-            sleep_time = total_delay - time_since_last
-            time.sleep(sleep_time)
+        sleep_time = max(total_delay - time_since_last, 0.0)
+        self.last_request_time = current_time + sleep_time
+        request_times.append(self.last_request_time)
+        return sleep_time
     
     def _calculate_backoff_delay(self, attempt: int) -> float:
         """Calculate exponential backoff delay with jitter"""
@@ -240,31 +530,52 @@ class TranscriptExtractor:
         return max_delay * jitter
     
     def _fetch_transcript_adaptive(self, video_id: str) -> List[Dict]:
-        """Adaptively fetch transcript using detected API method"""
-        if self.api_method == 'fetch':
-            return self.api_instance.fetch(video_id, languages=['en'])
-        elif self.api_method == 'get_transcript':
-            return self.api_instance.get_transcript(video_id, languages=['en'])
-        else:
-            raise Exception(f"Unknown API method: {self.api_method}")
+        """Fetch transcript using the API method resolved at setup"""
+        return self._fetch_fn(video_id, languages=['en'])
     
     def _extract_text_adaptive(self, transcript_list: List) -> str:
         """Extract text from transcript list, handling different return types"""
         if not transcript_list:
             return ''
         
-        first_item = transcript_list[0]
+        # Segment type depends on the API method; resolve the getter once
+        if self._extract_fn is None:
+            first_item = transcript_list[0]
+            
+            # Handle object with .text attribute (fetch method)
+            if hasattr(first_item, 'text'):
+                self._extract_fn = attrgetter('text')
+            
+            # Handle dict with 'text' key (get_transcript method)
+            elif isinstance(first_item, dict) and 'text' in first_item:
+                self._extract_fn = itemgetter('text')
+            
+            else:
+                raise Exception(f"Unknown transcript format: {type(first_item)}")
         
-        # Handle object with .text attribute (fetch method)
-        if hasattr(first_item, 'text'):
-            return ' '.join([item.text for item in transcript_list])
+        return ' '.join(map(self._extract_fn, transcript_list))
+    
+    def _load_cached_transcript(self, video_id: str) -> Optional[Dict]:
+        """Return a cached transcript result if one exists and is within the TTL"""
+        if not self.cache_dir:
+            return None
         
-        # Handle dict with 'text' key (get_transcript method)
-        elif isinstance(first_item, dict) and 'text' in first_item:
-            return ' '.join([item['text'] for item in transcript_list])
+        cache_file = self.cache_dir / f"{video_id}.json"
+        try:
+            if time.time() - cache_file.stat().st_mtime > TRANSCRIPT_CACHE_TTL_SECONDS:
+                return None
+            data = cache_file.read_bytes()
+            return orjson.loads(data) if orjson else json.loads(data)
+        except (OSError, ValueError):
+            return None
+    
+    def _cache_transcript(self, result: Dict):
+        """Store a successful transcript result in the on-disk cache"""
+        if not self.cache_dir:
+            return
         
-        else:
-            raise Exception(f"Unknown transcript format: {type(first_item)}")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(self.cache_dir / f"{result['video_id']}.json", result, compact=True)
     
     def get_transcript(self, video_id: str) -> Optional[Dict]:
         """Extract transcript for a single video with robust error handling"""
@@ -283,11 +594,22 @@ class TranscriptExtractor:
                 'error': 'Invalid video ID format'
             }
         
+        cached = self._load_cached_transcript(video_id)
+        if cached:
+            logger.info(f"Using cached transcript for {video_id}")
+            return cached
+        
         try:
-            # Use rate-limited request with adaptive API method
-            transcript_list = self._rate_limited_request(
-                self._fetch_transcript_adaptive, video_id
-            )
+            # Use rate-limited request with adaptive API method. Only the network
+            # call holds a fetch slot; text cleanup and claim extraction run after
+            # it is released, overlapping other workers' requests.
+            self._acquire_fetch_slot()
+            try:
+                transcript_list = self._rate_limited_request(
+                    self._fetch_transcript_adaptive, video_id
+                )
+            finally:
+                self._release_fetch_slot()
             
             # Extract text adaptively based on return type
             full_text = self._extract_text_adaptive(transcript_list)
@@ -295,15 +617,18 @@ class TranscriptExtractor:
             # Clean up transcript artifacts
             full_text = self.clean_transcript(full_text)
             
-            return {
+            result = {
                 'video_id': video_id,
                 'transcript_available': True,
                 'full_text': full_text,
-                'word_count': len(full_text.split()),
+                # clean_transcript collapsed whitespace to single spaces
+                'word_count': full_text.count(' ') + 1 if full_text else 0,
                 'transcript_segments': len(transcript_list),
                 'api_method_used': self.api_method,
-                'proxy_used': self.current_proxy if self.use_proxies else None
+                'proxy_used': getattr(self._thread_state, 'proxy', None) if self.use_proxies else None
             }
+            self._cache_transcript(result)
+            return result
             
         except Exception as e:
             error_msg = str(e)
@@ -332,63 +657,86 @@ class TranscriptExtractor:
     
     def clean_transcript(self, text: str) -> str:
         """Clean up transcript text"""
-        import re
-        
-        # Remove common artifacts
-        text = re.sub(r'\[Music\]', '', text)
-        text = re.sub(r'\[Applause\]', '', text)
-        text = re.sub(r'\[Laughter\]', '', text)
-        
-        # Fix common transcription errors
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces
-        text = text.strip()
-        
-        return text
+        # Remove common artifacts, then collapse whitespace
+        text = ARTIFACT_PATTERN.sub('', text)
+        return WHITESPACE_PATTERN.sub(' ', text).strip()
     
     def extract_medical_claims(self, transcript_text: str) -> List[Dict]:
         """Extract medical claims from transcript using improved patterns"""
-        import re
-        
         claims = []
         
-        # Enhanced patterns for Dr. Berg's speaking style
-        patterns = [
-            # Direct recommendations
-            (r'if you have (.{5,40}),?\s*(?:you should|try|take|do)\s*(.{5,60})', 'recommendation'),
-            
-            # Deficiency patterns
-            (r'(.{5,40})\s*deficiency\s*(?:causes?|leads? to|results? in)\s*(.{5,60})', 'deficiency_cause'),
-            (r'(?:signs?|symptoms?)\s*of\s*(.{5,40})\s*deficiency[:\s]*(.{5,100})', 'deficiency_symptoms'),
-            
-            # Causation patterns
-            (r'(.{5,40})\s*(?:is caused by|comes from|results from)\s*(.{5,60})', 'causation'),
-            
-            # Best/top recommendations
-            (r'(?:best|top)\s*(?:thing|way|food|supplement|vitamin)\s*for\s*(.{5,40})\s*is\s*(.{5,60})', 'best_for'),
-            
-            # Body signals
-            (r'(?:when|if)\s*your body\s*(.{5,60}),?\s*(?:it means|that means)\s*(.{5,60})', 'body_signal'),
-            
-            # Problem-solution
-            (r'(?:the problem with|issue with)\s*(.{5,40})\s*is\s*(.{5,60})', 'problem_identified')
-        ]
-        
-        for pattern, claim_type in patterns:
-            matches = re.findall(pattern, transcript_text, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                if isinstance(match, tuple) and len(match) == 2:
-                    claims.append({
-                        'claim_type': claim_type,
-                        'subject': match[0].strip(),
-                        'predicate': match[1].strip(),
-                        'confidence': 'medium',  # From transcript vs title/description
-                        'pattern_used': pattern
-                    })
+        # Cue text of every group that matched (patterns sharing a cue share its text)
+        present_cues = {CLAIM_PATTERNS[int(m.lastgroup[3:])][2] for m in CLAIM_CUE_PATTERN.finditer(transcript_text)}
+        
+        for pattern, claim_type, cue in CLAIM_PATTERNS:
+            if cue not in present_cues:
+                continue
+            for match in pattern.finditer(transcript_text):
+                subject, predicate = match.groups()
+                claims.append({
+                    'claim_type': claim_type,
+                    'subject': subject.strip(),
+                    'predicate': predicate.strip(),
+                    'confidence': 'medium',  # From transcript vs title/description
+                    'pattern_used': pattern.pattern
+                })
         
         return claims
     
-    def process_video_transcripts(self, exploration_data=None, exploration_data_file: str = None, output_filename: str = 'data/processed/berg_exploration_with_transcripts_v3.json', batch_size: int = None, start_index: int = 0, save_frequency: int = 10, min_duration: int = None, max_duration: int = None) -> Dict:
-        """Process transcripts for all videos in exploration data"""
+    def _load_checkpoint(self, checkpoint_file: str) -> Dict[str, Dict]:
+        """Load enhanced videos saved by an interrupted run, keyed by video_id"""
+        records = {}
+        if not os.path.exists(checkpoint_file):
+            return records
+        
+        with open(checkpoint_file, 'rb') as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line) if orjson else json.loads(line)
+                except ValueError:
+                    continue  # Torn final line from a crash mid-write
+                records[record['video_id']] = record
+        return records
+    
+    def _process_video(self, video: Dict) -> Dict:
+        """Fetch one video's transcript and merge it and its claims into the video record"""
+        # Rate limiting handled by _rate_limited_request
+        transcript_result = self.get_transcript(video['video_id'])
+        
+        if transcript_result and transcript_result['transcript_available']:
+            # Extract claims from transcript
+            claims = self.extract_medical_claims(transcript_result['full_text'])
+            logger.info(f"✓ Extracted {len(claims)} claims from transcript ({transcript_result['word_count']} words)")
+            
+            # Combine with existing video data
+            return {
+                **video,
+                'transcript': transcript_result,
+                'transcript_claims': claims,
+                'total_claims': len(video.get('basic_claims', [])) + len(claims)
+            }
+        
+        # Keep video data without transcript
+        logger.warning(f"✗ No transcript available")
+        return {
+            **video,
+            'transcript': transcript_result or {'transcript_available': False},
+            'transcript_claims': [],
+            'total_claims': len(video.get('basic_claims', []))
+        }
+    
+    def process_video_transcripts(self, exploration_data=None, exploration_data_file: str = None, output_filename: str = 'data/processed/berg_exploration_with_transcripts_v3.json', batch_size: int = None, start_index: int = 0, save_frequency: int = 10, min_duration: int = None, max_duration: int = None, max_workers: int = 1, compact_json: bool = False) -> Dict:
+        """Process transcripts for all videos in exploration data
+        
+        max_workers > 1 fetches up to that many transcripts at once; request
+        starts are still paced by the shared rate limiter, and the number in
+        flight shrinks while YouTube is throttling and regrows once it stops. compact_json skips
+        pretty-printing the output, which is much smaller and faster to write.
+        """
+        
+        filtering = min_duration is not None or max_duration is not None
+        keep = _duration_filter(min_duration, max_duration)
+        videos = None
         
         # Support both in-memory data and file-based input for backward compatibility
         if exploration_data is not None:
@@ -396,8 +744,14 @@ class TranscriptExtractor:
         elif exploration_data_file is not None:
             # Load existing exploration data from file
             try:
-                with open(exploration_data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                if ijson:
+                    # Filter videos as they are parsed instead of materializing the whole file
+                    data, videos, original_video_count = _stream_exploration_data(
+                        exploration_data_file, keep if filtering else lambda video: True
+                    )
+                else:
+                    with open(exploration_data_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
             except FileNotFoundError:
                 logger.error(f"Exploration data file {exploration_data_file} not found")
                 return {}
@@ -405,26 +759,14 @@ class TranscriptExtractor:
             logger.error("Must provide either exploration_data or exploration_data_file")
             return {}
         
-        videos = data.get('videos', [])
-        original_video_count = len(videos)
+        if videos is None:
+            videos = data.get('videos', [])
+            original_video_count = len(videos)
+            if filtering:
+                videos = [video for video in videos if keep(video)]
         
-        # Apply duration filtering if specified
-        if min_duration is not None or max_duration is not None:
-            filtered_videos = []
-            for video in videos:
-                duration = video.get('duration_seconds', 0)
-                
-                # Check minimum duration
-                if min_duration is not None and duration < min_duration:
-                    continue
-                    
-                # Check maximum duration  
-                if max_duration is not None and duration > max_duration:
-                    continue
-                    
-                filtered_videos.append(video)
-            
-            videos = filtered_videos
+        # Report duration filtering if specified
+        if filtering:
             logger.info(f"Duration filtering: {original_video_count} -> {len(videos)} videos")
             if min_duration and max_duration:
                 logger.info(f"Filter range: {min_duration//60}:{min_duration%60:02d} to {max_duration//60}:{max_duration%60:02d}")
@@ -446,56 +788,60 @@ class TranscriptExtractor:
         else:
             logger.info(f"Processing {len(videos)} videos...")
         
-        # Process each video
-        transcript_data = []
-        success_count = 0
-        failed_videos = []
+        # Transcripts checkpointed by an interrupted run are reused instead of
+        # refetched; videos whose fetch failed there (blocked IP, proxy errors,
+        # retries exhausted) are retried
+        checkpoint_file = f"{output_filename}.partial.jsonl"
+        records = {
+            video_id: record for video_id, record in self._load_checkpoint(checkpoint_file).items()
+            if record['transcript'].get('transcript_available')
+        }
+        pending = [(i, video) for i, video in enumerate(videos) if video['video_id'] not in records]
+        done_count = success_count = len(videos) - len(pending)
+        if done_count:
+            logger.info(f"Resuming from checkpoint: {done_count}/{len(videos)} transcripts already in {checkpoint_file}")
+        
+        # Process each video (concurrently when max_workers > 1; output order is preserved)
+        def process_one(item):
+            i, video = item
+            logger.info(f"Processing {start_index + i + 1}/{total_videos} ({i+1}/{len(videos)} in batch): {video['title'][:50]}...")
+            return self._process_video(video)
+        
+        self._max_inflight = self._inflight_limit = max(1, max_workers)
+        if max_workers > 1:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            results = executor.map(process_one, pending)
+        else:
+            executor = None
+            results = map(process_one, pending)
         
-        for i, video in enumerate(videos):
-            video_id = video['video_id']
-            title = video['title']
-            
-            current_index = start_index + i + 1
-            logger.info(f"Processing {current_index}/{total_videos} ({i+1}/{len(videos)} in batch): {title[:50]}...")
-            
-            # Get transcript
-            transcript_result = self.get_transcript(video_id)
-            
-            if transcript_result and transcript_result['transcript_available']:
-                # Extract claims from transcript
-                claims = self.extract_medical_claims(transcript_result['full_text'])
-                
-                # Combine with existing video data
-                enhanced_video = {
-                    **video,
-                    'transcript': transcript_result,
-                    'transcript_claims': claims,
-                    'total_claims': len(video.get('basic_claims', [])) + len(claims)
-                }
-                
-                transcript_data.append(enhanced_video)
-                success_count += 1
-                
-                logger.info(f"✓ Extracted {len(claims)} claims from transcript ({transcript_result['word_count']} words)")
-            else:
-                # Keep video data without transcript
-                enhanced_video = {
-                    **video,
-                    'transcript': transcript_result or {'transcript_available': False},
-                    'transcript_claims': [],
-                    'total_claims': len(video.get('basic_claims', []))
-                }
-                transcript_data.append(enhanced_video)
-                logger.warning(f"✗ No transcript available")
-            
-            # Rate limiting handled by _rate_limited_request
-            
-            # Progress update and incremental save
-            if (i + 1) % save_frequency == 0:
-                logger.info(f"Progress: {i+1}/{len(videos)} processed, {success_count} transcripts extracted")
-                # Save progress periodically
-            elif (i + 1) % 10 == 0:
-                logger.info(f"Progress: {i+1}/{len(videos)} processed, {success_count} transcripts extracted")
+        Path(checkpoint_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(checkpoint_file, 'ab') as checkpoint:
+            try:
+                for done, enhanced_video in enumerate(results, done_count + 1):
+                    records[enhanced_video['video_id']] = enhanced_video
+                    checkpoint.write(_json_line(enhanced_video))
+                    if enhanced_video['transcript'].get('transcript_available'):
+                        success_count += 1
+                    
+                    # Progress update and incremental save
+                    if done % save_frequency == 0:
+                        checkpoint.flush()
+                        logger.info(f"Progress: {done}/{len(videos)} processed, {success_count} transcripts extracted (checkpointed)")
+                    elif done % 10 == 0:
+                        logger.info(f"Progress: {done}/{len(videos)} processed, {success_count} transcripts extracted")
+            finally:
+                if executor:
+                    executor.shutdown(wait=True)
+        
+        # Assemble output in input order, totalling claims in the same pass
+        transcript_data = []
+        total_transcript_claims = total_claims = 0
+        for video in videos:
+            enhanced_video = records[video['video_id']]
+            transcript_data.append(enhanced_video)
+            total_transcript_claims += len(enhanced_video.get('transcript_claims', []))
+            total_claims += enhanced_video.get('total_claims', 0)
         
         # Create enhanced dataset
         enhanced_data = {
@@ -505,17 +851,19 @@ class TranscriptExtractor:
                 'total_videos': len(videos),
                 'transcripts_extracted': success_count,
                 'transcript_success_rate': round(success_count / len(videos) * 100, 1),
-                'total_transcript_claims': sum(len(v.get('transcript_claims', [])) for v in transcript_data),
-                'avg_claims_per_video': round(sum(v.get('total_claims', 0) for v in transcript_data) / len(transcript_data), 1)
+                'total_transcript_claims': total_transcript_claims,
+                'avg_claims_per_video': round(total_claims / len(transcript_data), 1)
             }
         }
         
         # Save enhanced data
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(enhanced_data, f, indent=2, ensure_ascii=False)
+        _write_json_with_list(output_filename, enhanced_data, 'videos', compact=compact_json)
         
         logger.info(f"Enhanced data saved to {output_filename}")
         
+        # The full output now supersedes the checkpoint
+        os.remove(checkpoint_file)
+        
         # Print summary
         print(f"\nTRANSCRIPT EXTRACTION SUMMARY:")
         print(f"{'='*40}")
@@ -541,6 +889,9 @@ def main():
     parser.add_argument('--save-frequency', type=int, default=10, help='Save progress every N videos (default: 10)')
     parser.add_argument('--min-duration', type=int, help='Minimum video duration in seconds (e.g., 120 for 2 minutes)')
     parser.add_argument('--max-duration', type=int, help='Maximum video duration in seconds (e.g., 300 for 5 minutes)')
+    parser.add_argument('--workers', type=int, default=1, help='Fetch N transcripts concurrently (default: 1)')
+    parser.add_argument('--no-cache', action='store_true', help=f'Always refetch transcripts instead of using {TRANSCRIPT_CACHE_DIR}')
+    parser.add_argument('--compact-json', action='store_true', help='Write output JSON without indentation (smaller, faster)')
     parser.add_argument('--auto-filename', action='store_true', help='Auto-generate output filename based on duration filter')
     
     args = parser.parse_args()
@@ -588,7 +939,8 @@ def main():
     # Initialize extractor with proxy configuration
     extractor = TranscriptExtractor(
         use_proxies=args.use_proxies,
-        proxy_list=proxy_list
+        proxy_list=proxy_list,
+        cache_dir=None if args.no_cache else TRANSCRIPT_CACHE_DIR
     )
     
     if not extractor.transcript_api:
@@ -611,7 +963,9 @@ def main():
         start_index=args.start_index,
         save_frequency=args.save_frequency,
         min_duration=args.min_duration,
-        max_duration=args.max_duration
+        max_duration=args.max_duration,
+        max_workers=args.workers,
+        compact_json=args.compact_json
     )
     
     if result:
@@ -6,21 +6,43 @@ Supports parallel processing with multiple simultaneous batch operations
 """
 
 import os
+import atexit
+import base64
 import json
 import time
 import logging
+import logging.handlers
+import math
+import queue
 import random
 import re
+import sqlite3
 import threading
+import zlib
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
-from functools import wraps
-from itertools import cycle
+from functools import lru_cache, partial, wraps
+from operator import attrgetter, itemgetter
+from itertools import islice
 from datetime import datetime, timedelta
+from pathlib import Path
+
+from processed_index import append_processed_ids
+
+try:
+    import orjson  # Optional fast JSON codec
+except ImportError:
+    orjson = None
 
 # Load environment variables
 def load_env_file():
+    # Parse .env once per process tree; child processes inherit the result
+    if os.environ.get('_BERG_ENV_LOADED'):
+        return
+    os.environ['_BERG_ENV_LOADED'] = '1'
+    
     env_paths = ['.env', '../.env', '../../.env']
     for env_path in env_paths:
         try:
@@ -37,14 +59,171 @@ def load_env_file():
 
 load_env_file()
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(name)s] %(levelname)s: %(message)s')
+def _setup_logging():
+    """Log through a queue so worker threads never block on stream writes
+    
+    Records are enqueued by the calling thread; a listener thread formats and
+    writes them. Does nothing if logging is already configured, like basicConfig.
+    """
+    if logging.getLogger().handlers:
+        return
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s [%(name)s] %(levelname)s: %(message)s'))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)  # Flushes queued records on exit
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+_setup_logging()
 logger = logging.getLogger(__name__)
 
+# On-disk transcript cache, one file per video. Unavailable videos are cached
+# briefly so re-runs don't keep spending requests on them.
+TRANSCRIPT_CACHE_DIR = 'data/cache/human_batch_transcripts'
+TRANSCRIPT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+UNAVAILABLE_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Processed-video database: one JSON record per line plus a small metadata
+# sidecar, so appends don't rewrite earlier records. Transcript text is stored
+# zlib-compressed (see compress_transcript); consolidate_database() rebuilds
+# the plain monolithic JSON that other scripts read.
+DATABASE_FILE = 'data/processed/berg_complete_database.jsonl'
+DATABASE_META_FILE = 'data/processed/berg_complete_database.meta.json'
+LEGACY_DATABASE_FILE = 'data/processed/berg_complete_database.json'
+
+# Proxy health: a proxy is evicted once it has PROXY_EVICT_MIN_FAILURES failures
+# making up more than PROXY_EVICT_FAILURE_RATIO of its requests. Selection
+# favours proxies that have rested for a few PROXY_REST_SECONDS.
+PROXY_EVICT_MIN_FAILURES = 3
+PROXY_EVICT_FAILURE_RATIO = 0.8
+PROXY_REST_SECONDS = 300
+
+# Proxy health shared across parallel scripts; a proxy blocked by any of them
+# is skipped by all for PROXY_BLOCK_SKIP_SECONDS
+PROXY_HEALTH_DB = 'data/cache/proxy_health.db'
+PROXY_BLOCK_SKIP_SECONDS = 600
+
+# Per-request timeout for transcript fetches (youtube-transcript-api sets none)
+REQUEST_TIMEOUT_SECONDS = 15
+
+# Up-front liveness probe run through every proxy before the first batch
+PROXY_PROBE_URL = 'https://www.youtube.com/'
+PROXY_PROBE_TIMEOUT_SECONDS = 3
+PROXY_PROBE_WORKERS = 64
+
+# One line per finished video on stdout (logs go to stderr); the VPN
+# orchestrator counts them to start its next switch while this process winds down
+VIDEO_SUCCESS_LINE = "Successfully processed video {video_id}\n"
+VIDEO_FAILURE_LINE = "Failed to process video {video_id}\n"
+VIDEO_SKIPPED_LINE = "Skipped already processed video {video_id}\n"
+_stdout_lock = threading.Lock()  # Keeps result lines from worker threads whole
+
+def _report_video_result(video_id: str, success: bool):
+    """Print the per-video result line and flush it at once"""
+    line = (VIDEO_SUCCESS_LINE if success else VIDEO_FAILURE_LINE).format(video_id=video_id)
+    with _stdout_lock:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+def _report_skipped_videos(video_ids):
+    """Print a skipped line for each video that needs no work, flushed together"""
+    lines = ''.join(VIDEO_SKIPPED_LINE.format(video_id=video_id) for video_id in video_ids)
+    if lines:
+        with _stdout_lock:
+            sys.stdout.write(lines)
+            sys.stdout.flush()
+
+def _read_json(path):
+    """Load a JSON file, via orjson when available"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _write_json(path, obj, compact=False):
+    """Serialize obj as UTF-8 JSON (indented unless compact) and atomically replace path"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        payload = orjson.dumps(obj, option=option)
+    elif compact:
+        payload = json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    else:
+        payload = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    tmp_path = f"{path}.tmp"
+    Path(tmp_path).write_bytes(payload)
+    os.replace(tmp_path, path)
+
+def _json_line(obj) -> bytes:
+    """Encode obj as a single compact JSON line"""
+    if orjson:
+        return orjson.dumps(obj) + b'\n'
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+# Patterns compiled once: video id format and transcript cleanup
+VIDEO_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{11}$')
+ARTIFACT_PATTERN = re.compile(r'\[(?:Music|Applause|Laughter)\]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+class SharedProxyHealth:
+    """Proxy success/failure counts and last block time in a SQLite file
+    
+    Every extractor process opens the same file, so a block seen by one
+    parallel script is visible to the others on their next rotation. SQLite's
+    own file locking serializes the writers.
+    """
+    
+    def __init__(self, db_file: str = PROXY_HEALTH_DB):
+        self.db_file = db_file
+        self._local = threading.local()  # sqlite3 connections are per thread
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS proxy_health ("
+            "url TEXT PRIMARY KEY, successes INTEGER NOT NULL DEFAULT 0, "
+            "failures INTEGER NOT NULL DEFAULT 0, last_block_ts REAL)"
+        )
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_file, timeout=10, isolation_level=None)
+        return conn
+    
+    def record(self, proxy: str, success: bool, blocked: bool = False):
+        """Add one request outcome for a proxy"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO proxy_health (url, successes, failures, last_block_ts) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET successes = successes + excluded.successes, "
+                "failures = failures + excluded.failures, "
+                "last_block_ts = COALESCE(excluded.last_block_ts, last_block_ts)",
+                (proxy, int(success), int(not success), time.time() if blocked else None)
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def recently_blocked(self, window: float = PROXY_BLOCK_SKIP_SECONDS) -> set:
+        """Proxies any process saw blocked within the last window seconds"""
+        rows = self._connection().execute(
+            "SELECT url FROM proxy_health WHERE last_block_ts > ?", (time.time() - window,)
+        )
+        return {url for (url,) in rows}
+
 class HumanLikeBatchExtractor:
-    def __init__(self, use_proxies: bool = True, proxy_list: List[str] = None):
+    def __init__(self, use_proxies: bool = True, proxy_list: List[str] = None, max_workers: int = 1,
+                 cache_dir: Optional[str] = TRANSCRIPT_CACHE_DIR, refresh_cache: bool = False,
+                 phase_offset_minutes: float = 0, proxy_health_db: Optional[str] = PROXY_HEALTH_DB):
         # API method detection
         self.api_method = None
         self.api_instance = None
+        self._text_getter = None  # Segment -> text, resolved with the API method
+        self._thread_state = threading.local()  # Per-worker proxy and API instances
         
         self.setup_transcript_api()
         
@@ -52,6 +231,9 @@ class HumanLikeBatchExtractor:
         self.min_video_delay = 8.0   # 8-20 seconds between videos
         self.max_video_delay = 20.0
         self.batch_wait_times = [20, 22, 30, 23, 22]  # Minutes between batches
+        self.batch_wait_jitter = 5.0  # +/- minutes, wide enough to desync parallel scripts
+        self.phase_offset_minutes = phase_offset_minutes  # Added to the first break only
+        self.cancel = threading.Event()  # Set from any thread to end a break and stop further batches
         self.current_batch = 0
         
         # Rate limiting (conservative for human-like behavior)
@@ -59,13 +241,30 @@ class HumanLikeBatchExtractor:
         self.last_request_time = 0
         self.max_retries = 3
         self.ip_blocked = False
+        self._next_allowed_time = {}  # Proxy (None = direct) -> monotonic time of its next request slot
+        self._pace_lock = threading.Lock()
         
         # Proxy configuration
         self.use_proxies = use_proxies
         self.proxy_list = proxy_list or []
-        self.proxy_cycle = cycle(self.proxy_list) if self.proxy_list else None
         self.current_proxy = None
-        self.failed_proxies = set()
+        self._proxy_stats = {proxy: self._new_proxy_stats() for proxy in self.proxy_list}
+        self._shared_health = None
+        if use_proxies and self.proxy_list and proxy_health_db:
+            try:
+                self._shared_health = SharedProxyHealth(proxy_health_db)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared proxy health unavailable ({e}); using local health only")
+        self._proxy_lock = threading.Lock()
+        self._proxy_sessions = {}  # Proxy (None = direct) -> keep-alive session
+        self._session_lock = threading.Lock()
+        
+        # Concurrent workers per batch (capped at one per proxy)
+        self.max_workers = max(1, max_workers)
+        
+        # Transcript cache (None disables it; refresh skips reads but still writes)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.refresh_cache = refresh_cache
         
         # Batch tracking
         self.batch_stats = {
@@ -94,76 +293,199 @@ class HumanLikeBatchExtractor:
         if hasattr(YouTubeTranscriptApi, 'get_transcript'):
             self.api_method = 'get_transcript'
             self.api_instance = YouTubeTranscriptApi
+            self._text_getter = itemgetter('text')
             logger.info("Using get_transcript (static method)")
         elif hasattr(YouTubeTranscriptApi, 'fetch'):
             self.api_method = 'fetch'
             self.api_instance = YouTubeTranscriptApi()
+            self._text_getter = attrgetter('text')
             logger.info("Using fetch (instance method)")
         else:
             available_methods = [m for m in dir(YouTubeTranscriptApi) if not m.startswith('_')]
             raise ImportError(f"Neither 'fetch' nor 'get_transcript' method found. Available: {available_methods}")
     
+    @property
+    def current_proxy(self) -> Optional[str]:
+        """Proxy used by the calling worker thread"""
+        return getattr(self._thread_state, 'proxy', None)
+    
+    @current_proxy.setter
+    def current_proxy(self, proxy: Optional[str]):
+        self._thread_state.proxy = proxy
+    
+    def _create_session(self, proxy: Optional[str]):
+        """Keep-alive HTTP session routed through a proxy (or direct when None)"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.request = partial(session.request, timeout=REQUEST_TIMEOUT_SECONDS)
+        if proxy:
+            session.proxies = {'http': proxy, 'https': proxy}
+        return session
+    
+    def _proxy_session(self, proxy: Optional[str]):
+        """Keep-alive session for a proxy, created on first use"""
+        with self._session_lock:
+            session = self._proxy_sessions.get(proxy)
+            if session is None:
+                session = self._proxy_sessions[proxy] = self._create_session(proxy)
+        return session
+    
+    def _proxy_api(self, proxy: Optional[str]):
+        """Fetch-style API instance for a proxy, private to the calling thread
+        
+        Proxies are drawn at random, so two workers can end up on the same one.
+        YouTubeTranscriptApi is not thread-safe, so each thread keeps its own
+        (cheap) instances, reused across videos and rotations; they all share
+        the proxy's pooled keep-alive session.
+        """
+        apis = getattr(self._thread_state, 'apis', None)
+        if apis is None:
+            apis = self._thread_state.apis = {}
+        api = apis.get(proxy)
+        if api is None:
+            api = apis[proxy] = self.transcript_api(http_client=self._proxy_session(proxy))
+        return api
+    
+    def _probe_proxy(self, proxy: str) -> Optional[float]:
+        """Latency of a HEAD request to YouTube through the proxy, or None if it fails"""
+        start = time.monotonic()
+        try:
+            response = self._proxy_session(proxy).head(PROXY_PROBE_URL, timeout=PROXY_PROBE_TIMEOUT_SECONDS)
+        except Exception:
+            return None
+        return time.monotonic() - start if response.status_code < 400 else None
+    
+    def probe_proxies(self):
+        """Drop dead proxies before any real fetch and seed health for the live ones
+        
+        Probes run in parallel through each proxy's own session, so the live
+        ones start with a warm connection.
+        """
+        if not self.use_proxies or not self.proxy_list:
+            return
+        
+        logger.info(f"Probing {len(self.proxy_list)} proxies...")
+        with ThreadPoolExecutor(max_workers=min(PROXY_PROBE_WORKERS, len(self.proxy_list))) as executor:
+            latencies = list(executor.map(self._probe_proxy, self.proxy_list))
+        
+        alive = [proxy for proxy, latency in zip(self.proxy_list, latencies) if latency is not None]
+        if not alive:
+            logger.warning("No proxy answered the probe; keeping the full list")
+            return
+        
+        with self._proxy_lock:
+            for proxy, latency in zip(self.proxy_list, latencies):
+                if latency is None:
+                    del self._proxy_stats[proxy]
+                else:
+                    self._proxy_stats[proxy]['successes'] += 1
+                    self._proxy_stats[proxy]['last_latency'] = latency
+            self.proxy_list = alive
+        logger.info(f"{len(alive)}/{len(latencies)} proxies alive")
+    
+    def _fetch_transcript(self, video_id: str):
+        """Fetch a transcript through the calling worker's current proxy"""
+        proxy = self.current_proxy if self.use_proxies else None
+        if self.api_method == 'fetch':
+            return self._proxy_api(proxy).fetch(video_id, languages=['en'])
+        
+        # Legacy static API takes per-call proxies
+        proxies = {'http': proxy, 'https': proxy} if proxy else None
+        return self.api_instance.get_transcript(video_id, languages=['en'], proxies=proxies)
+    
     def _validate_video_id(self, video_id: str) -> bool:
         """Validate YouTube video ID format"""
-        pattern = r'^[a-zA-Z0-9_-]{11}$'
-        return bool(re.match(pattern, video_id))
+        return VIDEO_ID_PATTERN.match(video_id) is not None
+    
+    @staticmethod
+    def _new_proxy_stats() -> Dict:
+        return {'successes': 0, 'failures': 0, 'last_latency': None, 'last_used': None}
+    
+    @staticmethod
+    def _is_evicted(stats: Dict) -> bool:
+        """Whether a proxy has failed often enough, and mostly enough, to drop it"""
+        failures = stats['failures']
+        return (failures >= PROXY_EVICT_MIN_FAILURES
+                and failures / (stats['successes'] + failures) > PROXY_EVICT_FAILURE_RATIO)
+    
+    @staticmethod
+    def _proxy_score(stats: Dict, now: float) -> float:
+        """Selection weight: smoothed success rate, favouring fast and rested proxies"""
+        success_rate = (stats['successes'] + 1) / (stats['successes'] + stats['failures'] + 2)
+        speed = 1.0 / max(1.0, stats['last_latency'] or 1.0)
+        if stats['last_used'] is None:
+            rest = 1.0
+        else:
+            rest = max(0.01, 1 - math.exp(-(now - stats['last_used']) / PROXY_REST_SECONDS))
+        return success_rate * speed * rest
     
     def _get_next_proxy(self) -> Optional[str]:
-        """Get next working proxy from rotation"""
-        if not self.use_proxies or not self.proxy_cycle:
+        """Pick a healthy proxy by weighted sampling (caller holds _proxy_lock)"""
+        if not self.use_proxies or not self.proxy_list:
             return None
         
-        attempts = 0
-        while attempts < len(self.proxy_list):
-            proxy = next(self.proxy_cycle)
-            if proxy not in self.failed_proxies:
-                return proxy
-            attempts += 1
-        
-        # All proxies failed, reset and try again
-        logger.warning("All proxies failed, resetting failed proxy list")
-        self.failed_proxies.clear()
-        self.batch_stats['proxy_rotations'] += 1
-        return next(self.proxy_cycle) if self.proxy_cycle else None
-    
-    def _setup_proxy_session(self):
-        """Setup proxy session with current proxy"""
-        if not self.use_proxies or not self.current_proxy:
-            return
+        healthy = [proxy for proxy in self.proxy_list if not self._is_evicted(self._proxy_stats[proxy])]
+        if not healthy:
+            # All proxies evicted, reset their health and try again
+            logger.warning("All proxies failed, resetting proxy health")
+            for proxy in self.proxy_list:
+                self._proxy_stats[proxy] = self._new_proxy_stats()
+            self.batch_stats['proxy_rotations'] += 1
+            healthy = list(self.proxy_list)
         
+        # Skip proxies another parallel script just saw blocked, unless that's all of them
+        blocked = self._shared_blocked_proxies()
+        if blocked and any(proxy not in blocked for proxy in healthy):
+            healthy = [proxy for proxy in healthy if proxy not in blocked]
+        
+        now = time.monotonic()
+        weights = [self._proxy_score(self._proxy_stats[proxy], now) for proxy in healthy]
+        proxy = random.choices(healthy, weights=weights)[0]
+        self._proxy_stats[proxy]['last_used'] = now
+        return proxy
+    
+    def _shared_blocked_proxies(self) -> set:
+        """Recently blocked proxies from the shared registry (best effort)"""
+        if not self._shared_health:
+            return set()
         try:
-            import requests
-            
-            # Create proxy dict for requests
-            proxy_dict = {
-                'http': self.current_proxy,
-                'https': self.current_proxy
-            }
-            
-            # Monkey patch the youtube_transcript_api to use our proxy
-            import youtube_transcript_api._api
-            original_get = requests.get
-            
-            def proxied_get(*args, **kwargs):
-                kwargs['proxies'] = proxy_dict
-                kwargs['timeout'] = 15
-                return original_get(*args, **kwargs)
-            
-            # Replace requests.get temporarily
-            requests.get = proxied_get
-            youtube_transcript_api._api.requests.get = proxied_get
-            
-            logger.info(f"Proxy session configured: {self.current_proxy}")
-            return True
-            
-        except Exception as e:
-            logger.warning(f"Failed to setup proxy session: {e}")
-            if self.current_proxy:
-                self.failed_proxies.add(self.current_proxy)
-            return False
+            return self._shared_health.recently_blocked()
+        except sqlite3.Error as e:
+            logger.debug(f"Could not read shared proxy health: {e}")
+            return set()
     
-    def _human_like_delay(self):
-        """Implement human-like delays between video requests"""
+    def _record_proxy_result(self, proxy: Optional[str], success: bool, latency: float = None, blocked: bool = False):
+        """Update a proxy's health after a request through it"""
+        if not proxy:
+            return
+        
+        if self._shared_health:
+            try:
+                self._shared_health.record(proxy, success, blocked)
+            except sqlite3.Error as e:
+                logger.debug(f"Could not update shared proxy health: {e}")
+        
+        with self._proxy_lock:
+            stats = self._proxy_stats.get(proxy)
+            if stats is None:
+                return
+            stats['last_used'] = time.monotonic()
+            if success:
+                stats['successes'] += 1
+                stats['last_latency'] = latency
+            else:
+                was_evicted = self._is_evicted(stats)
+                stats['failures'] += 1
+                if self._is_evicted(stats) and not was_evicted:
+                    logger.warning(f"Evicting proxy {proxy}: {stats['failures']} failures, {stats['successes']} successes")
+    
+    def _human_like_gap(self) -> float:
+        """Random human-like gap between two requests from the same IP"""
         # Random delay between videos (8-20 seconds)
         base_delay = random.uniform(self.min_video_delay, self.max_video_delay)
         
@@ -176,21 +498,68 @@ class HumanLikeBatchExtractor:
         jitter = random.uniform(-1.0, 1.0)
         total_delay = max(base_delay + jitter, 5.0)  # Minimum 5 seconds
         
-        logger.debug(f"Human-like delay: {total_delay:.1f}s")
-        time.sleep(total_delay)
+        return total_delay
+    
+    def _human_like_delay(self):
+        """Wait for the current proxy's next human-like request slot
+        
+        Pacing is per IP: each request reserves the gap before the next one on
+        its proxy when it starts, so the wait overlaps with this worker's fetch
+        and bookkeeping, and workers on other proxies are never held up.
+        """
+        proxy = self.current_proxy if self.use_proxies else None
+        gap = self._human_like_gap()
+        
+        with self._pace_lock:
+            now = time.monotonic()
+            if proxy not in self._next_allowed_time:
+                # A proxy this run hasn't used has no recent requests to space
+                # out from, so it starts at once; the direct connection keeps a
+                # lead-in delay since earlier runs may just have used it
+                self._next_allowed_time[proxy] = now if proxy else now + self._human_like_gap()
+            start = max(now, self._next_allowed_time[proxy])
+            self._next_allowed_time[proxy] = start + gap
+        
+        delay = start - now
+        if delay > 0:
+            logger.debug(f"Human-like delay: {delay:.1f}s")
+            time.sleep(delay)
     
     def _rotate_proxy(self):
         """Rotate to next proxy"""
         if not self.use_proxies:
             return
         
-        old_proxy = self.current_proxy
-        self.current_proxy = self._get_next_proxy()
+        with self._proxy_lock:
+            old_proxy = self.current_proxy
+            self.current_proxy = self._get_next_proxy()
+            
+            if self.current_proxy != old_proxy:
+                logger.info(f"Rotated proxy: {old_proxy} -> {self.current_proxy}")
+                self.batch_stats['proxy_rotations'] += 1
+    
+    def _load_cached_transcript(self, video_id: str) -> Optional[Dict]:
+        """Return a cached transcript result if one exists and is within its TTL"""
+        if not self.cache_dir or self.refresh_cache:
+            return None
         
-        if self.current_proxy != old_proxy:
-            logger.info(f"Rotated proxy: {old_proxy} -> {self.current_proxy}")
-            self._setup_proxy_session()
-            self.batch_stats['proxy_rotations'] += 1
+        cache_file = self.cache_dir / f"{video_id}.json"
+        try:
+            age = time.time() - cache_file.stat().st_mtime
+            result = _read_json(cache_file)
+        except (OSError, ValueError):
+            return None
+        
+        ttl = TRANSCRIPT_CACHE_TTL_SECONDS if result.get('transcript_available') else UNAVAILABLE_CACHE_TTL_SECONDS
+        return result if age <= ttl else None
+    
+    def _cache_transcript(self, result: Dict):
+        """Store a transcript result in the on-disk cache"""
+        if not self.cache_dir:
+            return
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(self.cache_dir / f"{result['video_id']}.json", result, compact=True)
     
     def get_transcript(self, video_id: str) -> Optional[Dict]:
         """Extract transcript with human-like behavior"""
@@ -205,10 +574,19 @@ class HumanLikeBatchExtractor:
                 'error': 'Invalid video ID format'
             }
         
+        cached = self._load_cached_transcript(video_id)
+        if cached:
+            logger.info(f"Using cached transcript for {video_id}")
+            return cached
+        
+        last_error = None
+        permanent = False
+        attempt_proxy = None
         for attempt in range(self.max_retries):
             try:
-                # Apply human-like delay before each request
-                if attempt == 0:
+                # Apply human-like delay before each request. A retry on a
+                # freshly rotated proxy only needs that proxy's own pacing.
+                if attempt == 0 or self.current_proxy != attempt_proxy:
                     self._human_like_delay()
                 else:
                     # Longer delays on retries
@@ -217,14 +595,12 @@ class HumanLikeBatchExtractor:
                     time.sleep(retry_delay)
                 
                 # Fetch transcript using detected API method
-                if self.api_method == 'fetch':
-                    transcript_list = self.api_instance.fetch(video_id, languages=['en'])
-                    full_text = ' '.join([item.text for item in transcript_list])
-                elif self.api_method == 'get_transcript':
-                    transcript_list = self.api_instance.get_transcript(video_id, languages=['en'])
-                    full_text = ' '.join([item['text'] for item in transcript_list])
-                else:
-                    raise Exception(f"Unknown API method: {self.api_method}")
+                attempt_proxy = self.current_proxy
+                fetch_start = time.monotonic()
+                transcript_list = self._fetch_transcript(video_id)
+                if self.use_proxies:
+                    self._record_proxy_result(self.current_proxy, True, time.monotonic() - fetch_start)
+                full_text = ' '.join(map(self._text_getter, transcript_list))
                 
                 # Clean transcript
                 full_text = self.clean_transcript(full_text)
@@ -232,7 +608,7 @@ class HumanLikeBatchExtractor:
                 self.request_count += 1
                 self.last_request_time = time.time()
                 
-                return {
+                result = {
                     'video_id': video_id,
                     'transcript_available': True,
                     'full_text': full_text,
@@ -241,8 +617,11 @@ class HumanLikeBatchExtractor:
                     'proxy_used': self.current_proxy if self.use_proxies else None,
                     'attempt': attempt + 1
                 }
+                self._cache_transcript(result)
+                return result
                 
             except Exception as e:
+                last_error = e
                 error_msg = str(e).lower()
                 
                 # Handle IP blocking
@@ -253,8 +632,7 @@ class HumanLikeBatchExtractor:
                     logger.error(f"IP BLOCKED detected (attempt {attempt + 1})")
                     if self.use_proxies:
                         logger.info("Rotating proxy due to IP block...")
-                        if self.current_proxy:
-                            self.failed_proxies.add(self.current_proxy)
+                        self._record_proxy_result(self.current_proxy, False, blocked=True)
                         self._rotate_proxy()
                         continue
                     else:
@@ -269,28 +647,74 @@ class HumanLikeBatchExtractor:
                     'timeout', 'connection', 'temporary', '503', '502'
                 ]):
                     logger.warning(f"Temporary error (attempt {attempt + 1}): {e}")
-                    if self.use_proxies and random.random() < 0.5:  # 50% chance to rotate proxy
-                        self._rotate_proxy()
+                    if self.use_proxies:
+                        self._record_proxy_result(self.current_proxy, False)
+                        if random.random() < 0.5:  # 50% chance to rotate proxy
+                            self._rotate_proxy()
                     continue
                 
                 else:
                     # Permanent error, don't retry
                     logger.warning(f"Permanent error for {video_id}: {e}")
+                    permanent = True
                     break
         
-        return {
+        result = {
             'video_id': video_id,
             'transcript_available': False,
-            'error': str(e) if 'e' in locals() else 'Failed after retries'
+            'error': str(last_error) if last_error else 'Failed after retries'
         }
+        if permanent:
+            # Only permanent failures are worth remembering; blocks and timeouts may clear
+            self._cache_transcript(result)
+        return result
     
     def clean_transcript(self, text: str) -> str:
         """Clean up transcript text"""
-        text = re.sub(r'\[Music\]', '', text)
-        text = re.sub(r'\[Applause\]', '', text)
-        text = re.sub(r'\[Laughter\]', '', text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        # Remove common artifacts, then collapse whitespace
+        text = ARTIFACT_PATTERN.sub('', text)
+        return WHITESPACE_PATTERN.sub(' ', text).strip()
+    
+    def _batch_workers(self, video_count: int) -> int:
+        """Workers for a batch: concurrency only spreads across proxies, never one IP"""
+        if not self.use_proxies or not self.proxy_list:
+            return 1
+        return max(1, min(self.max_workers, len(self.proxy_list), video_count))
+    
+    def _process_video(self, video: Dict, batch_number: int, position: str) -> Dict:
+        """Fetch one video's transcript and combine it with the video data"""
+        if self.use_proxies and self.current_proxy is None:
+            # Fresh worker thread: claim its own proxy from the rotation
+            self._rotate_proxy()
+        
+        logger.info(f"Batch {batch_number} - Video {position}: {video['title'][:50]}...")
+        
+        # Get transcript; an unexpected error fails only this video, not the batch
+        try:
+            transcript_result = self.get_transcript(video['video_id'])
+        except Exception as e:
+            logger.error(f"Unexpected error processing {video['video_id']}: {e}")
+            transcript_result = {'video_id': video['video_id'], 'transcript_available': False, 'error': str(e)}
+        
+        # Combine with video data
+        enhanced_video = {
+            **video,
+            'transcript_attempted': True,
+            'transcript_result': transcript_result,
+            'batch_number': batch_number,
+            'processed_at': datetime.now().isoformat()
+        }
+        
+        if transcript_result and transcript_result['transcript_available']:
+            proxy_info = f" (via proxy)" if self.use_proxies else ""
+            logger.info(f"  ✓ Success: {transcript_result['word_count']} words{proxy_info}")
+            _report_video_result(video['video_id'], True)
+        else:
+            error = transcript_result.get('error', 'Unknown error') if transcript_result else 'No result'
+            logger.warning(f"  ✗ Failed: {error}")
+            _report_video_result(video['video_id'], False)
+        
+        return enhanced_video
     
     def process_batch(self, videos: List[Dict], batch_number: int, output_file: str) -> Dict:
         """Process a single batch of videos with human-like behavior"""
@@ -299,40 +723,28 @@ class HumanLikeBatchExtractor:
         if not self.batch_stats['start_time']:
             self.batch_stats['start_time'] = time.time()
         
-        # Rotate proxy at start of each batch
-        if self.use_proxies:
-            self._rotate_proxy()
+        positions = [f"{i+1}/{len(videos)}" for i in range(len(videos))]
+        workers = self._batch_workers(len(videos))
         
-        results = []
-        success_count = 0
+        if workers > 1:
+            # One worker per proxy; each keeps its own human-like pacing
+            logger.info(f"Processing batch {batch_number} with {workers} concurrent workers")
+            results = [None] * len(videos)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._process_video, video, batch_number, position): i
+                           for i, (video, position) in enumerate(zip(videos, positions))}
+                # Collect in completion order for progress; results keep input order
+                for done, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    logger.info(f"Batch {batch_number}: {done}/{len(videos)} videos finished")
+        else:
+            # Rotate proxy at start of each batch
+            if self.use_proxies:
+                self._rotate_proxy()
+            results = [self._process_video(video, batch_number, position) for video, position in zip(videos, positions)]
         
-        for i, video in enumerate(videos):
-            video_id = video['video_id']
-            title = video['title'][:50]
-            
-            logger.info(f"Batch {batch_number} - Video {i+1}/{len(videos)}: {title}...")
-            
-            # Get transcript
-            transcript_result = self.get_transcript(video_id)
-            
-            # Combine with video data
-            enhanced_video = {
-                **video,
-                'transcript_attempted': True,
-                'transcript_result': transcript_result,
-                'batch_number': batch_number,
-                'processed_at': datetime.now().isoformat()
-            }
-            
-            results.append(enhanced_video)
-            
-            if transcript_result and transcript_result['transcript_available']:
-                success_count += 1
-                proxy_info = f" (via proxy)" if self.use_proxies else ""
-                logger.info(f"  ✓ Success: {transcript_result['word_count']} words{proxy_info}")
-            else:
-                error = transcript_result.get('error', 'Unknown error') if transcript_result else 'No result'
-                logger.warning(f"  ✗ Failed: {error}")
+        success_count = sum(1 for video in results
+                            if video['transcript_result'] and video['transcript_result']['transcript_available'])
         
         # Update batch stats
         self.batch_stats['batches_completed'] += 1
@@ -352,40 +764,48 @@ class HumanLikeBatchExtractor:
             'videos': results
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(batch_data, f, indent=2, ensure_ascii=False)
+        _write_json(output_file, batch_data)
         
         logger.info(f"Batch {batch_number} completed: {success_count}/{len(videos)} successful")
         logger.info(f"Batch results saved to: {output_file}")
         
         return batch_data
     
-    def wait_between_batches(self, batch_number: int, total_batches: int):
-        """Implement human-like wait between batches"""
+    def wait_between_batches(self, batch_number: int, total_batches: int) -> bool:
+        """Implement human-like wait between batches; False if cancelled"""
         if batch_number >= total_batches:
-            return
+            return True
         
         # Get wait time for this batch (cycling through predefined times)
         wait_minutes = self.batch_wait_times[batch_number % len(self.batch_wait_times)]
         
-        # Add some randomness (+/- 2 minutes)
-        jitter = random.uniform(-2, 2)
+        # Add some randomness; parallel scripts share the schedule, so the
+        # jitter and a per-script phase offset keep their bursts apart
+        jitter = random.uniform(-self.batch_wait_jitter, self.batch_wait_jitter)
+        if batch_number == 0:
+            jitter += self.phase_offset_minutes
         actual_wait = max(wait_minutes + jitter, 5)  # Minimum 5 minutes
         
         logger.info(f"Human-like break between batches: {actual_wait:.1f} minutes")
         
-        # Show countdown every 5 minutes
-        remaining = actual_wait * 60
-        while remaining > 0:
+        # Wait on the cancel event against a fixed deadline, showing a
+        # countdown every 5 minutes; cancel.set() ends the break at once
+        deadline = time.monotonic() + actual_wait * 60
+        while (remaining := deadline - time.monotonic()) > 0:
             if remaining > 300:  # More than 5 minutes
                 logger.info(f"Break time remaining: {remaining/60:.1f} minutes")
-                time.sleep(300)  # Sleep 5 minutes
-                remaining -= 300
-            else:
-                time.sleep(remaining)
-                remaining = 0
+            if self.cancel.wait(min(remaining, 300)):
+                logger.info("Break cancelled, stopping batch processing")
+                return False
         
         logger.info("Break completed, resuming processing...")
+        return True
+
+@lru_cache(maxsize=4)
+def _load_proxies(proxy_file: str) -> Tuple[str, ...]:
+    """Parse a proxy list file: one proxy per line, # for comments"""
+    with open(proxy_file, 'r') as f:
+        return tuple(line.strip() for line in f if line.strip() and not line.startswith('#'))
 
 def process_human_like_batches(
     input_file: str,
@@ -395,9 +815,19 @@ def process_human_like_batches(
     proxy_file: str = None,
     min_duration: int = 121,
     max_duration: int = 300,
-    start_index: int = 0
-) -> List[str]:
-    """Process videos in human-like batches"""
+    start_index: int = 0,
+    max_workers: int = 1,
+    cache_dir: Optional[str] = TRANSCRIPT_CACHE_DIR,
+    refresh_cache: bool = False,
+    phase_offset_minutes: float = 0,
+    probe_proxies: bool = True,
+    return_results: bool = False
+):
+    """Process videos in human-like batches
+    
+    Returns the batch file paths, or (batch_files, processed_videos) when
+    return_results is set so callers don't have to re-read the batch files.
+    """
     
     logger.info("Dr. Berg Human-Like Batch Transcript Extractor")
     logger.info("=" * 50)
@@ -406,55 +836,78 @@ def process_human_like_batches(
     proxy_list = []
     if use_proxies and proxy_file:
         try:
-            with open(proxy_file, 'r') as f:
-                proxy_list = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            proxy_list = list(_load_proxies(proxy_file))
             logger.info(f"Loaded {len(proxy_list)} proxies from {proxy_file}")
         except FileNotFoundError:
             logger.warning(f"Proxy file {proxy_file} not found. Continuing without proxies.")
             use_proxies = False
     
     # Initialize extractor
-    extractor = HumanLikeBatchExtractor(use_proxies=use_proxies, proxy_list=proxy_list)
+    extractor = HumanLikeBatchExtractor(use_proxies=use_proxies, proxy_list=proxy_list, max_workers=max_workers,
+                                        cache_dir=cache_dir, refresh_cache=refresh_cache,
+                                        phase_offset_minutes=phase_offset_minutes)
     
     if not extractor.transcript_api:
         logger.error("YouTube Transcript API not available")
-        return []
+        return ([], []) if return_results else []
     
     # Load and filter videos
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _read_json(input_file)
     except FileNotFoundError:
         logger.error(f"Input file not found: {input_file}")
-        return []
+        return ([], []) if return_results else []
     
     videos = data.get('videos', [])
     
-    # Apply duration filtering
-    filtered_videos = []
-    for video in videos:
-        duration = video.get('duration_seconds', 0)
-        if min_duration <= duration <= max_duration:
-            filtered_videos.append(video)
+    # Apply duration filtering lazily and stop once the target window is filled
+    filtered_videos = (video for video in videos
+                       if min_duration <= video.get('duration_seconds', 0) <= max_duration)
+    target_videos_list = list(islice(filtered_videos, start_index, start_index + target_videos))
+    
+    logger.info(f"Duration range {min_duration//60}:{min_duration%60:02d} to {max_duration//60}:{max_duration%60:02d}")
+    
+    # Drop malformed and duplicate video ids once, before any request is spent on them
+    seen_ids = set()
+    valid_videos = []
+    for video in target_videos_list:
+        video_id = video.get('video_id') or ''
+        if VIDEO_ID_PATTERN.match(video_id) is None:
+            logger.warning(f"Skipping invalid video ID: {video_id!r}")
+        elif video_id not in seen_ids:
+            seen_ids.add(video_id)
+            valid_videos.append(video)
+    if len(valid_videos) < len(target_videos_list):
+        logger.info(f"Dropped {len(target_videos_list) - len(valid_videos)} invalid or duplicate videos")
+    target_videos_list = valid_videos
     
-    logger.info(f"Found {len(filtered_videos)} videos in duration range {min_duration//60}:{min_duration%60:02d} to {max_duration//60}:{max_duration%60:02d}")
+    # Skip videos the database already has transcripts for (e.g. a re-run with
+    # an overlapping --start-index)
+    done_ids = transcribed_video_ids()
+    if done_ids:
+        skipped_ids = [video['video_id'] for video in target_videos_list if video['video_id'] in done_ids]
+        if skipped_ids:
+            target_videos_list = [video for video in target_videos_list if video['video_id'] not in done_ids]
+            logger.info(f"Skipping {len(skipped_ids)} videos already transcribed in the database")
+            _report_skipped_videos(skipped_ids)
     
-    # Select target videos starting from start_index
-    target_videos_list = filtered_videos[start_index:start_index + target_videos]
     logger.info(f"Processing {len(target_videos_list)} videos starting from index {start_index}")
     
     # Split into batches
-    batches = []
-    for i in range(0, len(target_videos_list), videos_per_batch):
-        batch = target_videos_list[i:i + videos_per_batch]
-        batches.append(batch)
+    batches = [target_videos_list[i:i + videos_per_batch]
+               for i in range(0, len(target_videos_list), videos_per_batch)]
     
     logger.info(f"Split into {len(batches)} batches of ~{videos_per_batch} videos each")
     logger.info(f"Batch wait times: {extractor.batch_wait_times} minutes")
     logger.info("")
     
+    # Weed out dead proxies before they cost real fetches
+    if batches and probe_proxies:
+        extractor.probe_proxies()
+    
     # Process each batch
     batch_files = []
+    processed_videos = []
     for batch_num, batch_videos in enumerate(batches):
         batch_number = batch_num + 1
         
@@ -466,11 +919,18 @@ def process_human_like_batches(
         
         # Process batch
         batch_result = extractor.process_batch(batch_videos, batch_number, batch_filename)
+        append_processed_ids((v['video_id'] for v in batch_result['videos']), batch_filename)
         batch_files.append(batch_filename)
+        processed_videos.extend(batch_result['videos'])
         
         # Wait between batches (except after last batch)
         if batch_number < len(batches):
-            extractor.wait_between_batches(batch_number - 1, len(batches))
+            if not extractor.wait_between_batches(batch_number - 1, len(batches)):
+                break
+    
+    if not batches:
+        logger.info("No videos left to process")
+        return ([], []) if return_results else []
     
     # Final summary
     total_time = time.time() - extractor.batch_stats['start_time']
@@ -485,7 +945,7 @@ def process_human_like_batches(
     logger.info(f"Proxy rotations: {extractor.batch_stats['proxy_rotations']}")
     logger.info(f"Batch files created: {len(batch_files)}")
     
-    return batch_files
+    return (batch_files, processed_videos) if return_results else batch_files
 
 def create_parallel_script(script_id: str, target_videos: int, start_index: int, videos_per_batch: int = 10) -> str:
     """Create a parallel script instance for simultaneous execution"""
@@ -513,7 +973,8 @@ if __name__ == "__main__":
         proxy_file="test_proxies.txt",
         min_duration=121,
         max_duration=300,
-        start_index={start_index}
+        start_index={start_index},
+        phase_offset_minutes={int(script_id) * 3}
     )
     
     print(f"\\nParallel Script {script_id} completed!")
@@ -533,22 +994,15 @@ if __name__ == "__main__":
 
 def show_processing_status():
     """Show current processing status and next start index"""
-    database_file = "data/processed/berg_complete_database.json"
     filtered_catalog_file = "data/processed/berg_filtered_catalog.json"
     
     try:
-        # Load current database
-        if os.path.exists(database_file):
-            with open(database_file, 'r', encoding='utf-8') as f:
-                database = json.load(f)
-            processed_count = len(database.get('videos', []))
-        else:
-            processed_count = 0
+        # Count processed videos from the database metadata
+        processed_count = database_video_count()
         
         # Load filtered catalog to get total
         if os.path.exists(filtered_catalog_file):
-            with open(filtered_catalog_file, 'r', encoding='utf-8') as f:
-                catalog = json.load(f)
+            catalog = _read_json(filtered_catalog_file)
             total_videos = len(catalog.get('videos', []))
         else:
             total_videos = 0
@@ -578,16 +1032,88 @@ def show_processing_status():
     except Exception as e:
         print(f"❌ Error checking status: {e}")
 
-def append_to_database(batch_results, start_index, end_index):
-    """Append batch results to berg_complete_database.json"""
-    database_file = "data/processed/berg_complete_database.json"
+def compress_transcript(video: Dict) -> Dict:
+    """Video record with its transcript full_text replaced by full_text_zlib_b64"""
+    result = video.get('transcript_result')
+    if not result or 'full_text' not in result:
+        return video
+    packed = {
+        ('full_text_zlib_b64' if key == 'full_text' else key):
+            (base64.b64encode(zlib.compress(value.encode('utf-8'), 9)).decode('ascii') if key == 'full_text' else value)
+        for key, value in result.items()
+    }
+    return {**video, 'transcript_result': packed}
+
+def decompress_transcript(video: Dict) -> Dict:
+    """Inverse of compress_transcript; records without compressed text pass through"""
+    result = video.get('transcript_result')
+    if not result or 'full_text_zlib_b64' not in result:
+        return video
+    unpacked = {
+        ('full_text' if key == 'full_text_zlib_b64' else key):
+            (zlib.decompress(base64.b64decode(value)).decode('utf-8') if key == 'full_text_zlib_b64' else value)
+        for key, value in result.items()
+    }
+    return {**video, 'transcript_result': unpacked}
+
+def _read_database_meta() -> Optional[Dict]:
+    """Database metadata sidecar, or None if it doesn't exist yet"""
+    try:
+        return _read_json(DATABASE_META_FILE)
+    except (OSError, ValueError):
+        return None
+
+def _write_database_meta(meta: Dict):
+    """Atomically replace the database metadata sidecar"""
+    _write_json(DATABASE_META_FILE, meta)
+
+def _migrate_legacy_database() -> Optional[Dict]:
+    """Seed the JSONL database from the monolithic JSON database, once"""
+    if os.path.exists(DATABASE_FILE) or not os.path.exists(LEGACY_DATABASE_FILE):
+        return None
+    
+    database = _read_json(LEGACY_DATABASE_FILE)
+    videos = database.pop('videos', [])
     
+    tmp_file = f"{DATABASE_FILE}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.writelines(_json_line(compress_transcript(video)) for video in videos)
+    os.replace(tmp_file, DATABASE_FILE)
+    
+    database.setdefault('database_metadata', {})['total_videos'] = len(videos)
+    database.setdefault('processing_summary', {})['videos_processed'] = len(videos)
+    _write_database_meta(database)
+    logger.info(f"Migrated {len(videos)} videos from {LEGACY_DATABASE_FILE} to {DATABASE_FILE}")
+    return database
+
+def database_video_count() -> int:
+    """Number of videos in the database, without reading the records"""
+    meta = _read_database_meta()
+    if meta:
+        return meta['database_metadata'].get('total_videos', 0)
+    if os.path.exists(LEGACY_DATABASE_FILE):
+        return len(_read_json(LEGACY_DATABASE_FILE).get('videos', []))
+    return 0
+
+def transcribed_video_ids() -> set:
+    """Ids of database videos that already have a transcript"""
+    if os.path.exists(DATABASE_FILE):
+        loads = orjson.loads if orjson else json.loads
+        with open(DATABASE_FILE, 'rb') as f:
+            videos = (loads(line) for line in f if line.strip())
+            return {video['video_id'] for video in videos
+                    if (video.get('transcript_result') or {}).get('transcript_available')}
+    if os.path.exists(LEGACY_DATABASE_FILE):
+        return {video['video_id'] for video in _read_json(LEGACY_DATABASE_FILE).get('videos', [])
+                if (video.get('transcript_result') or {}).get('transcript_available')}
+    return set()
+
+def append_to_database(batch_results, start_index, end_index):
+    """Append batch results to the JSONL database and update its metadata sidecar"""
     try:
-        # Load existing database or create new one
-        if os.path.exists(database_file):
-            with open(database_file, 'r', encoding='utf-8') as f:
-                database = json.load(f)
-        else:
+        # Load existing metadata or create new one
+        database = _migrate_legacy_database() or _read_database_meta()
+        if not database:
             database = {
                 "database_metadata": {
                     "created_at": datetime.now().isoformat(),
@@ -600,24 +1126,21 @@ def append_to_database(batch_results, start_index, end_index):
                     "batch_files_processed": 0,
                     "earliest_batch": None,
                     "latest_batch": datetime.now().isoformat()
-                },
-                "videos": []
+                }
             }
         
-        # Add new videos to database
-        existing_videos = database.get('videos', [])
-        existing_videos.extend(batch_results)
-        database['videos'] = existing_videos
+        # Append new videos; existing records are never rewritten
+        os.makedirs(os.path.dirname(DATABASE_FILE), exist_ok=True)
+        with open(DATABASE_FILE, 'ab') as f:
+            f.writelines(_json_line(compress_transcript(video)) for video in batch_results)
         
         # Update metadata
-        database['database_metadata']['total_videos'] = len(existing_videos)
+        total_videos = database['database_metadata'].get('total_videos', 0) + len(batch_results)
+        database['database_metadata']['total_videos'] = total_videos
         database['database_metadata']['last_updated'] = datetime.now().isoformat()
-        database['processing_summary']['videos_processed'] = len(existing_videos)
+        database['processing_summary']['videos_processed'] = total_videos
         database['processing_summary']['latest_batch'] = datetime.now().isoformat()
-        
-        # Save updated database
-        with open(database_file, 'w', encoding='utf-8') as f:
-            json.dump(database, f, indent=2, ensure_ascii=False)
+        _write_database_meta(database)
         
         logger.info(f"✅ Appended {len(batch_results)} videos to database")
         return True
@@ -626,6 +1149,115 @@ def append_to_database(batch_results, start_index, end_index):
         logger.error(f"❌ Error appending to database: {e}")
         return False
 
+def consolidate_database(output_file: str = LEGACY_DATABASE_FILE) -> bool:
+    """Write the JSONL database as one monolithic JSON file for downstream readers"""
+    database = _read_database_meta()
+    if not database or not os.path.exists(DATABASE_FILE):
+        logger.error(f"❌ No JSONL database found at {DATABASE_FILE}")
+        return False
+    
+    loads = orjson.loads if orjson else json.loads
+    with open(DATABASE_FILE, 'rb') as f:
+        database['videos'] = [decompress_transcript(loads(line)) for line in f if line.strip()]
+    
+    _write_json(output_file, database)
+    
+    logger.info(f"✅ Consolidated {len(database['videos'])} videos into {output_file}")
+    return True
+
+def run_single_batch(args, input_file: str, start_index: int, target_videos: int) -> Tuple[int, int]:
+    """Extract one range of videos, append them to the database and report progress
+    
+    Returns (videos stored in the database, of those the ones with a transcript).
+    """
+    appended = succeeded = 0
+    batch_files, all_processed_videos = process_human_like_batches(
+        input_file=input_file,
+        target_videos=target_videos,
+        videos_per_batch=args.videos_per_batch,
+        use_proxies=args.use_proxies,
+        proxy_file=args.proxy_file,
+        min_duration=args.min_duration,
+        max_duration=args.max_duration,
+        start_index=start_index,
+        max_workers=args.workers,
+        cache_dir=None if args.no_cache else TRANSCRIPT_CACHE_DIR,
+        refresh_cache=args.refresh,
+        probe_proxies=not args.no_probe,
+        return_results=True
+    )
+    
+    # Append the processed videos to the database
+    if all_processed_videos:
+        # Append to database
+        end_index = start_index + len(all_processed_videos) - 1
+        success = append_to_database(all_processed_videos, start_index, end_index)
+        
+        if success:
+            appended = len(all_processed_videos)
+            succeeded = sum(1 for video in all_processed_videos
+                            if video['transcript_result'] and video['transcript_result']['transcript_available'])
+            # Show batch completion summary
+            print(f"\n" + "="*60)
+            print("✅ BATCH COMPLETE!")
+            print("="*60)
+            print(f"📊 This batch: Index {start_index}-{end_index} ({len(all_processed_videos)} videos)")
+            
+            # Show total progress
+            try:
+                total_processed = database_video_count()
+                
+                # Get total videos in filtered catalog for percentage
+                try:
+                    catalog = _read_json("data/processed/berg_filtered_catalog.json")
+                    total_videos = len(catalog.get('videos', []))
+                    progress_pct = (total_processed / total_videos * 100) if total_videos > 0 else 0
+                    print(f"📈 Total processed: {total_processed} videos ({progress_pct:.1f}%)")
+                except:
+                    print(f"📈 Total processed: {total_processed} videos")
+                
+                next_index = start_index + len(all_processed_videos)
+                print(f"🚀 Next run: --start-index {next_index}")
+                
+            except Exception as e:
+                logger.error(f"Error showing progress: {e}")
+            
+            print("="*60)
+        else:
+            print(f"\n❌ Error appending results to database")
+    else:
+        print(f"\n⚠️ No videos were processed successfully")
+    
+    print(f"\n✓ Human-like batch processing completed!")
+    print(f"✓ Created {len(batch_files)} batch files")
+    
+    return appended, succeeded
+
+def serve_batch_jobs(args):
+    """Run batches for jobs read from stdin until EOF (--daemon)
+    
+    Each line is a JSON object that may override input_file, start_index and
+    target_videos; every job is answered with one `{"done": true, ...}` line on
+    stdout. Keeping the interpreter alive saves its start-up and imports per batch.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            _load_proxies.cache_clear()  # Pick up proxy list edits between jobs
+            processed, succeeded = run_single_batch(
+                args,
+                job.get('input_file', args.input_file),
+                job.get('start_index', args.start_index),
+                job.get('target_videos', args.target_videos)
+            )
+            reply = {'done': True, 'processed': processed, 'succeeded': succeeded}
+        except Exception as e:
+            logger.error(f"❌ Batch job failed: {e}")
+            reply = {'done': True, 'processed': 0, 'succeeded': 0, 'error': str(e)}
+        print(json.dumps(reply), flush=True)
+
 def main():
     """Main execution for human-like batch processing"""
     import argparse
@@ -639,8 +1271,14 @@ def main():
     parser.add_argument('--min-duration', type=int, default=121, help='Minimum video duration in seconds (default: 121)')
     parser.add_argument('--max-duration', type=int, default=300, help='Maximum video duration in seconds (default: 300)')
     parser.add_argument('--start-index', type=int, default=0, help='Start from video index N (default: 0)')
+    parser.add_argument('--workers', type=int, default=1, help='Process up to N videos per batch concurrently, one per proxy (default: 1)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the on-disk transcript cache')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached transcripts and re-fetch (results are still cached)')
+    parser.add_argument('--no-probe', action='store_true', help='Skip the up-front proxy liveness probe')
     parser.add_argument('--create-parallel', type=int, help='Create N parallel script instances for simultaneous execution')
     parser.add_argument('--status', action='store_true', help='Show current processing status and next start index')
+    parser.add_argument('--consolidate-database', action='store_true', help=f'Rebuild {LEGACY_DATABASE_FILE} from the JSONL database')
+    parser.add_argument('--daemon', action='store_true', help='Stay running and process JSON batch jobs read from stdin (used by the VPN orchestrator)')
     
     args = parser.parse_args()
     
@@ -649,6 +1287,10 @@ def main():
         show_processing_status()
         return
     
+    if args.consolidate_database:
+        consolidate_database()
+        return
+    
     if args.create_parallel:
         print(f"Creating {args.create_parallel} parallel script instances...")
         print("=" * 50)
@@ -686,72 +1328,11 @@ def main():
         
         return
     
-    # Single script execution
-    batch_files = process_human_like_batches(
-        input_file=args.input_file,
-        target_videos=args.target_videos,
-        videos_per_batch=args.videos_per_batch,
-        use_proxies=args.use_proxies,
-        proxy_file=args.proxy_file,
-        min_duration=args.min_duration,
-        max_duration=args.max_duration,
-        start_index=args.start_index
-    )
-    
-    # Extract processed videos from batch files and append to database
-    all_processed_videos = []
-    for batch_file in batch_files:
-        try:
-            with open(batch_file, 'r', encoding='utf-8') as f:
-                batch_data = json.load(f)
-            if 'videos' in batch_data:
-                all_processed_videos.extend(batch_data['videos'])
-        except Exception as e:
-            logger.error(f"Error reading batch file {batch_file}: {e}")
-    
-    if all_processed_videos:
-        # Append to database
-        end_index = args.start_index + len(all_processed_videos) - 1
-        success = append_to_database(all_processed_videos, args.start_index, end_index)
-        
-        if success:
-            # Show batch completion summary
-            print(f"\n" + "="*60)
-            print("✅ BATCH COMPLETE!")
-            print("="*60)
-            print(f"📊 This batch: Index {args.start_index}-{end_index} ({len(all_processed_videos)} videos)")
-            
-            # Show total progress
-            try:
-                database_file = "data/processed/berg_complete_database.json"
-                with open(database_file, 'r', encoding='utf-8') as f:
-                    database = json.load(f)
-                total_processed = len(database.get('videos', []))
-                
-                # Get total videos in filtered catalog for percentage
-                try:
-                    with open("data/processed/berg_filtered_catalog.json", 'r', encoding='utf-8') as f:
-                        catalog = json.load(f)
-                    total_videos = len(catalog.get('videos', []))
-                    progress_pct = (total_processed / total_videos * 100) if total_videos > 0 else 0
-                    print(f"📈 Total processed: {total_processed} videos ({progress_pct:.1f}%)")
-                except:
-                    print(f"📈 Total processed: {total_processed} videos")
-                
-                next_index = args.start_index + len(all_processed_videos)
-                print(f"🚀 Next run: --start-index {next_index}")
-                
-            except Exception as e:
-                logger.error(f"Error showing progress: {e}")
-            
-            print("="*60)
-        else:
-            print(f"\n❌ Error appending results to database")
-    else:
-        print(f"\n⚠️ No videos were processed successfully")
+    if args.daemon:
+        serve_batch_jobs(args)
+        return
     
-    print(f"\n✓ Human-like batch processing completed!")
-    print(f"✓ Created {len(batch_files)} batch files")
+    run_single_batch(args, args.input_file, args.start_index, args.target_videos)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,7 +6,61 @@ Cross-reference existing progress with the new filtered catalog
 
 import json
 import os
-import glob
+import pickle
+
+from processed_index import load_processed_entries
+
+# Bumped whenever the pickled cache layout changes, so older sidecars get rebuilt
+LOOKUP_CACHE_VERSION = 2
+
+def _catalog_fingerprint(catalog_file: str):
+    """Identify the catalog contents (and cache layout) a cached lookup was built from"""
+    stat = os.stat(catalog_file)
+    return (LOOKUP_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+
+def build_filtered_lookup(filtered_videos):
+    """Map video_id -> filtered index, original index, title and duration"""
+    filtered_lookup = {}
+    for i, video in enumerate(filtered_videos):
+        video_id = video.get('video_id')
+        if video_id:
+            filtered_lookup[video_id] = {
+                'filtered_index': i,
+                'original_index': video.get('original_catalog_index'),
+                'title': video.get('title', 'Unknown'),
+                'duration': video.get('duration_formatted', 'Unknown')
+            }
+    return filtered_lookup
+
+def load_filtered_lookup(catalog_file: str):
+    """Return (filtered_ids, filtered_lookup), reusing the pickled sidecar while the catalog is unchanged
+    
+    filtered_ids holds the video_id at each filtered index (None where it has none).
+    """
+    cache_file = f"{catalog_file}.cache.pkl"
+    fingerprint = _catalog_fingerprint(catalog_file)
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_fingerprint, filtered_ids, filtered_lookup = pickle.load(f)
+        if cached_fingerprint == fingerprint:
+            return filtered_ids, filtered_lookup
+    except Exception:
+        pass
+    
+    with open(catalog_file, 'r', encoding='utf-8') as f:
+        filtered_videos = json.load(f).get('videos', [])
+    filtered_ids = [video.get('video_id') for video in filtered_videos]
+    filtered_lookup = build_filtered_lookup(filtered_videos)
+    
+    tmp_path = f"{cache_file}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((fingerprint, filtered_ids, filtered_lookup), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        print(f"⚠️  Could not write lookup cache {cache_file}: {e}")
+    
+    return filtered_ids, filtered_lookup
 
 def verify_progress_against_filtered():
     """Cross-reference processed videos with filtered catalog"""
@@ -20,70 +74,39 @@ def verify_progress_against_filtered():
         print(f"❌ Filtered catalog not found: {filtered_catalog_file}")
         return
         
-    with open(filtered_catalog_file, 'r', encoding='utf-8') as f:
-        filtered_catalog = json.load(f)
-    
-    filtered_videos = filtered_catalog.get('videos', [])
-    print(f"📺 Filtered catalog: {len(filtered_videos):,} videos (indices 0-{len(filtered_videos)-1})")
-    
-    # Create lookup by video_id
-    filtered_lookup = {}
-    for i, video in enumerate(filtered_videos):
-        video_id = video.get('video_id')
-        if video_id:
-            filtered_lookup[video_id] = {
-                'filtered_index': i,
-                'original_index': video.get('original_catalog_index'),
-                'title': video.get('title', 'Unknown'),
-                'duration': video.get('duration_formatted', 'Unknown')
-            }
+    # Lookup by video_id, cached next to the catalog until it changes
+    filtered_ids, filtered_lookup = load_filtered_lookup(filtered_catalog_file)
+    video_count = len(filtered_ids)
+    print(f"📺 Filtered catalog: {video_count:,} videos (indices 0-{video_count-1})")
     
     print(f"🔑 Created lookup for {len(filtered_lookup)} video IDs")
     
-    # Load all processed videos from batch files
-    batch_files = glob.glob("data/processed/berg_human_batch_*.json")
-    if not batch_files:
-        print("❌ No batch files found")
-        return
-        
-    processed_videos = []
-    for batch_file in sorted(batch_files):
-        try:
-            with open(batch_file, 'r', encoding='utf-8') as f:
-                batch_data = json.load(f)
-                
-            if 'videos' in batch_data:
-                for video in batch_data['videos']:
-                    video_id = video.get('video_id')
-                    if video_id:
-                        processed_videos.append({
-                            'video_id': video_id,
-                            'title': video.get('title', 'Unknown'),
-                            'batch_file': os.path.basename(batch_file)
-                        })
-        except Exception as e:
-            print(f"❌ Error reading {batch_file}: {e}")
-    
-    print(f"📝 Found {len(processed_videos)} processed videos from batch files")
-    
-    # Cross-reference processed videos with filtered catalog
+    # Load processed videos from the append-only index (new batch files get indexed on
+    # the way) and cross-reference them with the filtered catalog in the same pass
     matched_videos = []
     not_in_filtered = []
+    processed_count = 0
     
-    for processed in processed_videos:
-        video_id = processed['video_id']
-        if video_id in filtered_lookup:
-            filtered_info = filtered_lookup[video_id]
+    for video_id, batch_file in load_processed_entries():
+        processed_count += 1
+        filtered_info = filtered_lookup.get(video_id)
+        if filtered_info:
             matched_videos.append({
                 'video_id': video_id,
                 'filtered_index': filtered_info['filtered_index'],
                 'original_index': filtered_info['original_index'],
                 'title': filtered_info['title'],
                 'duration': filtered_info['duration'],
-                'batch_file': processed['batch_file']
+                'batch_file': batch_file
             })
         else:
-            not_in_filtered.append(processed)
+            not_in_filtered.append({'video_id': video_id, 'batch_file': batch_file})
+    
+    if not processed_count:
+        print("❌ No processed videos found in batch files")
+        return
+    
+    print(f"📝 Found {processed_count} processed videos from batch files")
     
     # Sort matched videos by filtered index
     matched_videos.sort(key=lambda x: x['filtered_index'])
@@ -95,7 +118,7 @@ def verify_progress_against_filtered():
     if not_in_filtered:
         print(f"\n⚠️  Videos NOT in filtered catalog (outside 2-5 min range):")
         for video in not_in_filtered[:5]:  # Show first 5
-            print(f"  - {video['title'][:50]}...")
+            print(f"  - {video['video_id']} ({video['batch_file']})")
         if len(not_in_filtered) > 5:
             print(f"  ... and {len(not_in_filtered) - 5} more")
     
@@ -112,21 +135,18 @@ def verify_progress_against_filtered():
             print(f"... and {len(matched_videos) - 10} more processed videos")
         
         # Find gaps and determine resume point
-        processed_indices = [v['filtered_index'] for v in matched_videos]
+        processed_indices = {v['filtered_index'] for v in matched_videos}
         max_processed = max(processed_indices)
         
-        # Check for gaps in sequence
-        gaps = []
-        for i in range(max_processed + 1):
-            if i not in processed_indices:
-                gaps.append(i)
+        # Check for gaps in sequence (set membership keeps this linear)
+        gaps = [i for i in range(max_processed + 1) if i not in processed_indices]
         
         print(f"\n🎯 Resume Analysis:")
         print(f"  Highest processed index: {max_processed}")
         print(f"  Total gaps in sequence: {len(gaps)}")
         
         if gaps:
-            first_gap = min(gaps)
+            first_gap = gaps[0]
             print(f"  First gap at index: {first_gap}")
             print(f"  📍 RECOMMENDED RESUME INDEX: {first_gap}")
         else:
@@ -135,13 +155,13 @@ def verify_progress_against_filtered():
             print(f"  📍 RECOMMENDED RESUME INDEX: {next_index}")
         
         # Show what's at the resume index
-        resume_index = min(gaps) if gaps else max_processed + 1
-        if resume_index < len(filtered_videos):
-            next_video = filtered_videos[resume_index]
+        resume_index = gaps[0] if gaps else max_processed + 1
+        next_video = filtered_lookup.get(filtered_ids[resume_index]) if resume_index < video_count else None
+        if next_video:
             print(f"\n🚀 Next video to process:")
             print(f"  Index: {resume_index}")
-            print(f"  Title: {next_video.get('title', 'Unknown')}")
-            print(f"  Duration: {next_video.get('duration_formatted', 'Unknown')}")
+            print(f"  Title: {next_video['title']}")
+            print(f"  Duration: {next_video['duration']}")
         
         print(f"\n🎯 RESUME COMMAND:")
         print(f"python scripts/vpn_batch_orchestrator.py --total-videos 20 --start-index {resume_index}")
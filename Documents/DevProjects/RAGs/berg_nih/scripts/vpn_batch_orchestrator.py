@@ -8,31 +8,168 @@ Enhanced with Geographic Diversity to avoid regional detection
 import subprocess
 import time
 import logging
+import logging.handlers
 import argparse
+import itertools
 import json
 import os
+import queue
 import random
+import re
+import select
+import selectors
+import shlex
+import shutil
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+import requests
+
+try:
+    import orjson  # Optional fast JSON codec
+except ImportError:
+    orjson = None
+
+# Catalog the batches index into, and where per-batch slices of it are written
+# so each child parses only its own videos. The duration window must match
+# the extractor's defaults, since its --start-index counts filtered videos.
+CATALOG_FILE = "data/processed/berg_filtered_catalog.json"
+BATCH_SLICE_DIR = "data/processed/.batches"
+MIN_DURATION_SECONDS = 121
+MAX_DURATION_SECONDS = 300
+
+# Public IP lookup used to confirm a switch: a VPN counts as up once this
+# answers with a new IP, polled every VPN_READY_POLL_SECONDS up to the timeout
+IP_CHECK_URL = "https://ifconfig.me/ip"
+VPN_READY_POLL_SECONDS = 0.5
+VPN_READY_TIMEOUT_SECONDS = 25.0
+
+# Locations known to work well, preferred when diversity allows
+TESTED_LOCATIONS = frozenset(["louisville-us", "idaho-falls-us", "phoenix-us",
+                              "seattle-us", "oklahoma-city-us"])
+
+# Selection weights: tested locations are TESTED_WEIGHT times as likely, and
+# each earlier use of a city divides its weight by 1 + REUSE_PENALTY * uses
+TESTED_WEIGHT = 5.0
+REUSE_PENALTY = 3
+
+# Prefix that runs a command inside a named network namespace (needs root);
+# with --parallel, worker i uses namespace f"{netns_prefix}{i}", each with its own VPN
+NETNS_EXEC = [shutil.which('ip') or 'ip', 'netns', 'exec']
+
+# VPN switchers, tried in this order before falling back to a manual prompt
+HMA_CLI_PATH = "/mnt/c/Program Files/HMA! Pro VPN/HMA! Pro VPN.exe"
+OPENVPN_SCRIPT = "hma-openvpn.sh"  # Community OpenVPN script
+
+# Windows command interpreter (via WSL interop), resolved once; an absolute
+# path lets Popen take the posix_spawn fast path instead of fork + exec
+_CMD_EXE = shutil.which('cmd.exe') or 'cmd.exe'
+
+# Lines the extractor prints per finished or skipped video (VIDEO_SUCCESS_LINE,
+# VIDEO_FAILURE_LINE, VIDEO_SKIPPED_LINE in transcript_extractor_human_batch),
+# matched on raw bytes
+_SUCCESS_RE = re.compile(rb'Successfully processed video')
+_FAILURE_RE = re.compile(rb'Failed to process video')
+_SKIPPED_RE = re.compile(rb'Skipped already processed video')
+
+# Start of the reply a --daemon extractor prints when it finishes a job
+_DONE_PREFIX = b'{"done"'
+
+# Kill a batch subprocess that has produced no output at all for this long
+BATCH_IDLE_TIMEOUT_SECONDS = 15 * 60
+
+# Unanswered manual switch prompts retry the automatic switchers after this long
+MANUAL_PROMPT_TIMEOUT_SECONDS = 300
+
+def _netns_cmd(cmd, netns=None):
+    """Wrap a command so it runs inside a network namespace (unchanged when netns is None)"""
+    return [*NETNS_EXEC, netns, *cmd] if netns else cmd
+
+def _iter_output_lines(process, idle_timeout):
+    """Yield ('out'|'err', line bytes) from a subprocess's pipes as soon as they arrive
+    
+    Both pipes are non-blocking and watched by one selector, so each readiness
+    event costs a single os.read however many lines it carries. Raises
+    TimeoutError if neither pipe produces anything for idle_timeout seconds.
+    """
+    sel = selectors.DefaultSelector()
+    buffers = {}
+    for stream, tag in ((process.stdout, 'out'), (process.stderr, 'err')):
+        os.set_blocking(stream.fileno(), False)
+        sel.register(stream, selectors.EVENT_READ, tag)
+        buffers[tag] = b''
+    
+    try:
+        deadline = time.monotonic() + idle_timeout
+        while sel.get_map():
+            events = sel.select(timeout=max(0, deadline - time.monotonic()))
+            if not events:
+                raise TimeoutError(f"no output for {idle_timeout}s")
+            deadline = time.monotonic() + idle_timeout
+            
+            for key, _ in events:
+                tag = key.data
+                chunk = os.read(key.fd, 1 << 16)
+                if not chunk:  # EOF: flush a trailing partial line
+                    sel.unregister(key.fileobj)
+                    if buffers[tag]:
+                        yield tag, buffers[tag]
+                    continue
+                
+                *lines, buffers[tag] = (buffers[tag] + chunk).split(b'\n')
+                for line in lines:
+                    yield tag, line
+    finally:
+        sel.close()
+
 class VPNBatchOrchestrator:
-    def __init__(self, log_dir="logs"):
+    def __init__(self, log_dir="logs", mirror_stdout=False, manual_timeout=MANUAL_PROMPT_TIMEOUT_SECONDS,
+                 persistent_worker=False):
         self.processed_videos = 0
+        self._persistent = persistent_worker  # Reuse one --daemon extractor per namespace
+        self._workers = {}  # netns (None = host) -> (process, output line iterator)
+        self._mirror = mirror_stdout  # Echo every batch stdout line to our stdout
+        self._manual_timeout = manual_timeout  # None/0 waits for ENTER indefinitely
         self.current_location = None
         self.locations_used = []
+        self._use_counts = Counter()  # Switches per location, to spread cities out
+        self._recent_regions = frozenset()  # Regions of the last 2 locations, the diversity cache key
+        self._rng = random.Random()
+        self.netns_locations = {}  # Per-namespace location in --parallel mode
+        self._state_lock = threading.Lock()
+        self._http = requests.Session()
+        self._last_ip = {}  # Last verified public IP per namespace (None = this host)
         self.start_time = datetime.now()
         
+        # The switch for the next batch starts while the current batch winds down
+        self._vpn_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vpn-switch')
+        self._next_vpn_future = None
+        self._catalog_videos = None  # Duration-filtered catalog, loaded on first batch
+        
+        # Probe the switchers once; stat on /mnt/c crosses the slow WSL filesystem bridge
+        self._has_hma = os.path.exists(HMA_CLI_PATH)
+        self._has_openvpn = os.path.exists(OPENVPN_SCRIPT)
+        
         # Setup logging
         Path(log_dir).mkdir(exist_ok=True)
+        self._state_file = Path(log_dir) / "state.json"  # Progress saved after each batch
         log_file = f"{log_dir}/orchestrator_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
-        )
+        # Log calls only enqueue records; a listener thread does the file and
+        # console writes, keeping I/O out of the batch output monitor loop
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        log_queue = queue.Queue(-1)
+        root = logging.getLogger()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
+        self._log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._log_listener.start()
         self.logger = logging.getLogger(__name__)
         
         # VPN locations organized by geographic regions for maximum diversity
@@ -54,213 +191,417 @@ class VPNBatchOrchestrator:
             self.vpn_locations.extend(locations)
             for loc in locations:
                 self.location_to_region[loc] = region
+        
+        # Rendered region lines for the manual switch prompt
+        self._region_help = {region: f"{region.upper()}: {', '.join(locations)}"
+                             for region, locations in self.vpn_regions.items()}
+        
+        # (candidates, base weights) for every set of up to 2 recent regions,
+        # so selection is a single dict lookup
+        self._diverse_cache = {}
+        for r in range(3):
+            for excluded in itertools.combinations(self.vpn_regions, r):
+                candidates = [loc for loc in self.vpn_locations
+                              if self.location_to_region[loc] not in excluded]
+                self._diverse_cache[frozenset(excluded)] = (
+                    candidates,
+                    [TESTED_WEIGHT if loc in TESTED_LOCATIONS else 1.0 for loc in candidates]
+                )
+    
+    def _update_recent_regions(self):
+        """Refresh the recent-regions key after locations_used changes"""
+        # Manually entered location names have no region
+        self._recent_regions = frozenset(self.location_to_region[loc] for loc in self.locations_used[-2:]
+                                         if loc in self.location_to_region)
     
     def _select_geographically_diverse_location(self):
         """Select location from different geographic region than recent locations"""
-        # Get regions of recently used locations
-        recent_regions = []
-        for loc in self.locations_used[-2:]:  # Last 2 locations
-            region = self.location_to_region.get(loc)
-            if region:
-                recent_regions.append(region)
-        
-        # Find locations from different regions
-        available_locations = []
-        for location in self.vpn_locations:
-            location_region = self.location_to_region.get(location)
-            if location_region not in recent_regions:
-                available_locations.append(location)
-        
-        # If no diverse locations available, use any unused location
-        if not available_locations:
-            available_locations = [loc for loc in self.vpn_locations 
-                                 if loc not in self.locations_used[-3:]]
-        
-        # Final fallback: use any location
-        if not available_locations:
-            available_locations = self.vpn_locations
-            
-        # Prioritize tested locations when available
-        tested_locations = ["louisville-us", "idaho-falls-us", "phoenix-us", 
-                          "seattle-us", "oklahoma-city-us"]
+        recent_regions = self._recent_regions
         
-        tested_available = [loc for loc in available_locations if loc in tested_locations]
-        if tested_available:
-            selected = random.choice(tested_available)
-        else:
-            selected = random.choice(available_locations)
+        # One weighted draw over locations from other regions, favoring tested
+        # cities and ones used least so far
+        candidates, base_weights = self._diverse_cache[recent_regions]
+        weights = [weight / (1 + REUSE_PENALTY * self._use_counts[loc])
+                   for loc, weight in zip(candidates, base_weights)]
+        selected = self._rng.choices(candidates, weights=weights)[0]
             
         self.logger.info(f"Geographic diversity selection:")
-        self.logger.info(f"Recent regions used: {recent_regions}")
-        self.logger.info(f"Selected location: {selected} (region: {self.location_to_region.get(selected)})")
+        self.logger.info(f"Recent regions used: {sorted(recent_regions)}")
+        self.logger.info(f"Selected location: {selected} (region: {self.location_to_region[selected]})")
         
         return selected
     
-    def switch_vpn_location(self, target_location=None):
-        """Switch VPN location with maximum geographic diversity"""
+    def _record_location(self, location, netns=None):
+        """Note a completed switch, globally and for the namespace it happened in"""
+        with self._state_lock:
+            if netns:
+                self.netns_locations[netns] = location
+            else:
+                self.current_location = location
+            self.locations_used.append(location)
+            self._use_counts[location] += 1
+            self._update_recent_regions()
+    
+    def _save_state(self):
+        """Atomically write progress and VPN history so a rerun can pick up where this one stopped"""
+        state = {
+            'processed_videos': self.processed_videos,
+            'locations_used': self.locations_used,
+            'current_location': self.current_location,
+            'saved_at': datetime.now().isoformat()
+        }
+        tmp_path = self._state_file.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._state_file)
+    
+    def load_state(self):
+        """Restore a saved run's VPN history; returns its next start index, or None without saved state"""
+        try:
+            with open(self._state_file) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable state file {self._state_file}: {e}")
+            return None
+        
+        self.locations_used = state.get('locations_used', [])
+        self.current_location = state.get('current_location')
+        self._use_counts = Counter(self.locations_used)
+        self._update_recent_regions()
+        self.logger.info(f"Resuming from {self._state_file} (saved {state.get('saved_at')}): "
+                         f"next index {state['processed_videos']}, last location {self.current_location}")
+        return state['processed_videos']
+    
+    def switch_vpn_location(self, target_location=None, netns=None):
+        """Switch VPN location with maximum geographic diversity
+        
+        With netns, only that network namespace's VPN is switched.
+        """
         if target_location is None:
-            target_location = self._select_geographically_diverse_location()
+            with self._state_lock:
+                target_location = self._select_geographically_diverse_location()
         
-        self.logger.info(f"Attempting to switch VPN to: {target_location}")
+        scope = f" [{netns}]" if netns else ""
+        self.logger.info(f"Attempting to switch VPN{scope} to: {target_location}")
         self.logger.info(f"Target region: {self.location_to_region.get(target_location, 'unknown')}")
         
+        # The switch is confirmed once the public IP moves away from this one
+        old_ip = self._last_ip.get(netns)
+        if old_ip is None:
+            try:
+                old_ip = self._current_ip(netns)
+            except Exception as e:
+                self.logger.debug(f"Could not read pre-switch IP: {e}")
+        
         # Method 1: Try HMA CLI (if available)
-        if self._try_hma_cli(target_location):
-            self.current_location = target_location
-            self.locations_used.append(target_location)
-            self.logger.info(f"Successfully switched to {target_location} via HMA CLI")
+        if self._try_hma_cli(target_location, old_ip, netns):
+            self._record_location(target_location, netns)
+            self.logger.info(f"Successfully switched{scope} to {target_location} via HMA CLI")
             return True
             
         # Method 2: Try OpenVPN script (if available)  
-        if self._try_openvpn_script(target_location):
-            self.current_location = target_location
-            self.locations_used.append(target_location)
-            self.logger.info(f"Successfully switched to {target_location} via OpenVPN")
+        if self._try_openvpn_script(target_location, old_ip, netns):
+            self._record_location(target_location, netns)
+            self.logger.info(f"Successfully switched{scope} to {target_location} via OpenVPN")
             return True
             
         # Method 3: Manual prompt
-        return self._prompt_manual_switch(target_location)
+        return self._prompt_manual_switch(target_location, old_ip, netns)
     
-    def _try_hma_cli(self, location):
+    def _try_hma_cli(self, location, old_ip=None, netns=None):
         """Try switching via HMA CLI"""
+        if netns or not self._has_hma:
+            return False  # The Windows HMA client switches the whole host, not one namespace
         try:
-            # Try Windows HMA CLI
-            hma_path = "/mnt/c/Program Files/HMA! Pro VPN/HMA! Pro VPN.exe"
-            if os.path.exists(hma_path):
-                cmd = [hma_path, f"-cp:{location}"]
-                result = subprocess.run(cmd, capture_output=True, timeout=60)
-                if result.returncode == 0:
-                    time.sleep(20)  # Wait for VPN to stabilize
-                    return True
+            cmd = [HMA_CLI_PATH, f"-cp:{location}"]
+            result = subprocess.run(cmd, capture_output=True, timeout=60)
+            if result.returncode == 0:
+                return self._wait_until_vpn_ready(old_ip, netns)
         except Exception as e:
             self.logger.debug(f"HMA CLI failed: {e}")
         return False
     
-    def _try_openvpn_script(self, location):
+    def _try_openvpn_script(self, location, old_ip=None, netns=None):
         """Try switching via OpenVPN script"""
+        if not self._has_openvpn:
+            return False
         try:
-            # Look for community OpenVPN scripts
-            openvpn_script = "hma-openvpn.sh"
-            if os.path.exists(openvpn_script):
-                cmd = [f"./{openvpn_script}", "-f"]  # Connect to fastest
-                result = subprocess.run(cmd, capture_output=True, timeout=120)
-                if result.returncode == 0:
-                    time.sleep(20)  # Wait for VPN to stabilize
-                    return True
+            cmd = _netns_cmd([f"./{OPENVPN_SCRIPT}", "-f"], netns)  # Connect to fastest
+            result = subprocess.run(cmd, capture_output=True, timeout=120)
+            if result.returncode == 0:
+                return self._wait_until_vpn_ready(old_ip, netns)
         except Exception as e:
             self.logger.debug(f"OpenVPN script failed: {e}")
         return False
     
-    def _prompt_manual_switch(self, location):
+    def _prompt_manual_switch(self, location, old_ip=None, netns=None):
         """Prompt user for manual VPN switch with geographic guidance"""
-        self.logger.info(f"\n{'='*60}")
-        self.logger.info(f"MANUAL VPN SWITCH REQUIRED")
-        self.logger.info(f"Recommended location: {location}")
-        self.logger.info(f"Recommended region: {self.location_to_region.get(location, 'unknown')}")
-        self.logger.info(f"")
-        self.logger.info(f"🎯 IMPORTANT: Choose location from DIFFERENT region!")
-        self.logger.info(f"Recently used regions: {[self.location_to_region.get(loc, 'unknown') for loc in self.locations_used[-2:]]}")
-        self.logger.info(f"")
-        self.logger.info(f"Available regions to choose from:")
-        recent_regions = [self.location_to_region.get(loc) for loc in self.locations_used[-2:]]
-        for region, locations in self.vpn_regions.items():
-            if region not in recent_regions:
-                self.logger.info(f"  ✅ {region.upper()}: {', '.join(locations)}")
-            else:
-                self.logger.info(f"  ❌ {region.upper()}: {', '.join(locations)} (recently used)")
-        self.logger.info(f"{'='*60}")
+        # The guidance block is only rendered if INFO records are emitted
+        if self.logger.isEnabledFor(logging.INFO):
+            recent_regions = [self.location_to_region.get(loc, 'unknown') for loc in self.locations_used[-2:]]
+            region_lines = '\n'.join(
+                f"  ❌ {line} (recently used)" if region in recent_regions else f"  ✅ {line}"
+                for region, line in self._region_help.items()
+            )
+            scope = f" in network namespace {netns}" if netns else ""
+            self.logger.info(
+                f"\n{'='*60}\n"
+                f"MANUAL VPN SWITCH REQUIRED{scope}\n"
+                f"Recommended location: {location}\n"
+                f"Recommended region: {self.location_to_region.get(location, 'unknown')}\n"
+                f"\n"
+                f"🎯 IMPORTANT: Choose location from DIFFERENT region!\n"
+                f"Recently used regions: {recent_regions}\n"
+                f"\n"
+                f"Available regions to choose from:\n"
+                f"{region_lines}\n"
+                f"{'='*60}"
+            )
         
         while True:
-            response = input("Press ENTER after switching VPN to different region (or 'q' to quit): ").strip()
+            print("Press ENTER after switching VPN to different region (or 'q' to quit): ", end='', flush=True)
+            if self._manual_timeout:
+                ready, _, _ = select.select([sys.stdin], [], [], self._manual_timeout)
+                if not ready:
+                    # Nobody at the keyboard: retry the automatic switchers, then keep waiting
+                    print()
+                    self.logger.warning(f"Manual prompt timed out after {self._manual_timeout}s; retrying automatic switch")
+                    if self._try_hma_cli(location, old_ip, netns) or self._try_openvpn_script(location, old_ip, netns):
+                        self._record_location(location, netns)
+                        return True
+                    continue
+            
+            line = sys.stdin.readline()
+            if not line:  # stdin closed, no one can answer
+                return False
+            response = line.strip()
             if response.lower() == 'q':
                 return False
             if response == "":
                 # Verify new IP
-                if self._verify_new_ip():
-                    self.current_location = location
-                    self.locations_used.append(location)
+                if self._wait_until_vpn_ready(old_ip, netns):
+                    self._record_location(location, netns)
                     return True
                 else:
                     self.logger.warning("IP verification failed. Please try switching again.")
     
-    def _verify_new_ip(self):
-        """Verify VPN switched to new IP"""
-        try:
-            result = subprocess.run(['curl', '-s', 'ifconfig.me'], 
+    def _current_ip(self, netns=None):
+        """Public IP as seen from this host, or from inside a network namespace"""
+        if netns:
+            # The session's sockets live in our namespace, so ask from inside theirs
+            result = subprocess.run(_netns_cmd(['curl', '-s', IP_CHECK_URL], netns),
                                   capture_output=True, text=True, timeout=10)
-            new_ip = result.stdout.strip()
-            self.logger.info(f"Current IP: {new_ip}")
-            time.sleep(15)  # Additional stabilization time
-            return True
+            return result.stdout.strip()
+        
+        response = self._http.get(IP_CHECK_URL, timeout=5)
+        response.raise_for_status()
+        return response.text.strip()
+    
+    def _wait_until_vpn_ready(self, old_ip, netns=None, deadline=VPN_READY_TIMEOUT_SECONDS):
+        """Poll the public IP until the tunnel is up with a new IP (False on timeout)
+        
+        A successful lookup means DNS and routing work, so no extra settle time is needed.
+        """
+        # Connections kept alive from before the switch would still exit via the old route
+        self._http.close()
+        
+        start = time.monotonic()
+        while time.monotonic() - start < deadline:
+            time.sleep(VPN_READY_POLL_SECONDS)
+            try:
+                new_ip = self._current_ip(netns)
+            except Exception as e:
+                self.logger.debug(f"IP check failed: {e}")
+                continue
+            
+            if new_ip and new_ip != old_ip:
+                self._last_ip[netns] = new_ip
+                self.logger.info(f"VPN ready after {time.monotonic() - start:.1f}s - current IP: {new_ip}")
+                return True
+        
+        self.logger.warning(f"IP verification failed: still {old_ip or 'unknown'} after {deadline:.0f}s")
+        return False
+    
+    def _start_next_vpn_switch(self):
+        """Begin the next VPN switch in the background, once per batch"""
+        if self._next_vpn_future is None:
+            self.logger.info("Batch videos done - switching VPN in the background while it wraps up...")
+            self._next_vpn_future = self._vpn_executor.submit(self.switch_vpn_location)
+    
+    def _finish_vpn_switch(self):
+        """Wait for a background switch: True/False for its outcome, None if none was started"""
+        future, self._next_vpn_future = self._next_vpn_future, None
+        if future is None:
+            return None
+        try:
+            return future.result()
         except Exception as e:
-            self.logger.warning(f"IP verification failed: {e}")
+            self.logger.warning(f"Background VPN switch failed: {e}")
             return False
     
-    def run_batch_script(self, start_index, batch_size):
-        """Run transcript extraction batch and wait for completion"""
-        self.logger.info(f"Starting batch: videos {start_index} to {start_index + batch_size - 1}")
-        
+    def _prepare_batch_file(self, start_index, batch_size):
+        """Write this batch's videos to their own small input file (None if the catalog can't be read)"""
+        try:
+            with self._state_lock:
+                if self._catalog_videos is None:
+                    with open(CATALOG_FILE, 'rb') as f:
+                        data = f.read()
+                    catalog = orjson.loads(data) if orjson else json.loads(data)
+                    self._catalog_videos = [
+                        video for video in catalog.get('videos', [])
+                        if MIN_DURATION_SECONDS <= video.get('duration_seconds', 0) <= MAX_DURATION_SECONDS
+                    ]
+            
+            batch_videos = self._catalog_videos[start_index:start_index + batch_size]
+            payload = {'videos': batch_videos}
+            os.makedirs(BATCH_SLICE_DIR, exist_ok=True)
+            batch_file = os.path.join(BATCH_SLICE_DIR, f"batch_{start_index}.json")
+            with open(batch_file, 'wb') as f:
+                f.write(orjson.dumps(payload) if orjson else json.dumps(payload).encode('utf-8'))
+            return batch_file
+        except Exception as e:
+            self.logger.warning(f"Could not pre-slice catalog, passing the full catalog: {e}")
+            return None
+    
+    def _batch_command(self, extra_args, netns=None):
+        """Command line for the extractor script, via Windows uv, optionally in a namespace"""
         # Use Windows Python via WSL - call Windows UV command
         cmd = [
-            'cmd.exe', '/c', 'uv', 'run', 'python', 
+            _CMD_EXE, '/c', 'uv', 'run', 'python', 
             'scripts/transcript_extractor_human_batch.py',
-            '--input-file', 'data/processed/berg_filtered_catalog.json',
-            '--start-index', str(start_index),
-            '--target-videos', str(batch_size)
+            *extra_args
         ]
+        return _netns_cmd(cmd, netns)
+    
+    def _spawn(self, cmd, **kwargs):
+        """Start an extractor with its stdout and stderr piped to us"""
+        return subprocess.Popen(
+            cmd, 
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.PIPE,
+            close_fds=False,  # Our fds are non-inheritable anyway; skips the close loop
+            **kwargs
+        )
+    
+    def _get_worker(self, netns=None):
+        """The persistent extractor for a namespace, (re)started if it isn't running"""
+        worker = self._workers.get(netns)
+        if worker and worker[0].poll() is None:
+            return worker
         
-        self.logger.info(f"Command: {' '.join(cmd)}")
+        if worker:
+            self._stop_worker(netns)
+        process = self._spawn(self._batch_command(['--daemon'], netns), stdin=subprocess.PIPE)
+        self.logger.info(f"Started persistent extractor with PID: {process.pid}")
+        worker = self._workers[netns] = (process, _iter_output_lines(process, BATCH_IDLE_TIMEOUT_SECONDS))
+        return worker
+    
+    def _stop_worker(self, netns=None):
+        """Let a persistent extractor exit on stdin EOF, killing it if it doesn't"""
+        worker = self._workers.pop(netns, None)
+        if worker is None:
+            return
         
+        process, lines = worker
+        lines.close()
         try:
-            # Run script and wait for complete termination
-            self.logger.info("Starting subprocess...")
-            process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            self.logger.info(f"Process started with PID: {process.pid}")
-            
-            # Monitor output in real-time with timeout
-            success_count = 0
-            timeout_counter = 0
-            max_timeout = 30  # 30 seconds timeout for debugging
-            
-            while True:
-                # Check for stdout
-                output = process.stdout.readline()
-                # Check for stderr immediately
-                stderr_line = process.stderr.readline()
-                
-                if stderr_line:
-                    self.logger.error(f"STDERR: {stderr_line.strip()}")
+            process.stdin.close()
+            process.wait(timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+    
+    def run_batch_script(self, start_index, batch_size, on_videos_done=None, netns=None):
+        """Run transcript extraction batch and wait for completion
+        
+        on_videos_done is called once, as soon as the last video of the batch
+        reports its result (success, failure or skipped), while the subprocess is still
+        finishing up. With netns the batch runs inside that network namespace.
+        """
+        self.logger.info(f"Starting batch: videos {start_index} to {start_index + batch_size - 1}")
+        
+        # The child gets just this batch's videos when pre-slicing works
+        batch_file = self._prepare_batch_file(start_index, batch_size)
+        input_file = batch_file or CATALOG_FILE
+        child_start_index = 0 if batch_file else start_index
+        
+        try:
+            if self._persistent:
+                # Hand the job to the long-lived extractor; its reply line ends the batch
+                process, lines = self._get_worker(netns)
+                job = {'input_file': input_file, 'start_index': child_start_index, 'target_videos': batch_size}
+                process.stdin.write(json.dumps(job).encode('utf-8') + b'\n')
+                process.stdin.flush()
+            else:
+                cmd = self._batch_command([
+                    '--input-file', input_file,
+                    '--start-index', str(child_start_index),
+                    '--target-videos', str(batch_size)
+                ], netns)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Command: %s", shlex.join(cmd))
                 
-                if output == '' and stderr_line == '' and process.poll() is not None:
-                    break
-                    
-                if output:
-                    print(f"STDOUT: {output.strip()}")
-                    if "Successfully processed video" in output:
-                        success_count += 1
-                    timeout_counter = 0  # Reset timeout on activity
-                else:
-                    timeout_counter += 1
-                    if timeout_counter > max_timeout:
-                        self.logger.error("Process timed out after 30 seconds - killing")
-                        process.kill()
-                        break
-                    time.sleep(1)
+                # Run script and wait for complete termination
+                self.logger.info("Starting subprocess...")
+                process = self._spawn(cmd)
+                self.logger.info(f"Process started with PID: {process.pid}")
+                lines = _iter_output_lines(process, BATCH_IDLE_TIMEOUT_SECONDS)
             
-            return_code = process.wait()  # Ensure complete termination
+            # Monitor stdout and stderr together in real-time with an idle timeout
+            success_count = failure_count = skipped_count = 0
+            reply = None
+            mirror = self._mirror
+            _write = sys.stdout.write
+            # Bound once for the per-line loop; lines aren't decoded when stderr logging is off
+            log_error = self.logger.error
+            stderr_enabled = self.logger.isEnabledFor(logging.ERROR)
+            try:
+                for tag, line in lines:
+                    # Lines stay bytes; they're only decoded to be shown
+                    if tag == 'err':
+                        if stderr_enabled:
+                            log_error(f"STDERR: {line.strip().decode('utf-8', 'replace')}")
+                    elif self._persistent and line.startswith(_DONE_PREFIX):
+                        reply = json.loads(line)
+                        break
+                    else:
+                        if mirror:
+                            _write(f"STDOUT: {line.strip().decode('utf-8', 'replace')}\n")
+                        if _SUCCESS_RE.search(line):
+                            success_count += 1
+                        elif _FAILURE_RE.search(line):
+                            failure_count += 1
+                        elif _SKIPPED_RE.search(line):
+                            skipped_count += 1
+                        else:
+                            continue
+                        if mirror:
+                            sys.stdout.flush()  # Once per video rather than per line
+                        if success_count + failure_count + skipped_count == batch_size and on_videos_done:
+                            on_videos_done()
+            except TimeoutError:
+                self.logger.error(f"Process produced no output for {BATCH_IDLE_TIMEOUT_SECONDS}s - killing")
+                process.kill()
             
-            # Check for errors in stderr
-            stderr_output = process.stderr.read()
-            if stderr_output:
-                self.logger.error(f"Process stderr: {stderr_output}")
+            if mirror:
+                sys.stdout.flush()
+            if not self._persistent:
+                return_code = process.wait()  # Ensure complete termination
+                process.stdout.close()
+                process.stderr.close()
+            elif reply is None:
+                # The worker died or hung; the next batch starts a fresh one
+                self._stop_worker(netns)
+                return_code = -1
+            else:
+                return_code = 1 if reply.get('error') else 0
+                success_count = reply.get('succeeded', success_count)  # 'processed' counts failures too
                 
         except Exception as e:
             self.logger.error(f"Failed to run batch script: {e}")
@@ -268,57 +609,74 @@ class VPNBatchOrchestrator:
         
         self.logger.info(f"Batch completed with return code: {return_code}")
         self.logger.info(f"Successfully processed videos: {success_count}")
+        if skipped_count:
+            self.logger.info(f"Already processed videos skipped: {skipped_count}")
         
-        return return_code == 0 and success_count > 0
+        # A batch whose videos were all in the database already has nothing to retry
+        success = return_code == 0 and (success_count > 0 or (skipped_count > 0 and failure_count == 0))
+        if success and batch_file:
+            os.remove(batch_file)  # Failed batches keep theirs for the retry
+        return success
     
     def run_automated_batches(self, total_videos, videos_per_batch=10, start_index=0):
         """Main orchestration loop - Geographic diversity VPN switching"""
         self.processed_videos = start_index
         target_end_index = start_index + total_videos
+        info_enabled = self.logger.isEnabledFor(logging.INFO)  # Skip building banners nobody sees
         
-        self.logger.info(f"Starting automated processing with geographic diversity:")
-        self.logger.info(f"Using filtered catalog: berg_filtered_catalog.json (2-5 minute videos only)")
-        self.logger.info(f"Total target: {total_videos} videos")
-        self.logger.info(f"Processing range: {start_index} to {target_end_index - 1}")
-        self.logger.info(f"Batch size: {videos_per_batch} videos") 
-        self.logger.info(f"Starting from index: {start_index}")
-        self.logger.info(f"VPN regions available: {len(self.vpn_regions)}")
-        self.logger.info(f"Strategy: Bounce between geographic regions to avoid detection")
+        self.logger.info(
+            f"Starting automated processing with geographic diversity:\n"
+            f"Using filtered catalog: berg_filtered_catalog.json (2-5 minute videos only)\n"
+            f"Total target: {total_videos} videos\n"
+            f"Processing range: {start_index} to {target_end_index - 1}\n"
+            f"Batch size: {videos_per_batch} videos\n"
+            f"Starting from index: {start_index}\n"
+            f"VPN regions available: {len(self.vpn_regions)}\n"
+            f"Strategy: Bounce between geographic regions to avoid detection"
+        )
         
         while self.processed_videos < target_end_index:
             batch_start_index = self.processed_videos
             batch_size = min(videos_per_batch, target_end_index - self.processed_videos)
             
-            self.logger.info(f"\n{'='*50}")
-            self.logger.info(f"BATCH {(self.processed_videos // videos_per_batch) + 1}")
-            self.logger.info(f"Videos: {batch_start_index} to {batch_start_index + batch_size - 1}")
-            self.logger.info(f"Current location: {self.current_location}")
-            self.logger.info(f"Current region: {self.location_to_region.get(self.current_location, 'unknown')}")
-            self.logger.info(f"{'='*50}")
+            if info_enabled:
+                self.logger.info(
+                    f"\n{'='*50}\n"
+                    f"BATCH {(self.processed_videos // videos_per_batch) + 1}\n"
+                    f"Videos: {batch_start_index} to {batch_start_index + batch_size - 1}\n"
+                    f"Current location: {self.current_location}\n"
+                    f"Current region: {self.location_to_region.get(self.current_location, 'unknown')}\n"
+                    f"{'='*50}"
+                )
             
-            # Run batch script and wait for completion
-            success = self.run_batch_script(batch_start_index, batch_size)
+            # Run batch script and wait for completion; unless this is the last
+            # batch, the next VPN switch starts once its videos are done
+            more_batches = batch_start_index + batch_size < target_end_index
+            success = self.run_batch_script(
+                batch_start_index, batch_size,
+                on_videos_done=self._start_next_vpn_switch if more_batches else None
+            )
+            switched = self._finish_vpn_switch()
             
             if success:
                 self.processed_videos += batch_size
+                self._save_state()
                 self.logger.info(f"Batch completed successfully!")
                 self.logger.info(f"Progress: {self.processed_videos - start_index}/{total_videos} videos")
                 
-                # Switch VPN AFTER successful batch completion (if not last batch)
-                if self.processed_videos < target_end_index:
+                # Switch VPN AFTER successful batch completion (if not last batch),
+                # synchronously if the background switch didn't run or failed
+                if self.processed_videos < target_end_index and not switched:
                     self.logger.info("Switching VPN to different geographic region for next batch...")
                     if not self.switch_vpn_location():
                         self.logger.error("VPN switch failed. Exiting.")
                         return False
-                        
-                    self.logger.info("Waiting for VPN stabilization...")
-                    time.sleep(15)  # Allow VPN to fully stabilize
                     
             else:
                 self.logger.error("Batch failed! Attempting recovery...")
                 
-                # Switch VPN for recovery attempt
-                if not self.switch_vpn_location():
+                # Switch VPN for recovery attempt (already done if the background switch succeeded)
+                if not switched and not self.switch_vpn_location():
                     self.logger.error("Recovery VPN switch failed. Manual intervention required.")
                     return False
                 
@@ -326,16 +684,82 @@ class VPNBatchOrchestrator:
                 # Don't increment processed_videos - retry same batch
         
         elapsed = datetime.now() - self.start_time
-        self.logger.info(f"\nALL BATCHES COMPLETED!")
-        self.logger.info(f"Total videos processed: {self.processed_videos}")
-        self.logger.info(f"Total time: {elapsed}")
-        self.logger.info(f"Geographic diversity used:")
-        for i, location in enumerate(self.locations_used):
-            region = self.location_to_region.get(location, 'unknown')
-            self.logger.info(f"  Batch {i+1}: {location} ({region})")
+        if info_enabled:
+            diversity_lines = '\n'.join(
+                f"  Batch {i+1}: {location} ({self.location_to_region.get(location, 'unknown')})"
+                for i, location in enumerate(self.locations_used)
+            )
+            self.logger.info(
+                f"\nALL BATCHES COMPLETED!\n"
+                f"Total videos processed: {self.processed_videos}\n"
+                f"Total time: {elapsed}\n"
+                f"Geographic diversity used:\n"
+                f"{diversity_lines}"
+            )
         
         return True
 
+    def close(self):
+        """Stop the background VPN switch thread and extractors, and flush queued log records"""
+        self._vpn_executor.shutdown(wait=False, cancel_futures=True)
+        for netns in list(self._workers):
+            self._stop_worker(netns)
+        self._log_listener.stop()
+    
+    def run_parallel_batches(self, total_videos, videos_per_batch=10, start_index=0,
+                             parallel=2, netns_prefix='vpn'):
+        """Run batches on `parallel` workers at once, each in its own network namespace/VPN
+        
+        Workers pull disjoint index slices from a shared queue and switch their
+        own namespace's VPN after every batch, so K egress IPs work side by side.
+        """
+        target_end_index = start_index + total_videos
+        slices = [(s, min(videos_per_batch, target_end_index - s))
+                  for s in range(start_index, target_end_index, videos_per_batch)]
+        pending = queue.Queue()
+        for batch_slice in slices:
+            pending.put(batch_slice)
+        completed = set()
+        
+        self.logger.info(f"Starting parallel processing with {parallel} VPN namespaces:")
+        self.logger.info(f"Processing range: {start_index} to {target_end_index - 1} in {len(slices)} batches")
+        
+        def worker(netns):
+            while True:
+                try:
+                    batch_start_index, batch_size = pending.get_nowait()
+                except queue.Empty:
+                    return True
+                
+                self.logger.info(f"[{netns}] Videos {batch_start_index} to {batch_start_index + batch_size - 1} "
+                                 f"via {self.netns_locations.get(netns)}")
+                success = self.run_batch_script(batch_start_index, batch_size, netns=netns)
+                if success:
+                    with self._state_lock:
+                        completed.add(batch_start_index)
+                        # Resume point: the first slice not yet done
+                        self.processed_videos = next(
+                            (s for s, _ in slices if s not in completed), target_end_index
+                        )
+                        self._save_state()
+                else:
+                    self.logger.error(f"[{netns}] Batch at {batch_start_index} failed, requeueing")
+                    pending.put((batch_start_index, batch_size))
+                
+                if pending.empty():
+                    return True
+                if not self.switch_vpn_location(netns=netns):
+                    self.logger.error(f"[{netns}] VPN switch failed - worker stopping")
+                    return False
+        
+        with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix='batch-worker') as executor:
+            results = list(executor.map(worker, [f"{netns_prefix}{i}" for i in range(parallel)]))
+        
+        elapsed = datetime.now() - self.start_time
+        self.logger.info(f"\nPARALLEL BATCHES FINISHED: {len(completed)}/{len(slices)} batches")
+        self.logger.info(f"Total time: {elapsed}")
+        return len(completed) == len(slices) and all(results)
+
 def main():
     parser = argparse.ArgumentParser(
         description="Automated VPN + YouTube Transcript Extraction (Geographic Diversity)"
@@ -344,21 +768,47 @@ def main():
                        help='Total number of videos to process')
     parser.add_argument('--batch-size', type=int, default=10,
                        help='Videos per batch (default: 10)')
-    parser.add_argument('--start-index', type=int, default=0,
-                       help='Starting video index (for resume)')
+    parser.add_argument('--start-index', type=int, default=None,
+                       help='Starting video index (default: resume from <log-dir>/state.json, else 0)')
     parser.add_argument('--log-dir', default='logs',
                        help='Directory for log files')
+    parser.add_argument('--parallel', type=int, default=1,
+                       help='Run N batches at once, each in its own network namespace with its own VPN (default: 1)')
+    parser.add_argument('--netns-prefix', default='vpn',
+                       help='Namespace name prefix for --parallel; worker i uses <prefix><i> (default: vpn)')
+    parser.add_argument('--mirror-stdout', action='store_true',
+                       help='Echo every line the batch script prints to stdout (stderr is always logged)')
+    parser.add_argument('--persistent-worker', action='store_true',
+                       help='Keep one extractor process running across batches instead of starting one per batch')
+    parser.add_argument('--manual-timeout', type=float, default=MANUAL_PROMPT_TIMEOUT_SECONDS,
+                       help=f'Seconds to wait at the manual VPN prompt before retrying automatic switching; '
+                            f'0 waits forever (default: {MANUAL_PROMPT_TIMEOUT_SECONDS})')
     
     args = parser.parse_args()
     
-    orchestrator = VPNBatchOrchestrator(args.log_dir)
+    orchestrator = VPNBatchOrchestrator(args.log_dir, mirror_stdout=args.mirror_stdout,
+                                        manual_timeout=args.manual_timeout,
+                                        persistent_worker=args.persistent_worker)
+    
+    start_index = args.start_index
+    if start_index is None:
+        start_index = orchestrator.load_state() or 0
     
     try:
-        success = orchestrator.run_automated_batches(
-            total_videos=args.total_videos,
-            videos_per_batch=args.batch_size,
-            start_index=args.start_index
-        )
+        if args.parallel > 1:
+            success = orchestrator.run_parallel_batches(
+                total_videos=args.total_videos,
+                videos_per_batch=args.batch_size,
+                start_index=start_index,
+                parallel=args.parallel,
+                netns_prefix=args.netns_prefix
+            )
+        else:
+            success = orchestrator.run_automated_batches(
+                total_videos=args.total_videos,
+                videos_per_batch=args.batch_size,
+                start_index=start_index
+            )
         
         if success:
             print(f"\nSuccessfully processed {args.total_videos} videos with geographic diversity!")
@@ -367,10 +817,12 @@ def main():
             
     except KeyboardInterrupt:
         print(f"\nProcessing interrupted by user.")
-        print(f"Resume with: --start-index {orchestrator.processed_videos}")
+        print(f"Resume with: --start-index {orchestrator.processed_videos} (or rerun without it to use the saved state)")
     except Exception as e:
         print(f"\nUnexpected error: {e}")
-        print(f"Resume with: --start-index {orchestrator.processed_videos}")
+        print(f"Resume with: --start-index {orchestrator.processed_videos} (or rerun without it to use the saved state)")
+    finally:
+        orchestrator.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,41 +9,140 @@ import json
 import time
 import logging
 import argparse
+import re
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # Optional fast JSON codec for API responses and the catalog
+except ImportError:
+    orjson = None
 
 # Load environment variables
+_ENV_LOADED = False
+
 def load_env_file():
-    # Look for .env file in current directory and parent directories
-    env_paths = [
-        '.env',
-        '../.env',
-        '../../.env'
-    ]
-    
-    for env_path in env_paths:
-        try:
-            if os.path.exists(env_path):
-                with open(env_path, 'r') as f:
-                    for line in f:
-                        if line.strip() and not line.startswith('#'):
-                            key, value = line.strip().split('=', 1)
-                            value = value.strip('"\'')
-                            os.environ[key] = value
-                print(f"Loaded environment from: {env_path}")
-                return
-        except Exception as e:
-            continue
+    # First .env found wins; python-dotenv handles quoting, escapes and comments
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+    _ENV_LOADED = True
     
-    print("No .env file found in current or parent directories")
+    env_path = next((p for p in ('.env', '../.env', '../../.env') if Path(p).is_file()), None)
+    if env_path:
+        load_dotenv(env_path, override=True)
+        print(f"Loaded environment from: {env_path}")
+    else:
+        print("No .env file found in current or parent directories")
 
 load_env_file()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# videos.list lookups run on a small pool while the next playlist page is fetched
+DETAIL_WORKERS = 8
+
+# HTTP tuning: per-request timeout and urllib3 retries for transient errors
+# (quota/rate-limit errors arrive as 403s and are handled in _make_request)
+REQUEST_TIMEOUT_SECONDS = 30
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# No fixed delay between requests: a rateLimitExceeded 403 grows the shared
+# backoff (doubling, plus a second, up to the cap) and each success halves it
+RATE_LIMIT_MAX_BACKOFF_SECONDS = 60.0
+
+# Partial-response filters: only the fields _parse_video_item and the paging
+# loop read are sent back, instead of every thumbnail size, localization, etc.
+VIDEO_FIELDS = (
+    'items(id,'
+    'snippet(title,description,publishedAt,tags,categoryId,defaultLanguage,channelTitle,thumbnails/high/url),'
+    'statistics(viewCount,likeCount,commentCount),'
+    'contentDetails/duration)'
+)
+CHANNEL_FIELDS = (
+    'items(id,snippet(title,description),'
+    'statistics(subscriberCount,videoCount,viewCount),'
+    'contentDetails/relatedPlaylists/uploads)'
+)
+PLAYLIST_PAGE_FIELDS = 'nextPageToken,items/contentDetails/videoId'
+
+# ISO-8601 video duration as returned by the API (PT15M33S)
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+# Zero-padded minute/second strings, looked up instead of formatted per video
+_TWO_DIGITS = tuple(f'{i:02d}' for i in range(60))
+
+# Titles of live content, which is less likely to have transcripts. Whole
+# words only, so titles about the liver (or olive oil) aren't caught
+_LIVE_TITLE_RE = re.compile(r'\b(?:live|livestream|q&a)\b', re.IGNORECASE)
+
+# Parsed video metadata cached per video ID, so re-runs skip videos.list for
+# anything fetched within the last week (view/like counts may be that stale)
+VIDEO_CACHE_DB = 'data/cache/youtube_videos.sqlite'
+VIDEO_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+# Playlist paging progress, kept only while a crawl is incomplete so an
+# interrupted run resumes at the next page instead of page one
+PAGINATION_CHECKPOINT_FILE = 'data/processed/.berg_catalog.progress.json'
+
+@dataclass(slots=True)
+class VideoRecord:
+    """One catalog video; serialized with the same keys (in field order) as the catalog JSON"""
+    video_id: str
+    title: str
+    description: str
+    published_at: str
+    published_date: Optional[str]
+    duration_seconds: int
+    duration_formatted: str
+    view_count: int
+    like_count: int
+    comment_count: int
+    tags: List[str] = field(default_factory=list)
+    category_id: str = ''
+    default_language: str = ''
+    thumbnail_url: str = ''
+    channel_title: str = ''
+    url: str = ''
+    embed_url: str = ''
+    # Metadata for transcript extraction
+    transcript_attempted: bool = False
+    transcript_available: Optional[bool] = None
+    api_fetched_at: str = ''
+    transcript_likely: Optional[bool] = None  # set by filter_videos
+
+def _load_json(data: bytes):
+    """Parse a JSON response body straight from bytes"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _dump_json(obj) -> bytes:
+    """obj as 2-space indented UTF-8 JSON"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+def _json_default(obj):
+    """json.dumps fallback for VideoRecord (orjson serializes dataclasses natively)"""
+    if isinstance(obj, VideoRecord):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 class YouTubeVideoFetcher:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache_db: Optional[str] = VIDEO_CACHE_DB,
+                 refresh_cache: bool = False):
         self.api_key = api_key or os.getenv('YOUTUBE_API_KEY')
         if not self.api_key:
             raise ValueError("YouTube API key required. Set YOUTUBE_API_KEY environment variable.")
@@ -52,47 +151,97 @@ class YouTubeVideoFetcher:
         self.dr_berg_channel_id = "UC3w193M5tYPJqF0Hi-7U-2g"  # Dr. Berg's channel ID
         self.requests_made = 0
         self.quota_used = 0
-        
+        self._counter_lock = threading.Lock()  # Counters are updated from detail worker threads
+        self._backoff = 0.0  # current rate-limit backoff in seconds, guarded by _counter_lock
+        self._channel = None  # channels.list result, shared by the channel info and uploads lookups
+        
+        # One keep-alive session shared by the paging loop and the detail
+        # workers, so each request reuses a pooled TLS connection
+        self.session = self._create_session()
+        
+        self.refresh_cache = refresh_cache
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        if cache_db:
+            Path(cache_db).parent.mkdir(parents=True, exist_ok=True)
+            self._cache = sqlite3.connect(cache_db, check_same_thread=False)
+            self._cache.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                "video_id TEXT PRIMARY KEY, payload TEXT NOT NULL, fetched_at INTEGER NOT NULL)"
+            )
+            self._cache.commit()
+        
+    def _create_session(self):
+        """Pooled requests session with retries and gzip-compressed responses"""
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=RETRY_STATUS_CODES)
+        session = requests.Session()
+        # Google APIs only gzip responses for clients whose User-Agent says "gzip"
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'berg-nih-pipeline/1.0 (gzip)',
+        })
+        # Paging loop plus every detail worker may hold a connection at once
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=DETAIL_WORKERS + 1)
+        session.mount('https://', adapter)
+        return session
+    
     def _make_request(self, endpoint: str, params: Dict) -> Dict:
         """Make authenticated request to YouTube API"""
-        import requests
-        
         params['key'] = self.api_key
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = requests.get(url, params=params)
-            self.requests_made += 1
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
+            with self._counter_lock:
+                self.requests_made += 1
             
             if response.status_code == 403:
-                error_data = response.json()
+                error_data = _load_json(response.content)
                 if 'quotaExceeded' in str(error_data):
                     raise Exception("YouTube API quota exceeded for today")
                 elif 'rateLimitExceeded' in str(error_data):
-                    logger.warning("Rate limit exceeded, waiting 60 seconds...")
-                    time.sleep(60)
+                    with self._counter_lock:
+                        self._backoff = min(self._backoff * 2 + 1, RATE_LIMIT_MAX_BACKOFF_SECONDS)
+                        delay = self._backoff
+                    logger.warning(f"Rate limit exceeded, waiting {delay:.1f} seconds...")
+                    time.sleep(delay)
                     return self._make_request(endpoint, params)
             
             response.raise_for_status()
-            return response.json()
+            if self._backoff:
+                with self._counter_lock:
+                    self._backoff = self._backoff / 2 if self._backoff > 0.5 else 0.0
+            return _load_json(response.content)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed: {e}")
             raise
     
+    def _add_quota(self, units: int):
+        """Count API quota spent (thread-safe)"""
+        with self._counter_lock:
+            self.quota_used += units
+    
+    def _get_channel(self) -> Dict:
+        """Channel resource (snippet, statistics, uploads playlist), fetched once per run"""
+        if self._channel is None:
+            params = {
+                'part': 'snippet,statistics,contentDetails',
+                'id': self.dr_berg_channel_id,
+                'fields': CHANNEL_FIELDS
+            }
+            
+            response = self._make_request('channels', params)
+            self._add_quota(1)
+            
+            if not response.get('items'):
+                raise ValueError(f"Channel not found: {self.dr_berg_channel_id}")
+            self._channel = response['items'][0]
+        return self._channel
+    
     def get_channel_info(self) -> Dict:
         """Get basic channel information"""
-        params = {
-            'part': 'snippet,statistics',
-            'id': self.dr_berg_channel_id
-        }
-        
-        response = self._make_request('channels', params)
-        
-        if not response.get('items'):
-            raise ValueError(f"Channel not found: {self.dr_berg_channel_id}")
-        
-        channel = response['items'][0]
+        channel = self._get_channel()
         return {
             'channel_id': channel['id'],
             'title': channel['snippet']['title'],
@@ -104,106 +253,204 @@ class YouTubeVideoFetcher:
     
     def get_uploads_playlist_id(self) -> str:
         """Get the uploads playlist ID for the channel"""
-        params = {
-            'part': 'contentDetails',
-            'id': self.dr_berg_channel_id
-        }
-        
-        response = self._make_request('channels', params)
-        self.quota_used += 1
-        
-        if not response.get('items'):
-            raise ValueError(f"Channel not found: {self.dr_berg_channel_id}")
-        
-        uploads_playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        uploads_playlist_id = self._get_channel()['contentDetails']['relatedPlaylists']['uploads']
         print(f"Found uploads playlist: {uploads_playlist_id}")
         return uploads_playlist_id
 
-    def get_all_videos(self, max_results: int = None) -> List[Dict]:
-        """Get all videos from Dr. Berg's channel using uploads playlist"""
-        videos = []
+    def _load_pagination_checkpoint(self, playlist_id: str) -> Optional[Dict]:
+        """Progress of an interrupted crawl of playlist_id, if there is one"""
+        try:
+            with open(PAGINATION_CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable pagination checkpoint: {e}")
+            return None
+        
+        if checkpoint.get('playlist_id') != playlist_id or not checkpoint.get('next_page_token'):
+            return None
+        return checkpoint
+    
+    def _save_pagination_checkpoint(self, playlist_id: str, next_page_token: str, video_ids: List[str]):
+        """Record the next page to fetch and every video ID listed so far"""
+        Path(PAGINATION_CHECKPOINT_FILE).parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = f"{PAGINATION_CHECKPOINT_FILE}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'playlist_id': playlist_id,
+                'next_page_token': next_page_token,
+                'video_ids': video_ids
+            }, f)
+        os.replace(tmp_file, PAGINATION_CHECKPOINT_FILE)
+    
+    def get_all_videos(self, max_results: int = None, resume: bool = True) -> List[VideoRecord]:
+        """Get all videos from Dr. Berg's channel using uploads playlist
+        
+        Playlist pages have to be walked in order (each needs the previous
+        page's token), but each page's videos.list lookup is handed to a
+        thread pool so it overlaps with fetching the next page.
+        
+        After every page the next page token is checkpointed; if paging fails,
+        the next run (with resume) picks up there, re-reading the details of
+        already listed videos from the metadata cache.
+        """
+        detail_futures = []
+        listed_ids = []  # every video ID queued so far, for the checkpoint
+        video_count = 0
         next_page_token = None
         page_count = 0
+        interrupted = False
         
         logger.info(f"Fetching videos from Dr. Berg's channel...")
         
         # Get the uploads playlist ID
         uploads_playlist_id = self.get_uploads_playlist_id()
         
-        while True:
-            params = {
-                'part': 'snippet',
-                'playlistId': uploads_playlist_id,
-                'maxResults': 50,  # Max allowed per request
-            }
-            
-            if next_page_token:
-                params['pageToken'] = next_page_token
+        checkpoint = self._load_pagination_checkpoint(uploads_playlist_id) if resume else None
+        
+        with ThreadPoolExecutor(max_workers=DETAIL_WORKERS, thread_name_prefix='video-details') as executor:
+            if checkpoint:
+                listed_ids = checkpoint['video_ids'][:max_results] if max_results else checkpoint['video_ids']
+                next_page_token = checkpoint['next_page_token']
+                print(f"Resuming interrupted fetch: {len(listed_ids)} videos already listed")
+                for start in range(0, len(listed_ids), 50):
+                    detail_futures.append(executor.submit(self.get_video_details, listed_ids[start:start + 50]))
+                video_count = len(listed_ids)
             
-            try:
-                print(f"Fetching page {page_count + 1}...")
-                response = self._make_request('playlistItems', params)
-                self.quota_used += 1  # playlistItems costs 1 quota unit
-                
-                items = response.get('items', [])
-                print(f"Playlist returned {len(items)} items")
-                
-                # Get detailed video info for this batch
-                video_ids = []
-                for item in items:
-                    video_id = item['snippet']['resourceId']['videoId']
-                    video_ids.append(video_id)
-                
-                if video_ids:
-                    print(f"Getting details for {len(video_ids)} videos...")
-                    detailed_videos = self.get_video_details(video_ids)
-                    videos.extend(detailed_videos)
-                    print(f"Added {len(detailed_videos)} detailed videos")
-                
-                page_count += 1
-                logger.info(f"Fetched page {page_count}, total videos: {len(videos)}")
+            while not (max_results and video_count >= max_results):
+                params = {
+                    'part': 'contentDetails',  # Only the video IDs are needed from the playlist
+                    'playlistId': uploads_playlist_id,
+                    'maxResults': 50,  # Max allowed per request
+                    'fields': PLAYLIST_PAGE_FIELDS,
+                }
                 
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token:
-                    print("No more pages available")
-                    break
+                if next_page_token:
+                    params['pageToken'] = next_page_token
                 
-                if max_results and len(videos) >= max_results:
-                    videos = videos[:max_results]
-                    print(f"Reached max_results limit: {max_results}")
+                try:
+                    print(f"Fetching page {page_count + 1}...")
+                    response = self._make_request('playlistItems', params)
+                    self._add_quota(1)  # playlistItems costs 1 quota unit
+                    
+                    items = response.get('items', [])
+                    print(f"Playlist returned {len(items)} items")
+                    
+                    video_ids = [item['contentDetails']['videoId'] for item in items]
+                    if max_results:
+                        video_ids = video_ids[:max_results - video_count]
+                    
+                    # Get detailed video info for this page in the background
+                    if video_ids:
+                        detail_futures.append(executor.submit(self.get_video_details, video_ids))
+                        video_count += len(video_ids)
+                        listed_ids.extend(video_ids)
+                    
+                    page_count += 1
+                    logger.info(f"Fetched page {page_count}, video IDs queued: {video_count}")
+                    
+                    next_page_token = response.get('nextPageToken')
+                    if not next_page_token:
+                        print("No more pages available")
+                        break
+                    
+                    if max_results and video_count >= max_results:
+                        print(f"Reached max_results limit: {max_results}")
+                        break
+                    
+                    self._save_pagination_checkpoint(uploads_playlist_id, next_page_token, listed_ids)
+                    
+                except Exception as e:
+                    logger.error(f"Error fetching page {page_count + 1}: {e}")
+                    interrupted = True
                     break
-                
-                # Rate limiting - be conservative
-                time.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"Error fetching page {page_count + 1}: {e}")
-                break
+            
+            # Collect details in playlist order
+            videos = []
+            for page_number, future in enumerate(detail_futures, 1):
+                try:
+                    detailed_videos = future.result()
+                except Exception as e:
+                    logger.error(f"Error getting details for page {page_number}: {e}")
+                    continue
+                videos.extend(detailed_videos)
+        
+        if interrupted:
+            logger.info(f"Paging progress kept in {PAGINATION_CHECKPOINT_FILE}; re-run to resume")
+        else:
+            Path(PAGINATION_CHECKPOINT_FILE).unlink(missing_ok=True)
         
         logger.info(f"Total videos fetched: {len(videos)}")
         return videos
     
-    def get_video_details(self, video_ids: List[str]) -> List[Dict]:
-        """Get detailed information for specific video IDs"""
+    def _load_cached_videos(self, video_ids: List[str]) -> Dict[str, VideoRecord]:
+        """Cached metadata for those of video_ids fetched recently enough"""
+        if self._cache is None or self.refresh_cache or not video_ids:
+            return {}
+        
+        placeholders = ','.join('?' * len(video_ids))
+        with self._cache_lock:
+            rows = self._cache.execute(
+                f"SELECT video_id, payload FROM videos WHERE video_id IN ({placeholders}) AND fetched_at >= ?",
+                (*video_ids, int(time.time()) - VIDEO_CACHE_MAX_AGE_SECONDS)
+            ).fetchall()
+        
+        cached = {}
+        for video_id, payload in rows:
+            try:
+                cached[video_id] = VideoRecord(**json.loads(payload))
+            except TypeError:
+                continue  # written with a different set of fields; fetch it again
+        return cached
+    
+    def _cache_videos(self, videos: List[VideoRecord]):
+        """Store freshly fetched video metadata"""
+        if self._cache is None or not videos:
+            return
+        
+        now = int(time.time())
+        rows = [(video.video_id, json.dumps(asdict(video), ensure_ascii=False, separators=(',', ':')), now)
+                for video in videos]
+        with self._cache_lock:
+            self._cache.executemany(
+                "INSERT OR REPLACE INTO videos (video_id, payload, fetched_at) VALUES (?, ?, ?)", rows
+            )
+            self._cache.commit()
+    
+    def get_video_details(self, video_ids: List[str]) -> List[VideoRecord]:
+        """Get detailed information for specific video IDs (cached ones cost no quota)"""
         if not video_ids:
             return []
         
-        params = {
-            'part': 'snippet,statistics,contentDetails',
-            'id': ','.join(video_ids[:50])  # Max 50 IDs per request
-        }
-        
-        response = self._make_request('videos', params)
-        self.quota_used += 1  # Videos.list costs 1 quota unit
+        video_ids = video_ids[:50]  # Max 50 IDs per request
+        videos_by_id = self._load_cached_videos(video_ids)
+        missing_ids = [video_id for video_id in video_ids if video_id not in videos_by_id]
         
-        videos = []
-        for item in response.get('items', []):
-            video = self._parse_video_item(item)
-            videos.append(video)
+        if missing_ids:
+            params = {
+                'part': 'snippet,statistics,contentDetails',
+                'id': ','.join(missing_ids),
+                'fields': VIDEO_FIELDS
+            }
+            
+            response = self._make_request('videos', params)
+            self._add_quota(1)  # Videos.list costs 1 quota unit
+            
+            fetched = [self._parse_video_item(item) for item in response.get('items', [])]
+            self._cache_videos(fetched)
+            videos_by_id.update((video.video_id, video) for video in fetched)
         
-        return videos
+        return [videos_by_id[video_id] for video_id in video_ids if video_id in videos_by_id]
     
-    def _parse_video_item(self, item: Dict) -> Dict:
+    def close(self):
+        """Close the HTTP session and the metadata cache"""
+        self.session.close()
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+    
+    def _parse_video_item(self, item: Dict) -> VideoRecord:
         """Parse YouTube API video item into our format"""
         snippet = item['snippet']
         statistics = item.get('statistics', {})
@@ -212,109 +459,119 @@ class YouTubeVideoFetcher:
         # Parse duration (PT15M33S -> seconds)
         duration_seconds = self._parse_duration(content_details.get('duration', ''))
         
-        # Parse published date
+        # Published date as an offset ISO string; the API always returns UTC
+        # ('Z'), so this is a suffix swap rather than a datetime round trip
         published_at = snippet.get('publishedAt', '')
-        try:
-            published_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-        except:
-            published_date = None
-        
-        return {
-            'video_id': item['id'],
-            'title': snippet.get('title', ''),
-            'description': snippet.get('description', ''),
-            'published_at': published_at,
-            'published_date': published_date.isoformat() if published_date else None,
-            'duration_seconds': duration_seconds,
-            'duration_formatted': self._format_duration(duration_seconds),
-            'view_count': int(statistics.get('viewCount', 0)),
-            'like_count': int(statistics.get('likeCount', 0)),
-            'comment_count': int(statistics.get('commentCount', 0)),
-            'tags': snippet.get('tags', []),
-            'category_id': snippet.get('categoryId', ''),
-            'default_language': snippet.get('defaultLanguage', ''),
-            'thumbnail_url': snippet.get('thumbnails', {}).get('high', {}).get('url', ''),
-            'channel_title': snippet.get('channelTitle', ''),
-            'url': f"https://www.youtube.com/watch?v={item['id']}",
-            'embed_url': f"https://www.youtube.com/embed/{item['id']}",
-            # Metadata for transcript extraction
-            'transcript_attempted': False,
-            'transcript_available': None,
-            'api_fetched_at': datetime.utcnow().isoformat()
-        }
+        if published_at.endswith('Z'):
+            published_date = published_at[:-1] + '+00:00'
+        else:
+            published_date = published_at or None
+        
+        return VideoRecord(
+            video_id=item['id'],
+            title=snippet.get('title', ''),
+            description=snippet.get('description', ''),
+            published_at=published_at,
+            published_date=published_date,
+            duration_seconds=duration_seconds,
+            duration_formatted=self._format_duration(duration_seconds),
+            view_count=int(statistics.get('viewCount', 0)),
+            like_count=int(statistics.get('likeCount', 0)),
+            comment_count=int(statistics.get('commentCount', 0)),
+            tags=snippet.get('tags', []),
+            category_id=snippet.get('categoryId', ''),
+            default_language=snippet.get('defaultLanguage', ''),
+            thumbnail_url=snippet.get('thumbnails', {}).get('high', {}).get('url', ''),
+            channel_title=snippet.get('channelTitle', ''),
+            url=f"https://www.youtube.com/watch?v={item['id']}",
+            embed_url=f"https://www.youtube.com/embed/{item['id']}",
+            api_fetched_at=datetime.utcnow().isoformat()
+        )
     
-    def _parse_duration(self, duration_str: str) -> int:
+    @staticmethod
+    def _parse_duration(duration_str: str) -> int:
         """Parse YouTube duration (PT15M33S) to seconds"""
-        import re
-        
-        if not duration_str:
-            return 0
-        
-        # Parse PT15M33S format
-        pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
-        match = re.match(pattern, duration_str)
-        
+        match = _DURATION_RE.match(duration_str) if duration_str else None
         if not match:
             return 0
         
-        hours = int(match.group(1) or 0)
-        minutes = int(match.group(2) or 0) 
-        seconds = int(match.group(3) or 0)
-        
-        return hours * 3600 + minutes * 60 + seconds
+        hours, minutes, seconds = match.groups()
+        return int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(seconds or 0)
     
-    def _format_duration(self, seconds: int) -> str:
+    @staticmethod
+    def _format_duration(seconds: int) -> str:
         """Format seconds as HH:MM:SS or MM:SS"""
-        if seconds == 0:
-            return "0:00"
-        
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
+        hours, rest = divmod(seconds, 3600)
+        minutes, secs = divmod(rest, 60)
         
         if hours > 0:
-            return f"{hours}:{minutes:02d}:{secs:02d}"
+            return f"{hours}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[secs]}"
         else:
-            return f"{minutes}:{secs:02d}"
+            return f"{minutes}:{_TWO_DIGITS[secs]}"
     
-    def filter_videos(self, videos: List[Dict], 
+    def filter_videos(self, videos: List[VideoRecord], 
                      min_duration: int = 60,
                      max_duration: int = 7200,
-                     exclude_shorts: bool = True) -> List[Dict]:
+                     exclude_shorts: bool = True) -> List[VideoRecord]:
         """Filter videos based on criteria"""
-        filtered = []
+        # Skipping shorts (< 60 seconds) just raises the lower duration bound
+        if exclude_shorts:
+            min_duration = max(min_duration, 60)
         
-        for video in videos:
-            duration = video['duration_seconds']
-            
-            # Skip shorts (< 60 seconds) if requested
-            if exclude_shorts and duration < 60:
-                continue
-            
-            # Duration filters
-            if duration < min_duration or duration > max_duration:
-                continue
-            
-            # Add transcript likelihood score
-            title = video['title'].lower()
-            description = video['description'].lower()
-            
-            # Dr. Berg content typically has transcripts
-            video['transcript_likely'] = True  # Assume yes for Dr. Berg
-            if any(word in title for word in ['live', 'livestream', 'q&a']):
-                video['transcript_likely'] = False  # Live content less likely
-            
-            filtered.append(video)
+        filtered = [video for video in videos
+                    if min_duration <= video.duration_seconds <= max_duration]
+        
+        # Add transcript likelihood score: Dr. Berg content typically has
+        # transcripts, live content less likely
+        for video in filtered:
+            video.transcript_likely = _LIVE_TITLE_RE.search(video.title) is None
         
         logger.info(f"Filtered {len(videos)} -> {len(filtered)} videos")
         return filtered
     
-    def save_video_catalog(self, videos: List[Dict], filename: str = 'data/processed/berg_complete_catalog.json'):
+    def save_video_catalog(self, videos: List[VideoRecord], filename: str = 'data/processed/berg_complete_catalog.json'):
         """Save complete video catalog"""
         
         # Create enhanced dataset
         channel_info = self.get_channel_info()
         
+        # All summary figures in a single pass over the videos
+        total_duration = total_views = total_likes = 0
+        earliest = latest = None
+        years = {}
+        distribution = {
+            'under_5min': 0,
+            '5-15min': 0, 
+            '15-30min': 0,
+            '30-60min': 0,
+            'over_60min': 0
+        }
+        for video in videos:
+            duration = video.duration_seconds
+            total_duration += duration
+            total_views += video.view_count
+            total_likes += video.like_count
+            
+            published_date = video.published_date
+            if published_date:
+                if earliest is None or published_date < earliest:
+                    earliest = published_date
+                if latest is None or published_date > latest:
+                    latest = published_date
+                year = published_date[:4]
+                years[year] = years.get(year, 0) + 1
+            
+            if duration < 300:
+                distribution['under_5min'] += 1
+            elif duration < 900:
+                distribution['5-15min'] += 1
+            elif duration < 1800:
+                distribution['15-30min'] += 1
+            elif duration < 3600:
+                distribution['30-60min'] += 1
+            else:
+                distribution['over_60min'] += 1
+        
         catalog = {
             'channel_info': channel_info,
             'fetch_metadata': {
@@ -322,19 +579,19 @@ class YouTubeVideoFetcher:
                 'total_videos': len(videos),
                 'api_requests_made': self.requests_made,
                 'quota_units_used': self.quota_used,
-                'average_duration': sum(v['duration_seconds'] for v in videos) / len(videos) if videos else 0,
+                'average_duration': total_duration / len(videos) if videos else 0,
                 'date_range': {
-                    'earliest': min(v['published_date'] for v in videos if v['published_date']) if videos else None,
-                    'latest': max(v['published_date'] for v in videos if v['published_date']) if videos else None
+                    'earliest': earliest,
+                    'latest': latest
                 }
             },
             'videos': videos,
             'summary_stats': {
-                'total_views': sum(v['view_count'] for v in videos),
-                'total_likes': sum(v['like_count'] for v in videos),
-                'total_duration_hours': sum(v['duration_seconds'] for v in videos) / 3600,
-                'videos_by_year': self._group_by_year(videos),
-                'duration_distribution': self._duration_distribution(videos)
+                'total_views': total_views,
+                'total_likes': total_likes,
+                'total_duration_hours': total_duration / 3600,
+                'videos_by_year': dict(sorted(years.items())),
+                'duration_distribution': distribution
             }
         }
         
@@ -343,45 +600,26 @@ class YouTubeVideoFetcher:
         if dir_name:  # Only create directory if filename has a directory component
             os.makedirs(dir_name, exist_ok=True)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(catalog, f, indent=2, ensure_ascii=False)
+        # Stream the videos one record at a time instead of serializing the whole
+        # catalog at once; the layout is the same as one indented dump (JSON
+        # strings escape newlines, so re-indenting by replacing them is safe).
+        # Written beside the target and renamed over it so a crash never leaves
+        # a torn file
+        head = _dump_json({'channel_info': channel_info, 'fetch_metadata': catalog['fetch_metadata']})
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'wb') as f:
+            f.write(head[:-2])  # without the closing "\n}"
+            f.write(b',\n  "videos": [')
+            for i, video in enumerate(videos):
+                f.write(b',\n    ' if i else b'\n    ')
+                f.write(_dump_json(video).replace(b'\n', b'\n    '))
+            f.write(b'\n  ],\n  "summary_stats": ' if videos else b'],\n  "summary_stats": ')
+            f.write(_dump_json(catalog['summary_stats']).replace(b'\n', b'\n  '))
+            f.write(b'\n}')
+        os.replace(tmp_filename, filename)
         
         logger.info(f"Video catalog saved to {filename}")
         return catalog
-    
-    def _group_by_year(self, videos: List[Dict]) -> Dict[str, int]:
-        """Group videos by publication year"""
-        years = {}
-        for video in videos:
-            if video['published_date']:
-                year = video['published_date'][:4]
-                years[year] = years.get(year, 0) + 1
-        return dict(sorted(years.items()))
-    
-    def _duration_distribution(self, videos: List[Dict]) -> Dict[str, int]:
-        """Analyze duration distribution"""
-        distribution = {
-            'under_5min': 0,
-            '5-15min': 0, 
-            '15-30min': 0,
-            '30-60min': 0,
-            'over_60min': 0
-        }
-        
-        for video in videos:
-            duration = video['duration_seconds']
-            if duration < 300:
-                distribution['under_5min'] += 1
-            elif duration < 900:
-                distribution['5-15min'] += 1
-            elif duration < 1800:
-                distribution['15-30min'] += 1
-            elif duration < 3600:
-                distribution['30-60min'] += 1
-            else:
-                distribution['over_60min'] += 1
-        
-        return distribution
 
 def main():
     parser = argparse.ArgumentParser(description='Fetch all Dr. Berg videos using YouTube Data API v3')
@@ -392,14 +630,20 @@ def main():
     parser.add_argument('--min-duration', type=int, default=60, help='Minimum video duration in seconds')
     parser.add_argument('--max-duration', type=int, default=7200, help='Maximum video duration in seconds') 
     parser.add_argument('--include-shorts', action='store_true', help='Include YouTube shorts (<60s)')
+    parser.add_argument('--no-cache', action='store_true', help=f'Disable the video metadata cache ({VIDEO_CACHE_DB})')
+    parser.add_argument('--refresh-cache', action='store_true', help='Re-fetch all video metadata (results are still cached)')
+    parser.add_argument('--no-resume', action='store_true', help='Start paging from the first page even if an interrupted fetch was checkpointed')
     
     args = parser.parse_args()
     
     print("Dr. Berg Complete Video Fetcher")
     print("=" * 40)
     
+    fetcher = None
     try:
-        fetcher = YouTubeVideoFetcher(api_key=args.api_key)
+        fetcher = YouTubeVideoFetcher(api_key=args.api_key,
+                                      cache_db=None if args.no_cache else VIDEO_CACHE_DB,
+                                      refresh_cache=args.refresh_cache)
         
         # Get channel info first
         channel_info = fetcher.get_channel_info()
@@ -410,7 +654,7 @@ def main():
         
         # Fetch all videos
         print("Fetching all videos... (this may take several minutes)")
-        videos = fetcher.get_all_videos(max_results=args.max_videos)
+        videos = fetcher.get_all_videos(max_results=args.max_videos, resume=not args.no_resume)
         
         if not videos:
             print("No videos found!")
@@ -448,6 +692,9 @@ def main():
     except Exception as e:
         print(f"ERROR: {e}")
         return 1
+    finally:
+        if fetcher:
+            fetcher.close()
 
 if __name__ == "__main__":
     exit(main())
\ No newline at end of file
@@ -1,55 +1,89 @@
 #!/usr/bin/env python3
 """
-Test script for PMC fetcher - single search term
+Test script for PMC fetcher - one or more search terms (fetched concurrently)
 """
 
 from pmc_fetcher import PMCFetcher
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 import json
+import sys
+import threading
+import time
 
-def test_single_search():
-    print("Testing PMC Fetcher with single search term")
+DEFAULT_TERMS = ["vitamin D deficiency"]
+
+# NCBI E-utilities allow 3 requests/second without an API key
+MAX_CONCURRENT_TERMS = 3
+
+_pace_lock = threading.Lock()
+_next_request_at = 0.0
+
+def _paced(fetcher, func, *args, **kwargs):
+    """Call func once the fetcher's rate-limit delay since the previous (any thread) request has passed"""
+    global _next_request_at
+    with _pace_lock:
+        now = time.monotonic()
+        wait = _next_request_at - now
+        _next_request_at = max(now, _next_request_at) + fetcher.rate_limit_delay
+    if wait > 0:
+        time.sleep(wait)
+    return func(*args, **kwargs)
+
+def _fetch_term(fetcher, term: str):
+    """Search one term and fetch its full articles"""
+    pmc_ids = _paced(fetcher, fetcher.search_pmc, term, max_results=2)
+    articles = _paced(fetcher, fetcher.get_article_metadata, pmc_ids) if pmc_ids else []
+    return term, pmc_ids, articles
+
+def test_terms(terms: Optional[List[str]] = None):
+    terms = terms or DEFAULT_TERMS
+    print(f"Testing PMC Fetcher with {len(terms)} search term(s)")
     print("="*50)
     
     # Initialize fetcher
     fetcher = PMCFetcher(email="test@example.com")
     
-    # Test with one search term
-    test_term = "vitamin D deficiency"
-    print(f"Testing search term: {test_term}")
+    # Terms are searched concurrently; every request still waits its turn
+    # under the shared NCBI rate limit
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TERMS) as executor:
+        results = list(executor.map(lambda term: _fetch_term(fetcher, term), terms))
     
-    # Search for articles
-    pmc_ids = fetcher.search_pmc(test_term, max_results=2)
-    print(f"Found PMC IDs: {pmc_ids}")
+    all_articles = []
+    for term, pmc_ids, articles in results:
+        print(f"Testing search term: {term}")
+        print(f"Found PMC IDs: {pmc_ids}")
+        if pmc_ids:
+            print(f"Retrieved {len(articles)} full articles")
+        else:
+            print("No articles found for test search term")
+        all_articles.extend(articles)
     
-    if pmc_ids:
-        # Get full articles
-        articles = fetcher.get_article_metadata(pmc_ids)
-        print(f"Retrieved {len(articles)} full articles")
+    # Show sample data
+    if all_articles:
+        article = all_articles[0]
+        print(f"\nSample Article:")
+        print(f"Title: {article['title']}")
+        print(f"Journal: {article['journal']}")
+        print(f"Year: {article['year']}")
+        print(f"Authors: {', '.join(article['authors'][:3])}...")
+        print(f"Word count: {article.get('word_count', 0)}")
+        print(f"Sections: {article.get('section_count', 0)}")
+        print(f"Abstract: {article['abstract'][:200]}...")
         
-        # Show sample data
-        if articles:
-            article = articles[0]
-            print(f"\nSample Article:")
-            print(f"Title: {article['title']}")
-            print(f"Journal: {article['journal']}")
-            print(f"Year: {article['year']}")
-            print(f"Authors: {', '.join(article['authors'][:3])}...")
-            print(f"Word count: {article.get('word_count', 0)}")
-            print(f"Sections: {article.get('section_count', 0)}")
-            print(f"Abstract: {article['abstract'][:200]}...")
-            
-            if article.get('full_text_sections'):
-                print(f"\nSection titles:")
-                for title in article['full_text_sections'].keys():
-                    print(f"  - {title}")
-            
-            # Save test results
-            with open('test_pmc_result.json', 'w') as f:
-                json.dump(articles, f, indent=2)
-            print(f"\nTest results saved to test_pmc_result.json")
-    
-    else:
-        print("No articles found for test search term")
+        if article.get('full_text_sections'):
+            print(f"\nSection titles:")
+            for title in article['full_text_sections'].keys():
+                print(f"  - {title}")
+        
+        # Save test results
+        with open('test_pmc_result.json', 'w') as f:
+            json.dump(all_articles, f, indent=2)
+        print(f"\nTest results saved to test_pmc_result.json")
+
+def test_single_search():
+    test_terms(DEFAULT_TERMS)
 
 if __name__ == "__main__":
-    test_single_search()
\ No newline at end of file
+    # Search terms may be given on the command line
+    test_terms(sys.argv[1:])
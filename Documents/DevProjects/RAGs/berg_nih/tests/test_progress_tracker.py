@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the progress tracker's batch scan
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from progress_tracker import ProgressTracker
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def _make_tracker(data_dir):
+    # Default layout: progress file and catalog live next to the batch files
+    return ProgressTracker(progress_file=str(data_dir / "berg_processing_progress.json"),
+                           catalog_file=str(data_dir / "berg_complete_catalog.json"))
+
+def test_second_scan_is_skipped(tmp_path, capsys):
+    _write_json(tmp_path / "berg_complete_catalog.json", {"videos": [
+        {"video_id": f"video{i:06d}", "title": f"Video {i}", "duration_seconds": 200}
+        for i in range(3)
+    ]})
+    _write_json(tmp_path / "berg_human_batch_001.json", {
+        "batch_metadata": {"completed_at": "2025-01-01T00:00:00"},
+        "videos": [{"video_id": "video000000", "title": "Video 0", "duration_formatted": "3:20"}]
+    })
+    
+    assert _make_tracker(tmp_path).scan_existing_batches(str(tmp_path)) == 1
+    capsys.readouterr()
+    
+    assert _make_tracker(tmp_path).scan_existing_batches(str(tmp_path)) == 1
+    output = capsys.readouterr().out
+    assert "unchanged since last scan" in output
+    assert "Scanning berg_human_batch_001.json" not in output
+
+def test_rewritten_batch_is_rescanned(tmp_path, capsys):
+    _write_json(tmp_path / "berg_complete_catalog.json", {"videos": [
+        {"video_id": f"video{i:06d}", "title": f"Video {i}", "duration_seconds": 200}
+        for i in range(3)
+    ]})
+    batch_file = tmp_path / "berg_human_batch_001.json"
+    _write_json(batch_file, {"videos": [{"video_id": "video000000"}]})
+    assert _make_tracker(tmp_path).scan_existing_batches(str(tmp_path)) == 1
+    
+    _write_json(batch_file, {"videos": [{"video_id": "video000000"}, {"video_id": "video000001"}]})
+    capsys.readouterr()
+    assert _make_tracker(tmp_path).scan_existing_batches(str(tmp_path)) == 2
+    assert "unchanged since last scan" not in capsys.readouterr().out
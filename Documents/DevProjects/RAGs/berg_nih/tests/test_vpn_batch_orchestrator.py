@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the VPN batch orchestrator's batch monitoring
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from vpn_batch_orchestrator import VPNBatchOrchestrator
+
+# Stand-in extractor: reports two videos the way transcript_extractor_human_batch
+# does, then only exits once the callback has run (or fails after 5s)
+STUB_EXTRACTOR = """
+import os, sys, time
+sys.stdout.write("Successfully processed video aaaaaaaaaaa\\n")
+sys.stdout.write("Failed to process video bbbbbbbbbbb\\n")
+sys.stdout.flush()
+deadline = time.monotonic() + 5
+while not os.path.exists(sys.argv[1]):
+    if time.monotonic() > deadline:
+        sys.exit(1)
+    time.sleep(0.01)
+"""
+
+def test_videos_done_callback_fires_before_batch_exits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    orchestrator = VPNBatchOrchestrator(log_dir=str(tmp_path / "logs"))
+    marker = tmp_path / "callback_ran"
+    calls = []
+    
+    def on_videos_done():
+        calls.append(True)
+        marker.touch()
+    
+    monkeypatch.setattr(orchestrator, '_prepare_batch_file', lambda start_index, batch_size: None)
+    monkeypatch.setattr(orchestrator, '_batch_command',
+                        lambda extra_args, netns=None: [sys.executable, '-c', STUB_EXTRACTOR, str(marker)])
+    try:
+        assert orchestrator.run_batch_script(0, 2, on_videos_done=on_videos_done)
+    finally:
+        orchestrator.close()
+    
+    assert calls == [True]
+
+# Stand-in --daemon extractor: answers each job line with one result line per
+# letter of argv[1] (S = success, F = failure) and the done reply
+STUB_DAEMON = """
+import json, sys
+for job in sys.stdin:
+    results = sys.argv[1]
+    for i, result in enumerate(results):
+        line = "Successfully processed video" if result == "S" else "Failed to process video"
+        sys.stdout.write(f"{line} {i:011d}\\n")
+    reply = {'done': True, 'processed': len(results), 'succeeded': results.count('S')}
+    sys.stdout.write(json.dumps(reply) + "\\n")
+    sys.stdout.flush()
+"""
+
+def _run_persistent_batch(tmp_path, monkeypatch, results):
+    monkeypatch.chdir(tmp_path)
+    orchestrator = VPNBatchOrchestrator(log_dir=str(tmp_path / "logs"), persistent_worker=True)
+    monkeypatch.setattr(orchestrator, '_prepare_batch_file', lambda start_index, batch_size: None)
+    monkeypatch.setattr(orchestrator, '_batch_command',
+                        lambda extra_args, netns=None: [sys.executable, '-c', STUB_DAEMON, results])
+    try:
+        return orchestrator.run_batch_script(0, len(results))
+    finally:
+        orchestrator.close()
+
+def test_persistent_batch_with_only_failures_fails(tmp_path, monkeypatch):
+    assert not _run_persistent_batch(tmp_path, monkeypatch, "FF")
+
+def test_persistent_batch_with_a_success_succeeds(tmp_path, monkeypatch):
+    assert _run_persistent_batch(tmp_path, monkeypatch, "FS")
+
+def test_batch_already_in_database_succeeds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    orchestrator = VPNBatchOrchestrator(log_dir=str(tmp_path / "logs"))
+    calls = []
+    stub = 'print("Skipped already processed video aaaaaaaaaaa\\nSkipped already processed video bbbbbbbbbbb")'
+    monkeypatch.setattr(orchestrator, '_prepare_batch_file', lambda start_index, batch_size: None)
+    monkeypatch.setattr(orchestrator, '_batch_command',
+                        lambda extra_args, netns=None: [sys.executable, '-c', stub])
+    try:
+        assert orchestrator.run_batch_script(0, 2, on_videos_done=lambda: calls.append(True))
+    finally:
+        orchestrator.close()
+    
+    assert calls == [True]